@@ -1,3 +1,35 @@
-from lpEnergyModels.base import *
-from lpEnergyModels.mBasic import MBasic, MBasicEmCap, MBasicRES
-from lpEnergyModels.mBasicInt import MBasicInt, MBasicIntEmCap, MBasicIntRES
+"""
+Linear programming energy models. Names are imported on first access, such that `import lpEnergyModels` is cheap and
+e.g. lpEnergyModels.MBasicInt only imports lpEnergyModels.mBasicInt (and the modules it depends on):
+- Model classes and loop functions listed in _attrs are loaded from their modules.
+- Submodules (e.g. lpEnergyModels.kernels) are imported when accessed as attributes.
+- Names in lpEnergyModels.base (e.g. lpEnergyModels.pdSum) are loaded from lazyBase. `from lpEnergyModels import *` imports all model classes,
+  the loop functions and the names in base.
+The model classes are those of mBasic/mBasicInt; the versions on EnergyShell (incremental compile, lazy solutions, loops, ...) are in mBasicShell/mBasicIntShell.
+"""
+import importlib
+
+_attrs = {'MBasic': 'mBasic', 'MBasicEmCap': 'mBasic', 'MBasicRES': 'mBasic',
+		  'MBasicInt': 'mBasicInt', 'MBasicIntEmCap': 'mBasicInt', 'MBasicIntRES': 'mBasicInt',
+		  'parallelLoop': 'loops', 'parallelLoopAsDFs': 'loops'}
+
+def __getattr__(name):
+	if name in _attrs:
+		value = getattr(importlib.import_module(f'{__name__}.{_attrs[name]}'), name)
+	elif name == '__all__':
+		value = list(_attrs)+importlib.import_module(f'{__name__}.lazyBase').__all__
+	else:
+		try:
+			value = importlib.import_module(f'{__name__}.{name}')
+		except ModuleNotFoundError as e:
+			if e.name != f'{__name__}.{name}':
+				raise
+			base = importlib.import_module(f'{__name__}.lazyBase')
+			if name not in base.__all__:
+				raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+			value = getattr(base, name)
+	globals()[name] = value
+	return value
+
+def __dir__():
+	return sorted(set(globals()) | set(_attrs))
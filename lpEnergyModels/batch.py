@@ -0,0 +1,112 @@
+""" Batched loops: The LPs of several scenarios are stacked into one block-diagonal LP that is solved once per batch. """
+from lpEnergyModels.base import *
+import copy
+from contextlib import contextmanager
+from scipy import optimize, sparse
+from lpEnergyModels.sensitivity import copyOut
+
+def updateGrids(db, grids, l):
+	""" Set the db symbols in grids (pd.Series or list of pd.Series over idxLoop) to their values at l, as in ModelShell.lazyLoop_l. """
+	[db.aom(grid.xs(l), name = grid.name, priority = 'first') for grid in ([grids] if isinstance(grids, pd.Series) else grids)];
+
+def batches(idxLoop, batchSize):
+	return [idxLoop[i:i+batchSize] for i in range(0, len(idxLoop), max(1, batchSize))]
+
+def stackOuts(outs):
+	""" Block-diagonal LP (in the format of sys.out) with the LPs in outs as blocks. """
+	hstack = lambda k: None if outs[0][k] is None else np.hstack([o[k] for o in outs])
+	blockDiag = lambda k: None if outs[0][k] is None else sparse.block_diag([o[k] for o in outs], format = 'csr')
+	return {'c': hstack('c'), 'A_eq': blockDiag('A_eq'), 'b_eq': hstack('b_eq'), 'A_ub': blockDiag('A_ub'), 'b_ub': hstack('b_ub'), 'bounds': np.vstack([o['bounds'] for o in outs])}
+
+def outDims(out):
+	return tuple(0 if out[k] is None else len(out[k]) for k in ('c','b_eq','b_ub'))
+
+def splitSolution(sol, outs):
+	""" Solutions (in the format of scipy.optimize.linprog) to each block of the LP stackOuts(outs). """
+	N, (n, nEq, nUb) = len(outs), outDims(outs[0])
+	x, lower, upper = (np.asarray(v).reshape(N, n) for v in (sol['x'], sol['lower']['marginals'], sol['upper']['marginals']))
+	eq, ub = np.asarray(sol['eqlin']['marginals']).reshape(N, nEq), np.asarray(sol['ineqlin']['marginals']).reshape(N, nUb)
+	return [optimize.OptimizeResult(x = x[i], fun = float(o['c'] @ x[i]), status = sol['status'], success = sol['success'], nit = sol.get('nit', None), batch = N,
+									eqlin = {'marginals': eq[i]}, ineqlin = {'marginals': ub[i]}, lower = {'marginals': lower[i]}, upper = {'marginals': upper[i]}) for i,o in enumerate(outs)]
+
+def solveBatch(m, grids, batch, **kwargs):
+	"""
+	Compile the scenarios in batch and solve the stacked LP once (with m.solveOut, i.e. presolve and m.solver).
+	Returns the states (db symbols and compiled sys.out) and solutions of the scenarios.
+	"""
+	states = []
+	for l in batch:
+		updateGrids(m.db, grids, l)
+		m.compile(**kwargs)
+		states.append(({k: copy.copy(s) for k,s in m.db.symbols.items()}, copyOut(m.sys.out)))
+	outs = [s[1] for s in states]
+	if any(outDims(o) != outDims(outs[0]) for o in outs):
+		raise ValueError("Scenarios in a batch must have the same variables and constraints (grids cannot change domains).")
+	return states, splitSolution(m.solveOut(stackOuts(outs)), outs)
+
+@contextmanager
+def scenarioState(m, symbols, out):
+	""" Temporarily set the db symbols and sys.out of m to those of a scenario (e.g. for postSolve). """
+	old = m.db.symbols, m.sys.out
+	m.db.symbols, m.sys.out = symbols, out
+	try:
+		yield m
+	finally:
+		m.db.symbols, m.sys.out = old
+
+def batchLoop(m, grids, idxLoop, batchSize = 100, outputs = None, postSolve = True, kwCompile = None, kwPostSolve = None):
+	"""
+	Batched version of ModelShell.lazyLoop for models with small LPs (e.g. MBasic or MBasicInt with few hours), where the overhead of each solve dominates.
+	- batchSize: Number of scenarios stacked in each LP. Memory use grows with batchSize*(size of sys.out); larger batches spread the solver overhead over more scenarios.
+	- postSolve: If True, each scenario is postSolved with the db symbols and sys.out of the scenario (as in lazyLoop, outputs = [...] limits the outputs).
+	  If False, the solutions are returned in the format of scipy.optimize.linprog (see batchLoopAsDFs for a vectorized unpacking).
+	The db is left at the values of the last scenario in idxLoop.
+	"""
+	sols = {}
+	for batch in batches(idxLoop, batchSize):
+		states, bSols = solveBatch(m, grids, batch, **noneInit(kwCompile, {}))
+		for l, (symbols, out), sol in zip(batch, states, bSols):
+			if postSolve:
+				with scenarioState(m, symbols, out):
+					solDict = m.postSolve(sol, **noneInit(kwPostSolve, {}))
+				sols[l] = solDict if outputs is None else solDict.subset(outputs)
+			else:
+				sols[l] = sol
+	return sols
+
+def unloadLoop(m, sols, outs, idxLoop):
+	"""
+	Variables and shadow values (as ModelShell.postSolve) of all scenarios stacked in DataFrames over (domain, idxLoop) (Series over idxLoop for scalar symbols),
+	as returned by loopUnpackToDFs. Built from arrays of solutions without postSolving each scenario.
+	"""
+	stack = lambda k: np.column_stack([s[k] if k == 'x' else s[k]['marginals'] for s in sols])
+	sys = m.sys
+	def unpack(X, attr, name, prefix = ''):
+		pos = sys.maps[attr][name]
+		return pd.Series(X[pos.values[0]], index = idxLoop) if getattr(sys, attr)[name] is None else pd.DataFrame(X[pos.values], index = pos.index, columns = idxLoop)
+	X = stack('x')
+	solDict = {k: unpack(X, 'v', k) for k in sys.v}
+	if not m.computeDual:
+		return solDict
+	lower, upper = stack('lower'), stack('upper')
+	if sys.scalarDual:
+		fixed = np.column_stack([o['bounds'][:,0] == o['bounds'][:,1] for o in outs])
+		lower, upper = np.where(fixed, 0, lower), np.where(fixed, lower+upper, upper)
+	eq, ub = stack('eqlin'), stack('ineqlin')
+	return (solDict | {f'λeq_{k}': unpack(eq, 'eq', k) for k in sys.eq} | {f'λub_{k}': unpack(ub, 'ub', k) for k in sys.ub}
+					| {f'λl_{k}': unpack(lower, 'v', k) for k in sys.v} | {f'λu_{k}': unpack(upper, 'v', k) for k in sys.v})
+
+def batchLoopAsDFs(m, grids, idxLoop, batchSize = 100, outputs = None, postSolve = True, kwCompile = None, kwPostSolve = None):
+	"""
+	Batched version of ModelShell.lazyLoopAsDFs; see batchLoop.
+	If postSolve is False, only variables, shadow values and 'surplus' (-fun, as in the postSolve of the models) are returned; these are
+	unpacked for all scenarios at once (see unloadLoop), which avoids the pandas work of postSolving each scenario.
+	"""
+	if postSolve:
+		return loopUnpackToDFs(batchLoop(m, grids, idxLoop, batchSize = batchSize, outputs = outputs, kwCompile = kwCompile, kwPostSolve = kwPostSolve), idxLoop)
+	sols, outs = [], []
+	for batch in batches(idxLoop, batchSize):
+		states, bSols = solveBatch(m, grids, batch, **noneInit(kwCompile, {}))
+		sols, outs = sols+bSols, outs+[s[1] for s in states]
+	solDict = unloadLoop(m, sols, outs, idxLoop) | {'surplus': pd.Series([-s['fun'] for s in sols], index = idxLoop)}
+	return solDict if outputs is None else {k: solDict[k] for k in outputs}
@@ -0,0 +1,106 @@
+""" Compact representation of hourly symbols and solutions: Integer-coded index levels, shared domain indices and optional float32 results. """
+from lpEnergyModels.lazyBase import np, pd
+
+def indicesOf(x):
+	return [x] if isinstance(x, pd.Index) else [x.index, x.columns] if isinstance(x, pd.DataFrame) else [x.index]
+
+def memoryUsage(objs):
+	"""
+	Bytes used by the pandas objects in objs: Values plus each distinct index object counted once (with levels, codes and the hash
+	engine if it has been built), such that indices shared by several symbols are not counted repeatedly.
+	"""
+	objs = [x for x in objs if isinstance(x, (pd.Series, pd.DataFrame, pd.Index))]
+	indices = {id(idx): idx for x in objs for idx in indicesOf(x)}
+	values = sum(x.memory_usage(index = False, deep = True).sum() if isinstance(x, pd.DataFrame) else x.memory_usage(index = False, deep = True) for x in objs if not isinstance(x, pd.Index))
+	return int(values + sum(idx.memory_usage(deep = True) for idx in indices.values()))
+
+class Compact:
+	"""
+	Compact representation used by EnergyShell.enableCompact:
+	- Domains in self.labels (e.g. 'idxHr') are integer-coded: The label at position i of the domain is coded as i. The domain itself becomes
+	  a pd.RangeIndex, and index levels of symbols defined over the domain hold the codes (levels of a pd.MultiIndex are recoded, codes are kept).
+	- self.share(s) returns s over a shared index object: A domain in self.sys (e.g. sys.v['generation']) or the first index registered with the
+	  same names, if the indices are equal. Series over the same domain then use one index (and one hash engine) instead of a copy each.
+	- self.cast(x) stores float series/DataFrames of results in self.dtype (None keeps float64).
+	self.decode(x) converts back to the labels and float64 values of the standard representation.
+	"""
+	def __init__(self, labels, dtype = 'float32'):
+		self.labels, self.dtype, self.indices = labels, None if dtype is None else np.dtype(dtype), {}
+
+	@classmethod
+	def fromDB(cls, db, domains = ('idxHr',), dtype = 'float32'):
+		return cls({k: db(k) for k in domains if k in db}, dtype = dtype)
+
+	def __getstate__(self):
+		""" Registered indices are not pickled. """
+		return self.__dict__ | {'indices': {}}
+
+	def coded(self, x):
+		return isinstance(x, (pd.Series, pd.DataFrame, pd.Index)) and any(k in self.labels for k in self.indexOf(x).names)
+
+	@staticmethod
+	def indexOf(x):
+		return x if isinstance(x, pd.Index) else x.index
+
+	def withIndex(self, x, idx):
+		return idx if isinstance(x, pd.Index) else x.set_axis(idx, axis = 0)
+
+	def encodeIndex(self, idx):
+		if isinstance(idx, pd.MultiIndex):
+			return idx.set_levels([self.codes(lvl, k) if k in self.labels else lvl for lvl, k in zip(idx.levels, idx.names)])
+		if idx.name not in self.labels:
+			return idx
+		return pd.RangeIndex(len(idx), name = idx.name) if idx.equals(self.labels[idx.name]) else self.codes(idx, idx.name)
+
+	def codes(self, idx, k):
+		c = self.labels[k].get_indexer(idx)
+		if (c < 0).any():
+			raise ValueError(f"Labels {list(idx[c < 0][:5])} of '{k}' are not in the coded domain.")
+		return pd.Index(c, name = k)
+
+	def decodeIndex(self, idx):
+		if isinstance(idx, pd.MultiIndex):
+			return idx.set_levels([self.labels[k].take(lvl.values).rename(k) if k in self.labels else lvl for lvl, k in zip(idx.levels, idx.names)])
+		return self.labels[idx.name].take(idx.values).rename(idx.name) if idx.name in self.labels else idx
+
+	def encode(self, x):
+		""" x with coded index levels (over a shared index, see self.share). Other objects are returned as they are. """
+		return self.share(self.withIndex(x, self.encodeIndex(self.indexOf(x)))) if self.coded(x) else x
+
+	def decode(self, x):
+		""" x (pandas object, dict or LazySolution of these) in the standard representation: Labels instead of codes and float64 values. """
+		if isinstance(x, dict) or hasattr(x, 'subset'):
+			return {k: self.decode(v) for k,v in x.items()}
+		if not isinstance(x, (pd.Series, pd.DataFrame, pd.Index)):
+			return x
+		x = self.withIndex(x, self.decodeIndex(self.indexOf(x))) if self.coded(x) else x
+		return x if isinstance(x, pd.Index) else x.astype(float) if self.isFloat(x) else x
+
+	def share(self, x, domains = ()):
+		"""
+		x over an index object in domains or registered in self.indices with the same elements (reordered if the order differs).
+		x's index is registered if there is none.
+		"""
+		if not isinstance(x, (pd.Series, pd.DataFrame)):
+			return x
+		idx = x.index
+		for dom in [d for d in domains if isinstance(d, pd.Index)]+[self.indices.get(tuple(idx.names))]:
+			if dom is idx:
+				return x
+			if dom is None or dom.names != idx.names or len(dom) != len(idx):
+				continue
+			if dom.equals(idx):
+				return x.set_axis(dom, axis = 0)
+			pos = idx.get_indexer(dom) if idx.is_unique else None
+			if pos is not None and (pos >= 0).all():
+				return x.iloc[pos].set_axis(dom, axis = 0)
+		self.indices[tuple(idx.names)] = idx
+		return x
+
+	@staticmethod
+	def isFloat(x):
+		return all(np.issubdtype(t, np.floating) for t in (x.dtypes if isinstance(x, pd.DataFrame) else [x.dtype]))
+
+	def cast(self, x):
+		""" Float series/DataFrames in self.dtype; other objects as they are. """
+		return x.astype(self.dtype) if self.dtype is not None and isinstance(x, (pd.Series, pd.DataFrame)) and self.isFloat(x) else x
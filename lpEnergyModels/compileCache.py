@@ -0,0 +1,214 @@
+""" On-disk cache of compiled LP systems (sys.out, domains and auxiliary symbols) keyed by a hash of the model class and the database symbols the compile reads. """
+from lpEnergyModels.lazyBase import np, pd, getIndex
+import functools, hashlib, json, os, sys, tempfile
+from importlib import metadata
+
+formatVersion = 1
+
+def hashValue(h, x):
+	""" Update hashlib object h with the name, type and contents of x (pd.Series, pd.Index or scalar). """
+	if isinstance(x, (pd.Series, pd.Index)):
+		h.update(repr((type(x).__name__, list(getIndex(x).names), str(x.dtype))).encode())
+		h.update(pd.util.hash_pandas_object(x, index = isinstance(x, pd.Series)).values.tobytes())
+	else:
+		h.update(repr((type(x).__name__, x)).encode())
+
+def hashSymbols(db, names):
+	""" Hash of the symbols in db with the given names (absent symbols are part of the hash). """
+	h = hashlib.blake2b(digest_size = 16)
+	for k in sorted(names):
+		h.update(k.encode())
+		if k not in db.symbols:
+			h.update(b'<absent>')
+			continue
+		[hashValue(h, getattr(db[k], attr, None)) for attr in ('v','lo','up')];
+	return h.hexdigest()
+
+@functools.cache
+def packageKey():
+	"""
+	Hash of the source of all modules in this package (compile engines, kernels, presolve, energySys etc. affect compiled systems)
+	and of the versions of the libraries used to compile (symMaps, pyDbs, and major versions of numpy, scipy and pandas).
+	"""
+	h = hashlib.blake2b(repr(formatVersion).encode(), digest_size = 16)
+	path = os.path.dirname(os.path.abspath(__file__))
+	for file in sorted(f for f in os.listdir(path) if f.endswith('.py')):
+		h.update(file.encode())
+		with open(os.path.join(path, file), 'rb') as f:
+			h.update(f.read())
+	for lib in ('symMaps','pyDbs','numpy','scipy','pandas'):
+		try:
+			v = metadata.version(lib)
+		except metadata.PackageNotFoundError:
+			v = None
+		h.update(repr((lib, v if lib in ('symMaps','pyDbs') or v is None else v.split('.')[0])).encode())
+	return h.hexdigest()
+
+def classKey(cls):
+	""" Hash of the model class, its bases, the source files defining bases outside this package and packageKey(). """
+	h = hashlib.blake2b(packageKey().encode(), digest_size = 16)
+	for c in cls.__mro__:
+		h.update(f'{c.__module__}.{c.__qualname__}'.encode())
+		file = getattr(sys.modules.get(c.__module__), '__file__', None)
+		if not c.__module__.startswith('lpEnergyModels') and file is not None and file.endswith('.py'):
+			with open(file, 'rb') as f:
+				h.update(f.read())
+	return h.hexdigest()
+
+# Encoding of pandas objects as plain numpy arrays (no pickling):
+def _levelArray(values):
+	a = np.asarray(values)
+	if a.dtype == object:
+		if not all(isinstance(x, str) for x in a):
+			raise TypeError("Only string, numeric or boolean index levels can be cached.")
+		a = a.astype(str)
+	return a
+
+def encodeIndex(idx, key, arrays):
+	""" Store pd.Index/pd.MultiIndex idx in arrays under prefix key; returns metadata needed by decodeIndex. """
+	if isinstance(idx, pd.MultiIndex):
+		for i, (level, codes) in enumerate(zip(idx.levels, idx.codes)):
+			arrays[f'{key}/level{i}'], arrays[f'{key}/codes{i}'] = _levelArray(level), np.asarray(codes)
+		return {'names': list(idx.names), 'nlevels': idx.nlevels}
+	arrays[f'{key}/level0'] = _levelArray(idx)
+	return {'names': [idx.name], 'nlevels': None}
+
+def decodeIndex(meta, key, arrays):
+	if meta['nlevels'] is None:
+		return pd.Index(arrays[f'{key}/level0'], name = meta['names'][0])
+	return pd.MultiIndex(levels = [arrays[f'{key}/level{i}'] for i in range(meta['nlevels'])],
+						 codes = [arrays[f'{key}/codes{i}'] for i in range(meta['nlevels'])], names = meta['names'], verify_integrity = False)
+
+def encodeSymbol(x, key, arrays):
+	""" Store domain/symbol x (None, scalar, pd.Index or pd.Series) in arrays; returns metadata needed by decodeSymbol. """
+	if x is None:
+		return {'type': 'none'}
+	elif isinstance(x, pd.Index):
+		return {'type': 'index', 'index': encodeIndex(x, key, arrays)}
+	elif isinstance(x, pd.Series):
+		arrays[f'{key}/values'] = np.asarray(x.values)
+		return {'type': 'series', 'name': x.name, 'index': encodeIndex(x.index, key, arrays)}
+	return {'type': 'scalar', 'value': float(x)}
+
+def decodeSymbol(meta, key, arrays):
+	if meta['type'] == 'none':
+		return None
+	elif meta['type'] == 'index':
+		return decodeIndex(meta['index'], key, arrays)
+	elif meta['type'] == 'series':
+		return pd.Series(arrays[f'{key}/values'], index = decodeIndex(meta['index'], key, arrays), name = meta['name'])
+	return meta['value']
+
+def encodeOut(out, arrays):
+	""" Store sys.out in arrays: Dense vectors as they are, sparse matrices in csr format. """
+	from scipy import sparse # imported here, such that modules that only use the symbol encoding (e.g. dataStore) do not load scipy
+	for k, x in out.items():
+		if sparse.issparse(x):
+			A = sparse.csr_array(x)
+			arrays.update({f'out/{k}/data': A.data, f'out/{k}/indices': A.indices, f'out/{k}/indptr': A.indptr, f'out/{k}/shape': np.asarray(A.shape)})
+		elif x is not None:
+			arrays[f'out/{k}'] = np.asarray(x)
+
+def decodeOut(keys, arrays, sparseFormat = 'csr'):
+	from scipy import sparse
+	def get(k):
+		if f'out/{k}' in arrays:
+			return arrays[f'out/{k}']
+		elif f'out/{k}/data' in arrays:
+			return sparse.csr_array((arrays[f'out/{k}/data'], arrays[f'out/{k}/indices'], arrays[f'out/{k}/indptr']), shape = tuple(arrays[f'out/{k}/shape'])).asformat(sparseFormat)
+	return {k: get(k) for k in keys}
+
+def _atomicWrite(path, write):
+	""" Write to a temporary file in the same directory and rename it (concurrent readers never see partial files). """
+	fd, tmp = tempfile.mkstemp(dir = os.path.dirname(path), suffix = '.tmp')
+	try:
+		with os.fdopen(fd, 'wb') as f:
+			write(f)
+		os.replace(tmp, path)
+	except BaseException:
+		os.remove(tmp) if os.path.exists(tmp) else None
+		raise
+
+class CompileCache:
+	"""
+	Cache of compiled models in directory 'path'. An entry stores the domains self.sys.v/eq/ub, the arrays in self.sys.out and the
+	auxiliary symbols written to the database during the compile in one uncompressed .npz file. The key of an entry combines:
+	- classKey: The model class, the source of all modules in this package and of modules defining its bases elsewhere, and the versions of
+	  symMaps/pyDbs and major versions of numpy/scipy/pandas (editing the model or compile code, or upgrading these libraries, invalidates entries).
+	- A hash of the database symbols the compile reads (recorded by EnergyShell.runStage/runAux). The names of these symbols are
+	  stored per model class in '{classKey}.json', so symbols the compile does not use (e.g. solutions added to the database) do not affect the key.
+	Entries are evicted in least-recently-used order (file modification times are updated on each hit) when the total size of the cache exceeds maxBytes.
+	The cache directory can be shared by concurrent processes; files are written to temporary files and renamed.
+	"""
+	def __init__(self, path, maxBytes = 2**30):
+		self.path = path
+		self.maxBytes = maxBytes
+		os.makedirs(path, exist_ok = True)
+
+	def readsFile(self, m):
+		return os.path.join(self.path, f'{classKey(type(m))}.json')
+
+	def entryFile(self, key):
+		return os.path.join(self.path, f'{key}.npz')
+
+	def key(self, m, reads = None):
+		""" Key for model m. If reads is None, use the symbols recorded for the class of m; returns None if none are recorded. """
+		ck = classKey(type(m))
+		if reads is None:
+			try:
+				with open(self.readsFile(m)) as f:
+					reads = json.load(f)
+			except (FileNotFoundError, json.JSONDecodeError):
+				return None
+		return f'{ck}-{hashSymbols(m.db, reads)}'
+
+	def load(self, m):
+		""" Load compiled system into m if there is an entry for the current database; returns True on a hit. """
+		key = self.key(m)
+		if key is None:
+			return False
+		try:
+			with np.load(self.entryFile(key), allow_pickle = False) as f:
+				arrays = dict(f)
+			os.utime(self.entryFile(key))
+		except (FileNotFoundError, OSError, ValueError):
+			return False
+		meta = json.loads(str(arrays.pop('__meta__')))
+		for attr in ('v','eq','ub'):
+			setattr(m.sys, attr, {k: decodeSymbol(meta[attr][k], f'{attr}/{k}', arrays) for k in meta[attr]})
+		m.sys.compileMaps()
+		m.sys.out = decodeOut(meta['out'], arrays, sparseFormat = getattr(m.sys, 'sparseFormat', 'csr'))
+		[m.db.__setitem__(k, decodeSymbol(meta['aux'][k], f'aux/{k}', arrays)) for k in meta['aux']];
+		return True
+
+	def store(self, m):
+		""" Store the compiled system of m; the key is based on the database symbols read in m.stages. """
+		reads = sorted(set().union(*[r for kind in m.stages.values() for r in kind.values()]) - set(m.stages['aux']))
+		arrays, meta = {}, {'out': list(m.sys.out)}
+		for attr in ('v','eq','ub'):
+			meta[attr] = {k: encodeSymbol(x, f'{attr}/{k}', arrays) for k,x in getattr(m.sys, attr).items()}
+		meta['aux'] = {k: encodeSymbol(m.db(k), f'aux/{k}', arrays) for k in m.stages['aux'] if k in m.db.symbols}
+		encodeOut(m.sys.out, arrays)
+		arrays['__meta__'] = np.asarray(json.dumps(meta))
+		_atomicWrite(self.entryFile(self.key(m, reads = reads)), lambda f: np.savez(f, **arrays))
+		_atomicWrite(self.readsFile(m), lambda f: f.write(json.dumps(reads).encode()))
+		self.evict()
+
+	def entries(self):
+		""" pd.DataFrame with size and last use of each entry (oldest first). """
+		files = [os.path.join(self.path, f) for f in os.listdir(self.path) if f.endswith('.npz')]
+		stats = {f: os.stat(f) for f in files if os.path.exists(f)}
+		return pd.DataFrame({'bytes': [s.st_size for s in stats.values()], 'used': [s.st_mtime for s in stats.values()]},
+							index = pd.Index(list(stats), name = 'file'), dtype = float).sort_values('used')
+
+	def evict(self):
+		""" Remove least recently used entries until the total size is at most self.maxBytes. """
+		df = self.entries()
+		for f in df.index[(df['bytes'][::-1].cumsum()[::-1] > self.maxBytes).values]:
+			try:
+				os.remove(f)
+			except FileNotFoundError:
+				pass
+
+	def clear(self):
+		[os.remove(os.path.join(self.path, f)) for f in os.listdir(self.path) if f.endswith(('.npz','.json'))];
@@ -0,0 +1,107 @@
+""" Columnar binary data store: One .npy file per array of each symbol (values, index levels and integer codes) and a meta.json file describing the symbols. """
+from lpEnergyModels.lazyBase import itertools, np, pd, ExcelSymbolLoader, Gpy, SimpleDB
+from lpEnergyModels.trackedDB import TrackedDB
+from lpEnergyModels.compileCache import encodeSymbol, decodeSymbol
+from collections.abc import MutableMapping
+import json, os, pickle
+
+def readSource(source):
+	""" Dictionary of symbols from an .xlsx file (pyDbs.ExcelSymbolLoader), a .pkl file with a dictionary or SimpleDB, a SimpleDB or a dictionary. """
+	if isinstance(source, (str, os.PathLike)):
+		if str(source).endswith('.pkl'):
+			with open(source, 'rb') as f:
+				source = pickle.load(f)
+		else:
+			source = ExcelSymbolLoader(source)()
+	if isinstance(source, SimpleDB):
+		source = {k: v.v for k,v in source.symbols.items()}
+	return {k: v for k,v in source.items() if not k.startswith('__')}
+
+def writeStore(source, path):
+	"""
+	Convert source (see readSource) to a data store in directory path. Each symbol is stored as
+	- '{name}.values.npy': Values of variables,
+	- '{name}.level{i}.npy', '{name}.codes{i}.npy': Unique elements of each index level and the integer codes of the elements (for pd.MultiIndex).
+	Scalars are stored in meta.json. Index levels must be strings or numbers.
+	"""
+	os.makedirs(path, exist_ok = True)
+	meta = {}
+	for name, x in readSource(source).items():
+		arrays = {}
+		meta[name] = encodeSymbol(x, name, arrays)
+		[np.save(os.path.join(path, f"{k.replace('/','.')}.npy"), a, allow_pickle = False) for k,a in arrays.items()];
+	with open(os.path.join(path, 'meta.json'), 'w') as f:
+		json.dump(meta, f)
+	return meta
+
+class DataStore:
+	"""
+	Read symbols from a data store written by writeStore. If mmap, arrays of at least mmapBytes bytes are memory-mapped (read-only)
+	rather than read into memory; pandas objects built from them share the memory-mapped values.
+	"""
+	def __init__(self, path, mmap = True, mmapBytes = 2**20):
+		self.path, self.mmap, self.mmapBytes = path, mmap, mmapBytes
+		with open(os.path.join(path, 'meta.json')) as f:
+			self.meta = json.load(f)
+
+	def __iter__(self):
+		return iter(self.meta)
+
+	def __len__(self):
+		return len(self.meta)
+
+	def loadArray(self, key):
+		file = os.path.join(self.path, f"{key.replace('/','.')}.npy")
+		return np.load(file, mmap_mode = 'r' if self.mmap and os.path.getsize(file) >= self.mmapBytes else None, allow_pickle = False)
+
+	def load(self, name):
+		""" Symbol 'name' as pd.Index, pd.Series or scalar. """
+		return decodeSymbol(self.meta[name], name, _Arrays(self, name))
+
+	def __call__(self):
+		""" Load all symbols; returns dictionary (same format as pyDbs.ExcelSymbolLoader). """
+		return {k: self.load(k) for k in self}
+
+	def db(self, name = None, cls = TrackedDB):
+		""" Database (default TrackedDB) where symbols are read from the store the first time they are accessed. """
+		return cls(name = name, symbols = LazySymbols(self))
+
+class _Arrays:
+	""" Read arrays of symbol 'name' from the store on access (used by decodeSymbol). """
+	def __init__(self, store, name):
+		self.store, self.name = store, name
+
+	def __getitem__(self, key):
+		return self.store.loadArray(key)
+
+class LazySymbols(MutableMapping):
+	""" Mapping from names to Gpy symbols that loads symbols from a DataStore the first time they are accessed. """
+	def __init__(self, store):
+		self.store = store
+		self.loaded = {}
+		self.pending = dict.fromkeys(store)
+
+	def __getitem__(self, item):
+		if item in self.pending:
+			self.loaded[item] = Gpy.c(self.store.load(item), name = item)
+			del self.pending[item]
+		return self.loaded[item]
+
+	def __setitem__(self, item, value):
+		self.pending.pop(item, None)
+		self.loaded[item] = value
+
+	def __delitem__(self, item):
+		if item in self.pending:
+			del self.pending[item]
+		else:
+			del self.loaded[item]
+
+	def __contains__(self, item):
+		return item in self.loaded or item in self.pending
+
+	def __iter__(self):
+		return itertools.chain(list(self.loaded), list(self.pending))
+
+	def __len__(self):
+		return len(self.loaded) + len(self.pending)
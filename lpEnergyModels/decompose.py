@@ -0,0 +1,207 @@
+""" Time-decomposed solution of compiled models: Hours are split into windows that are solved as independent LPs. """
+from lpEnergyModels.base import *
+from lpEnergyModels.loops import defaultWorkers
+from lpEnergyModels.solvers import ScipySolver
+from concurrent.futures import ProcessPoolExecutor
+from scipy import optimize, sparse
+import pickle
+
+_worker = {}
+
+def hourWindows(idxHr, size = 1):
+	""" Split idxHr into consecutive windows with 'size' hours each. """
+	return [idxHr[i:i+size] for i in range(0, len(idxHr), size)]
+
+def windowCodes(maps, domains, windowOf, level = 'idxHr', allowScalar = False):
+	""" Array with the window number of each stacked element in maps (-1 if the domain is not defined over 'level' and allowScalar). """
+	codes = np.full(sum(len(m) for m in maps.values()), -1)
+	for k, dom in domains.items():
+		if dom is None or level not in dom.names:
+			if allowScalar:
+				continue
+			raise ValueError(f"Cannot decompose '{k}': domain is not defined over '{level}'.")
+		codes[maps[k].values] = windowOf.reindex(dom.get_level_values(level)).values
+	return codes
+
+def windowLPs(sys, windows, level = 'idxHr'):
+	"""
+	Split compiled sys.out into LPs for each window. Constraints in sys.ub that are not defined over 'level' couple the windows;
+	they are returned separately as (A_ub, b_ub) restricted to the coupling rows.
+	"""
+	windowOf = pd.Series(np.repeat(np.arange(len(windows)), [len(w) for w in windows]), index = pd.Index(np.hstack(windows)).rename(level))
+	cols, eqRows, ubRows = windowCodes(sys.maps['v'], sys.v, windowOf, level), windowCodes(sys.maps['eq'], sys.eq, windowOf, level), windowCodes(sys.maps['ub'], sys.ub, windowOf, level, allowScalar = True)
+	A_eq, A_ub = sparse.csr_array(sys.out['A_eq']), sparse.csr_array(sys.out['A_ub'])
+	[checkSeparable(A, rows, cols, name) for A, rows, name in ((A_eq, eqRows, 'A_eq'), (A_ub, ubRows, 'A_ub'))];
+	coupling = np.flatnonzero(ubRows == -1)
+	lps = [windowLP(sys.out, A_eq, A_ub, np.flatnonzero(cols == w), np.flatnonzero(eqRows == w), np.flatnonzero(ubRows == w), coupling) for w in range(len(windows))]
+	return lps, {'A_ub': A_ub[coupling,:], 'b_ub': sys.out['b_ub'][coupling], 'rows': coupling}
+
+def checkSeparable(A, rows, cols, name):
+	A = A.tocoo()
+	local = rows[A.row] != -1
+	if (rows[A.row][local] != cols[A.col][local]).any():
+		raise ValueError(f"{name} has constraints that link variables across windows; the model cannot be decomposed with these windows.")
+
+def windowLP(out, A_eq, A_ub, cols, eqRows, ubRows, coupling):
+	return {'cols': cols, 'eqRows': eqRows, 'ubRows': ubRows, 'c': out['c'][cols], 'bounds': out['bounds'][cols],
+			'A_eq': A_eq[eqRows,:][:,cols] if len(eqRows) else None, 'b_eq': out['b_eq'][eqRows] if len(eqRows) else None,
+			'A_ub': A_ub[ubRows,:][:,cols] if len(ubRows) else None, 'b_ub': out['b_ub'][ubRows] if len(ubRows) else None,
+			'Ac': A_ub[coupling,:][:,cols]}
+
+_lpKeys = ('c','A_eq','b_eq','A_ub','b_ub','bounds')
+
+def fresh(x):
+	""" Copy of a solver/presolve instance without its state (through __getstate__, e.g. HighsSolver drops the loaded LP); None if x is None. """
+	return None if x is None else pickle.loads(pickle.dumps(x))
+
+def solveLP(out, solver, presolve = None, solOptions = None):
+	""" Solve the LP in out (in the format of sys.out) with solver after presolve reduces it, as EnergyShell.solveOut. """
+	sol = solver(out if presolve is None else presolve.reduce(out), solOptions)
+	assert sol['status'] == 0, f"{type(solver).__name__} did not yield solution status == 0."
+	return sol if presolve is None else presolve.expand(sol, out)
+
+def solveWindow(lp, mu = None, solver = None, presolve = None, solOptions = None):
+	""" Solve window LP with Lagrangian prices mu on the coupling constraints (with scipy.optimize.linprog if solver is None). """
+	out = {k: lp[k] for k in _lpKeys} | {'c': lp['c'] if mu is None else lp['c']+lp['Ac'].T @ mu}
+	sol = solveLP(out, noneInit(solver, ScipySolver()), presolve = presolve, solOptions = solOptions)
+	return {'x': sol['x'], 'eq': sol['eqlin']['marginals'], 'ub': sol['ineqlin']['marginals'], 'lower': sol['lower']['marginals'], 'upper': sol['upper']['marginals']}
+
+def _initWorker(lps, solver, presolve, solOptions):
+	_worker.update({'lps': lps, 'solver': solver, 'presolve': presolve, 'solOptions': solOptions, 'windows': {}})
+
+def _solveWindow(w, mu):
+	""" Solve window w in a worker; each worker keeps a copy of the solver and presolve per window it solves (warm starts across prices). """
+	solver, presolve = _worker['windows'].setdefault(w, (fresh(_worker['solver']), fresh(_worker['presolve'])))
+	return solveWindow(_worker['lps'][w], mu = mu, solver = solver, presolve = presolve, solOptions = _worker['solOptions'])
+
+class WindowSolver:
+	"""
+	Solve window LPs serially or in a process pool (windows are shipped to the workers once). Each window is solved with its own copy
+	of solver and presolve (e.g. m.solver and m.presolve), such that warm-started solvers reuse the basis of the window when prices change.
+	"""
+	def __init__(self, lps, solver = None, presolve = None, solOptions = None, nWorkers = 1):
+		self.lps, self.solOptions = lps, solOptions
+		solver = noneInit(solver, ScipySolver())
+		self.nWorkers = min(noneInit(nWorkers, defaultWorkers()), len(lps))
+		self.windows = [(fresh(solver), fresh(presolve)) for lp in lps] if self.nWorkers <= 1 else None
+		self.pool = ProcessPoolExecutor(max_workers = self.nWorkers, initializer = _initWorker, initargs = (lps, fresh(solver), fresh(presolve), solOptions)) if self.nWorkers > 1 else None
+
+	def __call__(self, mu = None):
+		if self.pool is None:
+			return [solveWindow(lp, mu = mu, solver = solver, presolve = presolve, solOptions = self.solOptions) for lp, (solver, presolve) in zip(self.lps, self.windows)]
+		return list(self.pool.map(_solveWindow, range(len(self.lps)), itertools.repeat(mu), chunksize = max(1, len(self.lps)//(4*self.nWorkers))))
+
+	def close(self):
+		if self.pool is not None:
+			self.pool.shutdown()
+
+def stackSols(sys, lps, sols, mu, coupling, weights = None):
+	"""
+	Map window solutions to a solution of the full LP in the format of scipy.optimize.linprog. Coupling constraints get marginals -mu.
+	'lagrangian' is the value of the Lagrangian dual at mu (c'x + mu'(A_c x - b_c) with x minimizing the windows at mu), a lower bound on the optimal objective.
+	"""
+	x, eq, ub, lower, upper = np.zeros(sys.len['v']), np.zeros(sys.len['eq']), np.zeros(sys.len['ub']), np.zeros(sys.len['v']), np.zeros(sys.len['v'])
+	for lp, sol in zip(lps, sols):
+		x[lp['cols']], lower[lp['cols']], upper[lp['cols']] = sol['x'], sol['lower'], sol['upper']
+		eq[lp['eqRows']], ub[lp['ubRows']] = sol['eq'], sol['ub']
+	ub[coupling['rows']] = -mu
+	fun = sys.out['c'] @ x
+	return optimize.OptimizeResult(x = x, fun = fun, status = 0, success = True, eqlin = {'marginals': eq}, ineqlin = {'marginals': ub}, lower = {'marginals': lower}, upper = {'marginals': upper},
+									lagrangian = fun + mu @ (coupling['A_ub'] @ x - coupling['b_ub']))
+
+def combineSols(a, b, θ):
+	""" Convex combination θ * a + (1-θ) * b of two solutions returned by stackSols. """
+	comb = lambda x, y: θ * x + (1-θ) * y
+	return optimize.OptimizeResult(x = comb(a['x'], b['x']), fun = comb(a['fun'], b['fun']), status = 0, success = True,
+									**{k: {'marginals': comb(a[k]['marginals'], b[k]['marginals'])} for k in ('eqlin','ineqlin','lower','upper')})
+
+def violation(coupling, sol):
+	return coupling['A_ub'] @ sol['x'] - coupling['b_ub']
+
+def withGap(sol, dual, coupling, gapTol = None, tol = 0):
+	"""
+	Add the duality gap to solution sol: 'dual' is the best Lagrangian lower bound found, 'gap' = sol.fun - dual (an upper bound on the
+	distance of sol.fun to the optimal objective if sol is feasible) and 'maxViolation' the largest violation of the coupling constraints.
+	Raises RuntimeError if maxViolation > tol * (1+max|b_c|) or, if gapTol is not None, |gap| > gapTol * (1+|dual|).
+	"""
+	sol['dual'], sol['gap'] = dual, sol['fun']-dual
+	sol['maxViolation'] = float(max(0, violation(coupling, sol).max(initial = 0)))
+	if sol['maxViolation'] > tol * (1+np.abs(coupling['b_ub']).max(initial = 0)):
+		raise RuntimeError(f"Decomposed solution violates coupling constraints by up to {sol['maxViolation']:.4g}; increase maxIter or adjust step0.")
+	if gapTol is not None and abs(sol['gap']) > gapTol * (1+abs(dual)):
+		raise RuntimeError(f"Decomposed solution has duality gap {sol['gap']:.4g} (objective {sol['fun']:.6g}, dual bound {dual:.6g}); increase maxIter, adjust step0 or pass a larger gapTol.")
+	return sol
+
+def solveDecomposed(m, windowSize = 24, level = 'idxHr', nWorkers = 1, tol = 1e-6, maxIter = 100, mu0 = 1, step0 = None, gapTol = 1e-4):
+	"""
+	Solve compiled model m by splitting hours ('level') into windows of size windowSize. Windows are solved with copies of m.solver
+	(after m.presolve reduces them), as in m.solve.
+	- Without coupling constraints (constraints in m.sys.ub not defined over 'level'), windows are solved once.
+	- With one coupling constraint (e.g. MBasicIntEmCap with one emission type or MBasicIntRES), the price μ ≥ 0 on the constraint
+	  is found by bisection on the window solutions. The solution is the convex combination of the solutions at the final price bracket
+	  that satisfies the constraint with equality (exact when the bracket width is 0).
+	- With several coupling constraints, prices are updated by a projected subgradient method and the solution is the average of the
+	  iterates (approximate; increase maxIter for better precision).
+	nWorkers > 1 solves windows in a process pool. Returns a scipy.optimize.OptimizeResult that can be passed to m.postSolve, with
+	the duality gap (see withGap): 'dual' (best Lagrangian bound), 'gap' and 'maxViolation'. A RuntimeError is raised if the solution violates
+	the coupling constraints by more than tol (relative to the largest right-hand side) or if the relative gap exceeds gapTol; gapTol = None
+	accepts approximate solutions of the subgradient method (their gap is reported). Objective values and prices match the monolithic LP within tolerance; where the LP has multiple
+	optimal solutions the dispatch can differ.
+	"""
+	lps, coupling = windowLPs(m.sys, hourWindows(m.db(level), windowSize), level = level)
+	solver = WindowSolver(lps, solver = m.solver, presolve = m.presolve, solOptions = m.solOptions, nWorkers = nWorkers)
+	try:
+		stack = lambda mu: stackSols(m.sys, lps, solver(mu = mu), mu, coupling)
+		if len(coupling['rows']) == 0:
+			sol = stack(np.zeros(0))
+			return withGap(sol, sol['lagrangian'], coupling, gapTol = gapTol, tol = tol)
+		elif len(coupling['rows']) == 1:
+			return withGap(*_bisection(stack, coupling, tol, maxIter, mu0), coupling, gapTol = gapTol, tol = tol)
+		else:
+			return withGap(*_subgradient(stack, coupling, tol, maxIter, noneInit(step0, mu0)), coupling, gapTol = gapTol, tol = tol)
+	finally:
+		solver.close()
+
+def _bisection(stack, coupling, tol, maxIter, mu0):
+	""" Returns the solution and the best Lagrangian bound. """
+	lo, hi = np.zeros(1), np.full(1, float(mu0))
+	solLo = stack(lo)
+	gLo = violation(coupling, solLo)[0]
+	if gLo <= tol:
+		return solLo, solLo['lagrangian']
+	solHi = stack(hi)
+	dual = max(solLo['lagrangian'], solHi['lagrangian'])
+	while violation(coupling, solHi)[0] > tol:
+		lo, solLo, hi = hi, solHi, 2*hi
+		solHi = stack(hi)
+		dual = max(dual, solHi['lagrangian'])
+		maxIter -= 1
+		if maxIter < 0:
+			raise RuntimeError("Could not find a price that satisfies the coupling constraint.")
+	for i in range(maxIter):
+		if hi[0]-lo[0] <= tol * max(1, hi[0]):
+			break
+		mid = (lo+hi)/2
+		solMid = stack(mid)
+		dual = max(dual, solMid['lagrangian'])
+		if violation(coupling, solMid)[0] > tol:
+			lo, solLo = mid, solMid
+		else:
+			hi, solHi = mid, solMid
+	gLo, gHi = violation(coupling, solLo)[0], violation(coupling, solHi)[0]
+	return (solHi if gLo <= tol else combineSols(solLo, solHi, -gHi/(gLo-gHi))), dual
+
+def _subgradient(stack, coupling, tol, maxIter, step0):
+	""" Returns the solution and the best Lagrangian bound. """
+	mu = np.zeros(len(coupling['rows']))
+	avg, dual = None, -np.inf
+	for k in range(1, maxIter+1):
+		sol = stack(mu)
+		dual = max(dual, sol['lagrangian'])
+		avg = sol if avg is None else combineSols(avg, sol, (k-1)/k)
+		g = violation(coupling, sol)
+		if (g <= tol).all() and np.allclose(mu * g, 0, atol = tol):
+			return sol, dual
+		mu = np.maximum(0, mu + step0/np.sqrt(k) * g / max(1, np.linalg.norm(g)))
+	avg['ineqlin']['marginals'][coupling['rows']] = -mu
+	return avg, dual
@@ -0,0 +1,95 @@
+from lpEnergyModels.base import *
+from lpEnergyModels.profiling import profile
+from scipy import sparse
+
+def _idxDtype(n):
+	return np.int32 if n < np.iinfo(np.int32).max else np.int64
+
+def sparseBytes(A):
+	""" Bytes used by the arrays of a scipy.sparse array in coo, csr or csc format. """
+	return A.data.nbytes + (A.row.nbytes + A.col.nbytes if A.format == 'coo' else A.indices.nbytes + A.indptr.nbytes)
+
+class EnergySys(LPSys):
+	"""
+	LPSys that also accepts integer-coded domains:
+	- AMatrix.vIdx and AMatrix.constrIdx can be np.ndarrays with integer positions in the declared domains (self.v, self.eq, self.ub).
+	- Components in self.lp defined over the declared domain itself (the same pd.Index object) are mapped to global indices without index lookups.
+
+	A_eq and A_ub are assembled from the (values, row, column) triplets of each AMatrix block directly into a scipy.sparse array
+	of format self.sparseFormat ('csr' by default, which scipy.optimize.linprog stacks without conversion). No dense matrices are formed.
+	Statistics for each block (shape, nnz, bytes) are stored in self.blockStats when assembled.
+	If self.profiler is a Profiler, compileMaps and compileParams are profiled (kind 'sys').
+	"""
+	def __init__(self, *args, sparseFormat = 'csr', profiler = None, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.sparseFormat = sparseFormat
+		self.blockStats = {}
+		self.profiler = profiler
+
+	def compileMaps(self):
+		with profile(self.profiler, 'sys', 'compileMaps') as event:
+			super().compileMaps()
+			event['size'] = sum(self.len.values())
+
+	def compileParams(self):
+		with profile(self.profiler, 'sys', 'compileParams') as event:
+			out = super().compileParams()
+			event['size'] = out['A_eq'].nnz + out['A_ub'].nnz
+		return out
+
+	def getIdx_vecAttr(self, idx, name, attr):
+		if isinstance(idx, np.ndarray):
+			return self.maps[attr][name].values[idx]
+		elif idx is self.maps[attr][name].index:
+			return self.maps[attr][name].values
+		else:
+			return super().getIdx_vecAttr(idx, name, attr)
+
+	def getGlobalIdx1d(self, name, idx, attr):
+		return self.maps[attr][name][0] if idx is None else self.getIdx_vecAttr(idx, name, attr)
+
+	def sparse_A_eq(self):
+		return self.sparseA('eq')
+
+	def sparse_A_ub(self):
+		return self.sparseA('ub')
+
+	def sparseA(self, attr):
+		""" Assemble self.lp[f'A_{attr}'] as a sparse array. """
+		shape = (self.len[attr], self.len['v'])
+		dtype = _idxDtype(max(shape))
+		triplets = [self.blockTriplets(a, attr, dtype) for a in self.lp[f'A_{attr}']]
+		[self.blockStats.pop(k) for k in [k for k in self.blockStats if k[0] == f'A_{attr}']];
+		self.blockStats.update({(f'A_{attr}', a.name): self.tripletStats(a, attr, t) for a,t in zip(self.lp[f'A_{attr}'], triplets)})
+		values, rows, cols = (np.concatenate(x) for x in zip(*triplets)) if triplets else (np.empty(0), np.empty(0, dtype = dtype), np.empty(0, dtype = dtype))
+		return sparse.coo_array((values, (rows, cols)), shape = shape).asformat(self.sparseFormat)
+
+	def blockTriplets(self, a, attr, dtype = np.int64):
+		""" (values, rows, cols) arrays for AMatrix a. """
+		return (np.atleast_1d(np.asarray(a.values, dtype = float)),
+				np.atleast_1d(self.getConstrIdx(a, attr)).astype(dtype, copy = False),
+				np.atleast_1d(self.getVIdx(a)).astype(dtype, copy = False))
+
+	def tripletStats(self, a, attr, triplets):
+		return {'v': a.v, 'constr': a.constr,
+				'shape': (self.domLen(getattr(self, attr)[a.constr]), self.domLen(self.v[a.v])),
+				'nnz': len(triplets[0]), 'bytes': sum(x.nbytes for x in triplets), 'format': 'coo'}
+
+	@staticmethod
+	def domLen(dom):
+		return 1 if dom is None else len(dom)
+
+	def memoryReport(self):
+		""" pd.DataFrame with shape, nnz and bytes of each A-block (as COO triplets), the assembled sparse matrices, and the dense vectors in self.out. """
+		blocks = pd.DataFrame.from_dict(self.blockStats, orient = 'index')
+		out = pd.DataFrame.from_dict({('out', k): self.outStats(v) for k,v in self.out.items() if v is not None}, orient = 'index')
+		df = pd.concat([blocks, out])
+		df.index = pd.MultiIndex.from_tuples(df.index, names = ['component','name'])
+		df['density'] = df['nnz'] / df['shape'].map(np.prod)
+		return df
+
+	@staticmethod
+	def outStats(x):
+		if sparse.issparse(x):
+			return {'shape': x.shape, 'nnz': x.nnz, 'bytes': sparseBytes(x), 'format': x.format}
+		return {'shape': np.shape(x), 'nnz': np.count_nonzero(x), 'bytes': np.asarray(x).nbytes, 'format': 'dense'}
@@ -0,0 +1,254 @@
+""" Vectorized kernels for the helper functions of the energy models (mc, fuelCost, fuelConsumption, emissionsFuel, plantEmissionIntensity, avgGenPrice, unitGenC, mEV).
+
+Kernels (np*) work on dense arrays over integer-coded domains with a leading scenario axis (of length 1 for symbols that do not vary across scenarios); missing elements are NaN.
+The pandas functions (mc, fuelCost, ...) have the signatures of the functions in mBasic/mBasicInt (mBasicShell/mBasicIntShell) and evaluate all grid points in one call:
+Inputs may be gridded, i.e. defined over levels in addition to their domains (e.g. taxEm over ('l','idxEm') as in docs/Shocks.ipynb; the extra levels are added
+to the output index), or DataFrames with scenarios in columns (e.g. from lazyLoopAsDFs; the output has the same columns). Inputs that cannot be coded
+(inconsistent grids, duplicate index entries, non-default sumOver) are passed on to the pandas implementations (pd*).
+"""
+from lpEnergyModels.lazyBase import np, pd, noneInit, pdSum
+
+### Pandas implementations
+
+def pdFuelCost(pFuel, uEm, taxEm):
+	return pFuel.add(pdSum((uEm * taxEm).dropna(), 'idxEm'), fill_value=0)
+
+def pdMc(uFuel, VOM, pFuel, uEm, taxEm):
+	return pdSum((uFuel * pdFuelCost(pFuel, uEm, taxEm)).dropna(), 'idxF').add(VOM, fill_value=0)
+
+def pdHrSum(x, scale, sumOver = 'idxHr'):
+	return scale * pdSum(x, sumOver) if np.isscalar(scale) else pdSum((x * scale).dropna(), sumOver)
+
+def pdFuelConsumption(generation, uFuel, scale = None, sumOver = 'idxGen'):
+	return pdSum((generation * uFuel).dropna(), sumOver) if scale is None else pdHrSum((generation * uFuel).dropna(), scale, sumOver)
+
+def pdEmissionsFuel(fuelCons, uEm, sumOver = 'idxF'):
+	return pdSum((fuelCons * uEm).dropna(), sumOver)
+
+def pdPlantEmissionIntensity(uFuel, uEm):
+	return (uFuel * uEm).groupby(['idxGen','idxEm']).sum()
+
+def pdUnitGenLRC(FOM, INVC):
+	return FOM.add(INVC, fill_value=0)
+
+def pdUnitGenC(mcHr, FOM, INVC, generation, genCap, scale):
+	return (pdHrSum(mcHr * generation, scale)/(1000 * genCap)).add(pdUnitGenLRC(FOM, INVC), fill_value=0)
+
+def pdAvgGenPrice(generation, pHr, sumOver = 'idxHr', hrWeight = None):
+	return pdSum(pHr * generation, sumOver) / pdSum(generation, sumOver) if hrWeight is None else pdSum(pHr * generation * hrWeight, sumOver) / pdSum(generation * hrWeight, sumOver)
+
+def pdMEV(λGeneration, uHrGenCap, FOM, INVC, genCap, scale):
+	return (scale * pdSum(- λGeneration * uHrGenCap, 'idxHr')/1000 ).sub(pdUnitGenLRC(FOM, INVC), fill_value=0)
+
+### Array kernels
+
+def nan0(a):
+	return np.where(np.isnan(a), 0, a)
+
+def psum(subscripts, *arrays):
+	""" np.einsum over the terms where all arrays are non-missing; NaN where there is no such term (as pdSum((a*b).dropna(), ...)). """
+	n = np.einsum(subscripts, *((~np.isnan(a)).astype(float) for a in arrays))
+	return np.where(n > 0, np.einsum(subscripts, *(nan0(a) for a in arrays)), np.nan)
+
+def addFill(a, b):
+	""" a+b where missing elements count as 0 if the other element is non-missing (as pd.Series.add(fill_value = 0)). """
+	return np.where(np.isnan(a), b, np.where(np.isnan(b), a, a+b))
+
+def npFuelCost(pFuel, uEm, taxEm):
+	""" pFuel (S,F), uEm (S,F,E), taxEm (S,E) -> (S,F). """
+	return addFill(pFuel, psum('...fe,...e->...f', uEm, taxEm))
+
+def npMc(uFuel, VOM, pFuel, uEm, taxEm):
+	""" uFuel (S,F,G), VOM (S,G) -> (S,G). """
+	return addFill(psum('...fg,...f->...g', uFuel, npFuelCost(pFuel, uEm, taxEm)), VOM)
+
+def npFuelConsumption(generation, uFuel, scale = None):
+	""" generation (S,G) or hourly (S,H,G) summed with scale (scalar or hour weights (S,H)) -> (S,F). """
+	if generation.ndim == uFuel.ndim-1:
+		return psum('...g,...fg->...f', generation, uFuel)
+	return np.multiply(noneInit(scale, 1), psum('...hg,...fg->...f', generation, uFuel)) if np.ndim(scale) == 0 else psum('...hg,...fg,...h->...f', generation, uFuel, scale)
+
+def npEmissionsFuel(fuelCons, uEm):
+	""" fuelCons (S,F), uEm (S,F,E) -> (S,E). """
+	return psum('...f,...fe->...e', fuelCons, uEm)
+
+def npPlantEmissionIntensity(uFuel, uEm):
+	""" uFuel (S,F,G), uEm (S,F,E) -> (S,G,E). """
+	return psum('...fg,...fe->...ge', uFuel, uEm)
+
+def npUnitGenC(mcHr, FOM, INVC, generation, genCap, scale):
+	""" mcHr, generation (S,H,G), FOM, INVC, genCap (S,G), scale scalar or hour weights (S,H) -> (S,G). """
+	src = scale * nan0(mcHr * generation).sum(axis = -2) if np.ndim(scale) == 0 else psum('...hg,...hg,...h->...g', mcHr, generation, scale)
+	with np.errstate(divide = 'ignore', invalid = 'ignore'):
+		return addFill(src/(1000 * genCap), addFill(FOM, INVC))
+
+def npAvgGenPrice(generation, pHr, hrWeight = None, total = False):
+	""" generation (S,H,G), pHr and hrWeight (S,H) -> (S,G), or (S,) if total. """
+	w = generation if hrWeight is None else generation * hrWeight[..., None]
+	axis = (-2,-1) if total else -2
+	with np.errstate(divide = 'ignore', invalid = 'ignore'):
+		return nan0(pHr[..., None] * w).sum(axis = axis) / nan0(w).sum(axis = axis)
+
+def npMEV(λGeneration, uHrGenCap, FOM, INVC, scale):
+	""" λGeneration, uHrGenCap (S,H,G), FOM, INVC (S,G) -> (S,G). """
+	return addFill(scale * nan0(-λGeneration * uHrGenCap).sum(axis = -2)/1000, -addFill(FOM, INVC))
+
+### Coding of pandas inputs
+
+class _NotCoded(Exception):
+	pass
+
+def isSymbol(x):
+	return isinstance(x, (pd.Series, pd.DataFrame))
+
+def gridOf(x, dims):
+	""" Scenario axis of x: ('columns', columns) for DataFrames, ('levels', index) for series with levels not in dims, None otherwise. """
+	if isinstance(x, pd.DataFrame):
+		return ('columns', x.columns)
+	extra = [k for k in x.index.names if k not in dims]
+	return ('levels', x.index.droplevel([k for k in x.index.names if k in dims]).unique().sort_values()) if extra else None
+
+def commonGrid(args):
+	grids = [gridOf(x, dims) for x, dims in args if isSymbol(x)]
+	grids = [g for g in grids if g is not None]
+	if any(g[0] != grids[0][0] or not g[1].equals(grids[0][1]) or not g[1].is_unique for g in grids[1:]):
+		raise _NotCoded
+	return grids[0] if grids else None
+
+def domains(args):
+	""" Sorted union of the labels of each domain in the symbols in args. """
+	labels = {}
+	for x, dims in args:
+		if isSymbol(x):
+			[labels.setdefault(k, []).append(x.index.unique(level = k)) for k in dims if k in x.index.names];
+	return {k: pd.Index(np.unique(np.hstack([v.values for v in vs])), name = k) for k,vs in labels.items()}
+
+def levelCodes(index, k, idx):
+	""" Position in idx of level k of index. """
+	if isinstance(index, pd.MultiIndex):
+		i = index.names.index(k)
+		return idx.get_indexer(index.levels[i])[index.codes[i]]
+	return idx.get_indexer(index)
+
+def dense(x, dims, doms, grid):
+	""" Array of shape (S, len(doms[d]) for d in dims) from x; S = 1 if x is not gridded. """
+	if not isSymbol(x):
+		return x
+	if any(k not in x.index.names for k in dims) or not x.index.is_unique:
+		raise _NotCoded
+	pos = tuple(levelCodes(x.index, k, doms[k]) for k in dims)
+	shape = tuple(len(doms[k]) for k in dims)
+	g = gridOf(x, dims)
+	if g is None:
+		a = np.full((1,)+shape, np.nan)
+		a[(0,)+pos] = x.values
+	elif g[0] == 'columns':
+		a = np.full((len(x.columns),)+shape, np.nan)
+		a[(slice(None),)+pos] = x.values.T
+	else:
+		a = np.full((len(grid[1]),)+shape, np.nan)
+		a[(grid[1].get_indexer(x.index.droplevel(list(dims))),)+pos] = x.values
+	return a
+
+def labeled(a, dims, doms, grid, dropna = True):
+	""" pandas object from array a of shape (S, len(doms[d]) for d in dims): Series over dims (and the grid levels), DataFrame with the grid columns or a scalar. """
+	a = np.asarray(a, dtype = float)
+	if not dims:
+		return float(a.reshape(-1)[0]) if grid is None else pd.Series(a.reshape(-1), index = grid[1])
+	idx = pd.MultiIndex.from_product([doms[k] for k in dims]) if len(dims) > 1 else doms[dims[0]]
+	vals = a.reshape(len(a), -1)
+	if grid is None:
+		s = pd.Series(vals[0], index = idx)
+	elif grid[0] == 'columns':
+		s = pd.DataFrame(vals.T, index = idx, columns = grid[1])
+		return s.dropna(how = 'all') if dropna else s
+	else:
+		g = grid[1]
+		levels = [idx.get_level_values(i) for i in range(idx.nlevels)]+[g.get_level_values(i) for i in range(g.nlevels)]
+		reps = [np.repeat(np.arange(len(idx)), len(g)), np.tile(np.arange(len(g)), len(idx))]
+		s = pd.Series(vals.T.reshape(-1), index = pd.MultiIndex.from_arrays([l[reps[0]] for l in levels[:idx.nlevels]]+[l[reps[1]] for l in levels[idx.nlevels:]]))
+	return s.dropna() if dropna else s
+
+def vectorized(kernel, args, outDims, dropna = True, **kwargs):
+	""" Evaluate kernel on the coded args (list of (x, dims)); kwargs are passed on as they are. """
+	grid, doms = commonGrid(args), domains(args)
+	if any(k not in doms for k in outDims):
+		raise _NotCoded
+	return labeled(kernel(*(dense(x, dims, doms, grid) for x,dims in args), **kwargs), outDims, doms, grid, dropna = dropna)
+
+def withFallback(f, fallback):
+	""" Call f(); call fallback() if the inputs cannot be coded. """
+	try:
+		return f()
+	except _NotCoded:
+		return fallback()
+
+### pandas functions
+
+def fuelCost(pFuel, uEm, taxEm):
+	"""
+	 - 'pFuel' (fuel price) is defined over 'idxF' (fuel index). Default unit: €/GJ.
+	 - 'uEm' (emission intensity) is defined over 'idxF','idxEm' (emission index). Default unit: Ton emission/GJ fuel input.
+	 - 'taxEm' (tax on emissions) is defined over 'idxEm' (emission index). Default unit: €/ton emission output.
+	"""
+	return withFallback(lambda: vectorized(npFuelCost, [(pFuel, ('idxF',)), (uEm, ('idxF','idxEm')), (taxEm, ('idxEm',))], ('idxF',)),
+						lambda: pdFuelCost(pFuel, uEm, taxEm))
+
+def mc(uFuel, VOM, pFuel, uEm, taxEm):
+	"""
+	- 'uFuel': Fuelmix is defined over 'idxF', 'idxGen' (generator index). Default unit: GJ input/GJ output.
+	- 'VOM': variable operating and maintenance costs is defined over 'idxGen'. Default unit: €/GJ output.
+	"""
+	return withFallback(lambda: vectorized(npMc, [(uFuel, ('idxF','idxGen')), (VOM, ('idxGen',)), (pFuel, ('idxF',)), (uEm, ('idxF','idxEm')), (taxEm, ('idxEm',))], ('idxGen',)),
+						lambda: pdMc(uFuel, VOM, pFuel, uEm, taxEm))
+
+def fuelConsumption(generation, uFuel, scale = None, sumOver = 'idxGen'):
+	"""
+	Fuel consumption across 'idxF' from generation over 'idxGen' (scale = None) or yearly fuel consumption from hourly generation over 'idxHr','idxGen'
+	(sumOver = ['idxGen','idxHr'], scale is a scalar or hour weights over 'idxHr'; see mBasicIntShell.hrSum).
+	"""
+	hourly = scale is not None and set(np.atleast_1d(sumOver)) == {'idxGen','idxHr'}
+	if not (hourly or (scale is None and sumOver == 'idxGen')):
+		return pdFuelConsumption(generation, uFuel, scale = scale, sumOver = sumOver)
+	args = [(generation, ('idxHr','idxGen') if hourly else ('idxGen',)), (uFuel, ('idxF','idxGen'))]
+	return withFallback(lambda: vectorized(npFuelConsumption, args+([(scale, ('idxHr',))] if isSymbol(scale) else []), ('idxF',), **({} if isSymbol(scale) else {'scale': scale})),
+						lambda: pdFuelConsumption(generation, uFuel, scale = scale, sumOver = sumOver))
+
+def emissionsFuel(fuelCons, uEm, sumOver = 'idxF'):
+	"""
+	- 'fuelCons': fuel input defined over 'idxF'. Default unit: GJ.
+	 - 'uEm' (emission intensity) is defined over 'idxF','idxEm' (emission index). Default unit: Ton emission/GJ fuel input.
+	"""
+	if sumOver != 'idxF':
+		return pdEmissionsFuel(fuelCons, uEm, sumOver = sumOver)
+	return withFallback(lambda: vectorized(npEmissionsFuel, [(fuelCons, ('idxF',)), (uEm, ('idxF','idxEm'))], ('idxEm',)),
+						lambda: pdEmissionsFuel(fuelCons, uEm))
+
+def plantEmissionIntensity(uFuel, uEm):
+	"""
+	- 'uFuel': Fuelmix is defined over 'idxF', 'idxGen' (generator index). Default unit: GJ input/GJ output.
+	 - 'uEm' (emission intensity) is defined over 'idxF','idxEm' (emission index). Default unit: Ton emission/GJ fuel input.
+	"""
+	return withFallback(lambda: vectorized(npPlantEmissionIntensity, [(uFuel, ('idxF','idxGen')), (uEm, ('idxF','idxEm'))], ('idxGen','idxEm')),
+						lambda: pdPlantEmissionIntensity(uFuel, uEm))
+
+def unitGenC(mcHr, FOM, INVC, generation, genCap, scale):
+	""" Yearly, annualized costs in 1000€ / (GJ/hours generating capacity). scale is a scalar or hour weights over 'idxHr'. """
+	args = [(mcHr, ('idxHr','idxGen')), (FOM, ('idxGen',)), (INVC, ('idxGen',)), (generation, ('idxHr','idxGen')), (genCap, ('idxGen',))]
+	return withFallback(lambda: vectorized(npUnitGenC, args+[(scale, ('idxHr',))], ('idxGen',), dropna = False),
+						lambda: pdUnitGenC(mcHr, FOM, INVC, generation, genCap, scale))
+
+def avgGenPrice(generation, pHr, sumOver = 'idxHr', hrWeight = None):
+	""" Average price €/GJ received for different generators (sumOver = 'idxHr') or in total (sumOver = ['idxHr','idxGen']). hrWeight: Optional hour weights over 'idxHr'. """
+	total = set(np.atleast_1d(sumOver)) == {'idxHr','idxGen'}
+	if not (total or sumOver == 'idxHr'):
+		return pdAvgGenPrice(generation, pHr, sumOver = sumOver, hrWeight = hrWeight)
+	args = [(generation, ('idxHr','idxGen')), (pHr, ('idxHr',))]+([] if hrWeight is None else [(hrWeight, ('idxHr',))])
+	return withFallback(lambda: vectorized(npAvgGenPrice, args, () if total else ('idxGen',), dropna = False, total = total),
+						lambda: pdAvgGenPrice(generation, pHr, sumOver = sumOver, hrWeight = hrWeight))
+
+def mEV(λGeneration, uHrGenCap, FOM, INVC, genCap, scale):
+	""" Marginal economic value from marginal increase in capacity by 1 GJ/hour, defined over 'idxGen'. Default unit: 1000€/(GJ/hour generating capacity).
+	With hour weights, the objective weights hours relative to scale, so λGeneration already includes the relative weight of each hour. """
+	return withFallback(lambda: vectorized(npMEV, [(λGeneration, ('idxHr','idxGen')), (uHrGenCap, ('idxHr','idxGen')), (FOM, ('idxGen',)), (INVC, ('idxGen',))], ('idxGen',), dropna = False, scale = scale),
+						lambda: pdMEV(λGeneration, uHrGenCap, FOM, INVC, genCap, scale))
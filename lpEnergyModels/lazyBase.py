@@ -0,0 +1,50 @@
+"""
+Names of lpEnergyModels.base for modules that should not load symMaps on import. numpy, pandas and pyDbs are imported with this module;
+symMaps (which imports scipy.optimize) is imported on first use of its names (e.g. lazyBase.LPSys or from lpEnergyModels.lazyBase import LPSys).
+Modules that import only the names they need (e.g. from lpEnergyModels.lazyBase import np, pd, pdSum) thus do not load symMaps.
+"""
+import importlib, itertools, numpy as np, pandas as pd
+from collections.abc import Iterable
+from pyDbs import adj, adjMultiIndex, ExcelSymbolLoader, Broadcast, Gpy, Gpy_, GpySet, GpyVariable, GpyScalar, GpyDict, SimpleDB
+from pyDbs import cartesianProductIndex as CPI
+string_types = str
+
+_lazy = {'symMaps': ('symMaps', None)} | {k: ('symMaps', k) for k in ('Lag', 'Lead', 'Roll', 'AMatrix', 'AMDict', 'LPSys', 'ModelShell', 'loopUnpackToDFs')}
+
+def __getattr__(name):
+	""" Import lazily loaded names on first use. """
+	if name not in _lazy:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	module, attr = _lazy[name]
+	value = globals()[name] = importlib.import_module(module) if attr is None else getattr(importlib.import_module(module), attr)
+	return value
+
+def noneInit(x,FallBackVal):
+	return FallBackVal if x is None else x
+
+def is_iterable(arg):
+	return isinstance(arg, Iterable) and not isinstance(arg, string_types)
+
+def getIndex(symbol):
+	""" Defaults to None if no index is defined. """
+	if hasattr(symbol, 'index'):
+		return symbol.index
+	elif isinstance(symbol, pd.Index):
+		return symbol
+	elif not is_iterable(symbol):
+		return None
+
+def reorder(v, order=None):
+	return v.reorder_levels(noneInit(order, sorted(getIndex(v).names))) if isinstance(getIndex(v), pd.MultiIndex) else v
+
+def pdGb(x, by):
+	if not is_iterable(by):
+		by = [by]
+	gb = [k for k in x.index.names if k not in by]
+	return x.groupby(gb) if gb else x
+
+def pdSum(x,sumby):
+	return pdGb(x, sumby).sum() if isinstance(x.index, pd.MultiIndex) else sum(x)
+
+__all__ = ['itertools', 'np', 'pd', 'Iterable', 'string_types', 'adj', 'adjMultiIndex', 'ExcelSymbolLoader', 'Broadcast', 'Gpy', 'Gpy_', 'GpySet', 'GpyVariable', 'GpyScalar',
+			'GpyDict', 'SimpleDB', 'CPI', 'noneInit', 'is_iterable', 'getIndex', 'reorder', 'pdGb', 'pdSum']+list(_lazy)
@@ -0,0 +1,49 @@
+from lpEnergyModels.base import *
+import math, os
+from concurrent.futures import ProcessPoolExecutor
+
+# Worker state. Each worker process receives the compiled model once (through the pool initializer) and reuses it for all chunks it is assigned.
+_worker = {}
+
+def chunkIdx(idxLoop, nChunks):
+	""" Split idxLoop into (at most) nChunks contiguous chunks. The order of idxLoop is preserved within and across chunks. """
+	size = math.ceil(len(idxLoop)/max(1, nChunks))
+	return [idxLoop[i:i+size] for i in range(0, len(idxLoop), size)] if size else []
+
+def _initWorker(m, grids):
+	_worker['m'], _worker['grids'] = m, grids
+
+def _solveChunk(chunk, kwargs):
+	""" Solve all grid points in chunk with the model stored in the worker. Returns list of (l, solution) in the order of the chunk. """
+	return solveChunk(_worker['m'], _worker['grids'], chunk, **kwargs)
+
+def solveChunk(m, grids, chunk, **kwargs):
+	""" Serial loop over chunk using ModelShell.lazyLoop_l (update db symbols, compile, solve, postSolve). """
+	return [(l, m.lazyLoop_l(grids, l, chunk, **kwargs)) for l in chunk]
+
+def defaultWorkers():
+	return len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+
+def parallelLoop(m, grids, idxLoop, nWorkers = None, nChunks = None, parallel = True, mp_context = None, **kwargs):
+	"""
+	Parallel version of ModelShell.lazyLoop.
+	- m: Compiled model. The model is pickled and shipped once to each worker process (including the compiled self.sys.out).
+	- grids: pd.Series or list of pd.Series defined over idxLoop (e.g. from adjMultiIndex.addGrid).
+	- nWorkers: Number of worker processes. Defaults to number of available cores.
+	- nChunks: Number of chunks idxLoop is split into. Defaults to nWorkers (one contiguous chunk per worker).
+	- parallel: If False --> solve chunks in the current process (serial fallback used to validate results).
+	- kwargs: Passed to EnergyShell.lazyLoop_l (outputs, kwCompile, kwSolve, kwPostSolve). With outputs = [...], workers compute and return only the listed outputs.
+	Returns dictionary of solutions ordered as idxLoop, independent of the order in which workers finish.
+	"""
+	nWorkers = min(noneInit(nWorkers, defaultWorkers()), len(idxLoop))
+	chunks = chunkIdx(idxLoop, noneInit(nChunks, nWorkers))
+	if parallel and nWorkers > 1:
+		with ProcessPoolExecutor(max_workers = nWorkers, mp_context = mp_context, initializer = _initWorker, initargs = (m, grids)) as pool:
+			sols = dict(itertools.chain.from_iterable(pool.map(_solveChunk, chunks, itertools.repeat(kwargs))))
+	else:
+		sols = dict(itertools.chain.from_iterable(solveChunk(m, grids, chunk, **kwargs) for chunk in chunks))
+	return {l: sols[l] for l in idxLoop}
+
+def parallelLoopAsDFs(m, grids, idxLoop, **kwargs):
+	""" Stacked DataFrames/Series as returned by ModelShell.lazyLoopAsDFs. """
+	return loopUnpackToDFs(parallelLoop(m, grids, idxLoop, **kwargs), idxLoop)
@@ -0,0 +1,231 @@
+""" The models of mBasicInt on EnergyShell (incremental compilation, lazy solutions, loops, hour weights etc.; see shell.EnergyShell). The model equations are those of mBasicInt. """
+from lpEnergyModels.base import *
+from lpEnergyModels import mBasicInt, npEngine, kernels
+from lpEnergyModels.shell import EnergyShell
+from lpEnergyModels.kernels import mc, fuelCost, emissionsFuel, plantEmissionIntensity, unitGenC, avgGenPrice, mEV
+from lpEnergyModels.memo import memoized
+_adjF = adj.rc_pd
+
+def mcHr(uFuel, VOM, pFuel, uEm, taxEm, idxHr):
+	return Broadcast.seriesToIdx(mc(uFuel, VOM, pFuel, uEm, taxEm), idxHr)
+
+def uHrGenCap(uHrCap, idxGen2HVTGen):
+	""" Hourly capacity factors uHrCap mapped from variation types to generators ('idxHr','idxGen'). """
+	return Broadcast.seriesToIdx(uHrCap, idxGen2HVTGen).droplevel('idxHVTGen')
+
+def hrSum(x, scale, sumOver = 'idxHr'):
+	""" Yearly level of hourly x summed over 'sumOver'. scale is a scalar (all hours have the same weight) or hour weights defined over 'idxHr'. """
+	return scale * pdSum(x, sumOver) if np.isscalar(scale) else pdSum((x * scale).dropna(), sumOver)
+
+def fuelConsumption(generation, uFuel, scale, sumOver = ['idxGen','idxHr']):
+	""" Yearly fuel consumption in GJ across 'idxF'. scale maps to yearly levels. For instance, a model featuring 24 hours uses scale = 8760/24. With representative hours, scale is the hour weights over 'idxHr'. """
+	return kernels.fuelConsumption(generation, uFuel, scale = scale, sumOver = sumOver)
+
+def unitGenSRC(mcHr, generation, genCap, scale):
+	""" Yearly short run costs per unit of installed generating capacity. Unit: (1000€ /(GJ/hour generating capacity) / year)"""
+	return hrSum(mcHr * generation, scale)/(1000 * genCap)
+
+def unitGenLRC(FOM, INVC):
+	""" Yearly, annualized costs in 1000€ / (GJ/hour generating capacity)"""
+	return (FOM.add(INVC, fill_value=0))
+
+def utilGenCap(generation, genCap, idxHr, hrWeight = None):
+	""" Theoretical capacity factor ∈ [0,1]. hrWeight: Optional hour weights over 'idxHr'. """
+	return pdSum(generation,'idxHr')/(len(idxHr) * genCap) if hrWeight is None else hrSum(generation, hrWeight)/(hrWeight.sum() * genCap)
+
+def utilGenCapHVT(generation, genCapHr, hrWeight = None):
+	""" 'Practical' capacity factor ∈[0,1]. ≥ theoretical cap. factor. hrWeight: Optional hour weights over 'idxHr'. """
+	return pdSum(generation, 'idxHr')/pdSum(genCapHr, 'idxHr') if hrWeight is None else hrSum(generation, hrWeight)/hrSum(genCapHr, hrWeight)
+
+def RESShare(generation, demand, idxRES, scale = 1):
+	""" Share of yearly demand covered by generators in idxRES. scale: Scalar or hour weights over 'idxHr' (see hrSum). """
+	return hrSum(generation[generation.index.get_level_values('idxGen').isin(idxRES)], scale, ['idxHr','idxGen']) / hrSum(demand, scale, ['idxHr','idxCons'])
+
+
+class MBasicInt(EnergyShell, mBasicInt.MBasicInt):
+	auxKeys = ('mcHr', 'genCapHr', 'loadHr')
+
+	@property
+	def emCapScale(self):
+		""" Yearly emissions (output 'emissions') per unit of the emission cap 'emCap' (hours enter the cap with relative weights hrWeight/scale). """
+		return self.scale
+
+	@property
+	def hrWeight(self):
+		""" Hours per year represented by each hour in idxHr (symbol 'hrWeight', e.g. from self.aggregateHours). None if all hours have the weight self.scale. """
+		return self.db('hrWeight') if 'hrWeight' in self.db else None
+
+	@property
+	def hrScale(self):
+		""" Scale from hourly to yearly levels: Scalar self.scale or hour weights. """
+		return noneInit(self.hrWeight, self.scale)
+
+	def hrWeighted(self, s, v):
+		""" Objective coefficients s over self.sys.v[v] multiplied by the relative hour weights hrWeight/scale (unchanged without hour weights). """
+		if self.hrWeight is None:
+			return s
+		ω = self.hrWeight/self.scale
+		if s.index is self.sys.v[v]:
+			return npEngine.fullDomain(s.values * np.repeat(npEngine.dense1d(ω, self.db('idxHr')), len(s)//len(self.db('idxHr'))), s.index)
+		return reorder(s * ω, order = self.sys.v[v].names)
+
+	def hrWeightedA(self, name, attr):
+		""" Multiply coefficients in self.sys.lp[f'A_{attr}'][name] by the relative hour weights hrWeight/scale of the hours of their variables (unchanged without hour weights). """
+		if self.hrWeight is None:
+			return
+		A, idxHr = self.sys.lp[f'A_{attr}'][name], self.db('idxHr')
+		ω = npEngine.dense1d(self.hrWeight/self.scale, idxHr)
+		hr = npEngine.codes(idxHr, A.vIdx.get_level_values('idxHr')) if isinstance(A.vIdx, pd.Index) else np.asarray(A.vIdx) // (len(self.sys.v[A.v]) // len(idxHr))
+		A.values = np.asarray(A.values, dtype = float) * ω[hr]
+
+	@property
+	def netLoadHr(self):
+		""" Hourly load capacity less available generating capacity, defined over 'idxHr'. """
+		return pdSum(Broadcast.seriesToIdx(self.db('uHrLoad'), self.db('idxCons2HVTCons')).droplevel('idxHVTCons') * self.db('load'), 'idxCons') - pdSum(self.aux_uHrGenCap * self.db('genCap'), 'idxGen')
+
+	def aggregateHours(self, k, method = 'kmeans', **kwargs):
+		""" Replace hourly profiles in the database with k representative hours and weights 'hrWeight'; see timeAgg.aggregateHours. Method 'duration' sorts hours by self.netLoadHr. """
+		from lpEnergyModels import timeAgg
+		agg = timeAgg.aggregateHours(self.db('uHrCap'), self.db('uHrLoad'), k, method = method, **({'score': self.netLoadHr} if method == 'duration' else {}) | kwargs)
+		[self.db.__setitem__(name, agg[name]) for name in ('idxHr','uHrCap','uHrLoad','hrWeight')];
+		return agg
+
+	@property
+	@memoized
+	def aux_mcHr(self):
+		return reorder(mcHr(self.db('uFuel'), self.db('VOM'), self.db('pFuel'), self.db('uEm'), self.db('taxEm'), self.db('idxHr')), order = self.sys.v['generation'].names)
+
+	@property
+	@memoized
+	def aux_genCapHr(self):
+		return reorder(self.aux_uHrGenCap * self.db('genCap'), order = self.sys.v['generation'].names)
+
+	@property
+	@memoized
+	def aux_uHrGenCap(self):
+		return uHrGenCap(self.db('uHrCap'), self.db('idxGen2HVTGen'))
+
+	@property
+	@memoized
+	def aux_loadHr(self):
+		return reorder(Broadcast.seriesToIdx(self.db('uHrLoad'), self.db('idxCons2HVTCons')).droplevel('idxHVTCons') * self.db('load'), order = self.sys.v['demand'].names)
+
+	# NumPy engine (engine = 'numpy'): Hourly symbols are built as (idxHr, idxGen)/(idxHr, idxCons) arrays in the order of self.sys.v.
+	# The arrays are memoized; the series are built over the current self.sys.v domains.
+	@property
+	def npAux_mcHr(self):
+		return npEngine.fullDomain(self.npMcHr, self.sys.v['generation'])
+
+	@property
+	@memoized
+	def npMcHr(self):
+		return np.tile(np.nan_to_num(npEngine.dense1d(mc(self.db('uFuel'), self.db('VOM'), self.db('pFuel'), self.db('uEm'), self.db('taxEm')), self.db('idxGen'))), len(self.db('idxHr')))
+
+	@property
+	def npAux_genCapHr(self):
+		return npEngine.fullDomain(self.npUHrGenCap * npEngine.dense1d(self.db('genCap'), self.db('idxGen')), self.sys.v['generation'])
+
+	@property
+	@memoized
+	def npUHrGenCap(self):
+		return npEngine.hrProfile(self.db('uHrCap'), self.db('idxHr'), self.db('idxGen'), self.db('idxGen2HVTGen'), self.db('idxHVTGen'))
+
+	@property
+	def npAux_loadHr(self):
+		return npEngine.fullDomain(self.npUHrLoad * npEngine.dense1d(self.db('load'), self.db('idxCons')), self.sys.v['demand'])
+
+	@property
+	@memoized
+	def npUHrLoad(self):
+		return npEngine.hrProfile(self.db('uHrLoad'), self.db('idxHr'), self.db('idxCons'), self.db('idxCons2HVTCons'), self.db('idxHVTCons'))
+
+	def initArgs_v(self):
+		""" self.sys.v dictionary"""
+		self.sys.v.update({'generation': self.hrDomain('idxGen'), 'demand': self.hrDomain('idxCons')})
+
+	@memoized
+	def hrDomain(self, idx):
+		""" Domain ('idxHr', idx) of hourly variables. Memoized, so compiles with unchanged indices reuse the same domain objects. """
+		return pd.MultiIndex.from_product([self.db('idxHr'), self.db(idx)])
+
+	def initArgsV_generation(self):
+		self.sys.lp['c'][('mc', 'generation')] = self.hrWeighted(self.db('mcHr'), 'generation') # assumes that mcHr is defined over index ('idxHr','idxGen')
+		self.sys.lp['u'][('genCap', 'generation')] = self.db('genCapHr') # assumes that genCapHr is defined over index ('idxHr','idxGen')
+
+	def initArgsV_demand(self):
+		self.sys.lp['c'][('mwp', 'demand')] = self.hrWeighted(reorder(-Broadcast.seriesToIdx(self.db('mwp'), self.sys.v['demand']), order = self.sys.v['demand'].names), 'demand')
+		self.sys.lp['u'][('loadCap', 'demand')] = self.db('loadHr')
+
+	def npInitArgsV_demand(self):
+		self.sys.lp['c'][('mwp', 'demand')] = self.hrWeighted(npEngine.fullDomain(-np.tile(np.nan_to_num(npEngine.dense1d(self.db('mwp'), self.db('idxCons'))), len(self.db('idxHr'))), self.sys.v['demand']), 'demand')
+		self.sys.lp['u'][('loadCap', 'demand')] = self.db('loadHr')
+
+	def npInitArgsEq_equilibrium(self):
+		nHr, nGen, nCons = len(self.db('idxHr')), len(self.db('idxGen')), len(self.db('idxCons'))
+		self.sys.lp['A_eq']['eq2Gen'] = AMatrix('eq2Gen', values = np.ones(nHr*nGen), v = 'generation', constr = 'equilibrium', vIdx = np.arange(nHr*nGen), constrIdx = np.repeat(np.arange(nHr), nGen))
+		self.sys.lp['A_eq']['eq2Dem'] = AMatrix('eq2Dem', values = -np.ones(nHr*nCons), v = 'demand', constr = 'equilibrium', vIdx = np.arange(nHr*nCons), constrIdx = np.repeat(np.arange(nHr), nCons))
+
+	def postSolve(self, sol, **kwargs):
+		""" Derived outputs are computed on first access (see LazySolution). Database symbols are read here, so later changes to self.db do not affect them. """
+		solDict = super().postSolve(sol)
+		uFuel, uEm, genCap, genCapHr, mcHr, FOM, INVC, idxHr = (self.db(k) for k in ('uFuel','uEm','genCap','genCapHr','mcHr','FOM','INVC','idxHr'))
+		scale, hrScale, hrWeight, uCapHr = self.scale, self.hrScale, self.hrWeight, self.aux_uHrGenCap
+		solDict['surplus'] = -sol['fun']
+		solDict.lazy('fuelCons', lambda s: fuelConsumption(s['generation'], uFuel, hrScale))
+		solDict.lazy('emissions', lambda s: emissionsFuel(s['fuelCons'], uEm))
+		solDict.lazy('utilGenCap', lambda s: utilGenCap(s['generation'], genCap, idxHr, hrWeight = hrWeight))
+		solDict.lazy('utilGenCapHVT', lambda s: utilGenCapHVT(s['generation'], genCapHr, hrWeight = hrWeight))
+		solDict.lazy('unitGenCapCosts', lambda s: unitGenC(mcHr, FOM, INVC, s['generation'], genCap, hrScale))
+		solDict.lazy('pHr', lambda s: s['λeq_equilibrium'] if hrWeight is None else s['λeq_equilibrium'] / (hrWeight/scale)) # marginal prices = marginal system costs
+		solDict.lazy('pAvg', lambda s: avgGenPrice(s['generation'], s['pHr'], sumOver = ['idxHr','idxGen'], hrWeight = hrWeight))
+		solDict.lazy('pAvgGen', lambda s: avgGenPrice(s['generation'], s['pHr'], sumOver = 'idxHr', hrWeight = hrWeight))
+		solDict.lazy('downlift', lambda s: s['pAvg']-s['pAvgGen'])
+		solDict.lazy('mEV', lambda s: mEV(s['λu_generation'], uCapHr, FOM, INVC, genCap, scale))
+		return solDict
+
+
+class MBasicIntEmCap(MBasicInt, mBasicInt.MBasicIntEmCap):
+	@property
+	@memoized
+	def emIntensity(self):
+		""" Emission intensity of generators over 'idxGen','idxEm' (see plantEmissionIntensity). """
+		return plantEmissionIntensity(self.db('uFuel'),self.db('uEm'))
+
+	def initArgsUb_emCap(self):
+		self.sys.lazyA('emCap2Gen', series = self.emIntensity,  v = 'generation', constr = 'emCap',attr='ub')
+		self.hrWeightedA('emCap2Gen', 'ub')
+		self.sys.lp['b_ub'][('emCap','emCap')] = self.db('emCap')
+
+	def npInitArgsUb_emCap(self):
+		nHr, nGen = len(self.db('idxHr')), len(self.db('idxGen'))
+		intensity = npEngine.dense2d(self.emIntensity, self.db('idxGen'), self.db('idxEm'))
+		gen, em = np.nonzero(~np.isnan(intensity))
+		self.sys.lp['A_ub']['emCap2Gen'] = AMatrix('emCap2Gen', values = np.tile(intensity[gen, em], nHr), v = 'generation', constr = 'emCap', 
+													vIdx = (np.arange(nHr)[:,None] * nGen + gen).ravel(), constrIdx = np.tile(em, nHr))
+		self.hrWeightedA('emCap2Gen', 'ub')
+		self.sys.lp['b_ub'][('emCap','emCap')] = self.db('emCap')
+
+class MBasicIntRES(MBasicInt, mBasicInt.MBasicIntRES):
+
+	@memoized
+	def RESGenIdx(self, CO2Idx = 'CO2'):
+		""" See mBasicInt.MBasicIntRES """
+		return mBasicInt.MBasicIntRES.RESGenIdx(self, CO2Idx = CO2Idx)
+
+	def initArgsUb_RES(self):
+		""" See mBasicInt.MBasicIntRES; hours enter with relative weights hrWeight/scale. """
+		mBasicInt.MBasicIntRES.initArgsUb_RES(self)
+		[self.hrWeightedA(k, 'ub') for k in ('RES2Gen','RES2Dem')];
+
+	def npInitArgsUb_RES(self):
+		nHr, nGen, nCons = len(self.db('idxHr')), len(self.db('idxGen')), len(self.db('idxCons'))
+		vIdx = (np.arange(nHr)[:,None] * nGen + npEngine.codes(self.db('idxGen'), self.RESGenIdx())).ravel()
+		self.sys.lp['A_ub']['RES2Gen'] = AMatrix('RES2Gen', values = -np.ones(len(vIdx)), v = 'generation', constr = 'RES', vIdx = vIdx)
+		self.sys.lp['A_ub']['RES2Dem'] = AMatrix('RES2Dem', values = np.full(nHr*nCons, self.db('RESCap'), dtype = float), v = 'demand', constr = 'RES', vIdx = np.arange(nHr*nCons))
+		[self.hrWeightedA(k, 'ub') for k in ('RES2Gen','RES2Dem')];
+
+	def postSolve(self, sol, **kwargs):
+		solDict = super().postSolve(sol, **kwargs)
+		idxRES, hrScale = self.RESGenIdx(), self.hrScale
+		solDict.lazy('RESShare', lambda s: RESShare(s['generation'], s['demand'], idxRES, hrScale))
+		return solDict
@@ -0,0 +1,62 @@
+""" The models of mBasic on EnergyShell (incremental compilation, lazy solutions, loops etc.; see shell.EnergyShell). The model equations are those of mBasic. """
+from lpEnergyModels.base import *
+from lpEnergyModels import mBasic, kernels
+from lpEnergyModels.shell import EnergyShell
+from lpEnergyModels.kernels import fuelCost, mc, emissionsFuel, plantEmissionIntensity
+from lpEnergyModels.memo import memoized
+_adjF = adj.rc_pd
+
+# The functions of mBasic (fuelCost, mc, emissionsFuel and plantEmissionIntensity are vectorized over scenario grids; see kernels):
+def fuelConsumption(generation, uFuel, sumOver='idxGen'):
+	""" See mBasic """
+	return kernels.fuelConsumption(generation, uFuel, sumOver = sumOver)
+
+def RESShare(generation, demand, idxRES):
+	""" Share of demand covered by generators in idxRES. """
+	return generation[generation.index.isin(idxRES)].sum() / demand.sum()
+
+class MBasic(EnergyShell, mBasic.MBasic):
+	auxKeys = ('mc',)
+
+	@property
+	def emCapScale(self):
+		""" Emissions (output 'emissions') per unit of the emission cap 'emCap'. """
+		return 1
+
+	@property
+	@memoized
+	def aux_mc(self):
+		return mc(self.db('uFuel'), self.db('VOM'), self.db('pFuel'), self.db('uEm'), self.db('taxEm'))
+
+	def postSolve(self, sol, **kwargs):
+		solDict = super().postSolve(sol)
+		solDict['surplus'] = -sol['fun']
+		uFuel, uEm = self.db('uFuel'), self.db('uEm')
+		solDict.lazy('fuelCons', lambda s: fuelConsumption(s['generation'], uFuel))
+		solDict.lazy('emissions', lambda s: emissionsFuel(s['fuelCons'], uEm))
+		return solDict
+
+class MBasicEmCap(MBasic, mBasic.MBasicEmCap):
+
+	@property
+	@memoized
+	def emIntensity(self):
+		""" Emission intensity of generators over 'idxGen','idxEm' (see plantEmissionIntensity). """
+		return plantEmissionIntensity(self.db('uFuel'),self.db('uEm'))
+
+	def initArgsUb_emCap(self):
+		self.sys.lazyA('emCap2Gen', series = self.emIntensity,  v = 'generation', constr = 'emCap',attr='ub')
+		self.sys.lp['b_ub'][('emCap','emCap')] = self.db('emCap')
+
+class MBasicRES(MBasic, mBasic.MBasicRES):
+
+	@memoized
+	def RESGenIdx(self, CO2Idx = 'CO2'):
+		""" See mBasic.MBasicRES """
+		return mBasic.MBasicRES.RESGenIdx(self, CO2Idx = CO2Idx)
+
+	def postSolve(self, sol, **kwargs):
+		solDict = super().postSolve(sol, **kwargs)
+		idxRES = self.RESGenIdx()
+		solDict.lazy('RESShare', lambda s: RESShare(s['generation'], s['demand'], idxRES))
+		return solDict
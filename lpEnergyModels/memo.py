@@ -0,0 +1,74 @@
+""" Memoization of derived symbols (aux_* properties, derived indices): Values are cached with the db symbols they read and reused until one of these changes. """
+from collections import OrderedDict
+import functools, inspect
+from lpEnergyModels.trackedDB import fingerprint
+
+class Memo:
+	"""
+	Bounded cache of values computed from a TrackedDB (the least recently used entries are dropped beyond maxsize entries):
+	- An entry stores the value, its fingerprint and the fingerprints of the db symbols read while computing it (see TrackedDB.trace and
+	  trackedDB.fingerprint: a hash of the values and the identity of the index).
+	- An entry is reused as long as all symbols it read have the same content. Writes to the db (m.db[...] = ..., aom, del) and in-place changes
+	  (e.g. m.db('uEm').iloc[:] = 0) thus only invalidate the entries that read the changed symbols. Comparing content also separates the temporary
+	  symbols of batch.scenarioState from the current db.
+	- Cached values are shared between calls (e.g. aux symbols written to the db); an entry whose value was changed in place is recomputed.
+	- On a hit, the symbols read by the entry are recorded in the active traces of the db (as if the value was computed), such that
+	  EnergyShell.runStage/runAux record the same dependencies.
+	"""
+	def __init__(self, maxsize = 128):
+		self.maxsize, self.entries = maxsize, OrderedDict()
+		self.hits, self.misses = 0, 0
+
+	def __getstate__(self):
+		""" Entries are not pickled. """
+		return self.__dict__ | {'entries': OrderedDict()}
+
+	def __len__(self):
+		return len(self.entries)
+
+	@staticmethod
+	def state(db, name):
+		return db.fingerprint(name) if name in db.symbols else None
+
+	def valid(self, db, entry):
+		value, fp, reads = entry
+		return all(self.state(db, k) == v for k,v in reads.items()) and fingerprint(value) == fp
+
+	def __call__(self, db, key, f):
+		""" Return f() memoized under key. """
+		if key in self.entries and self.valid(db, self.entries[key]):
+			self.entries.move_to_end(key)
+			self.hits += 1
+			db.recordReads(self.entries[key][2])
+			return self.entries[key][0]
+		self.misses += 1
+		with db.trace() as reads:
+			value = f()
+		self.entries[key] = (value, fingerprint(value), {k: self.state(db, k) for k in reads})
+		self.entries.move_to_end(key)
+		[self.entries.popitem(last = False) for i in range(len(self.entries)-self.maxsize)];
+		return value
+
+	def invalidate(self, names):
+		""" Drop the entries that read any of the db symbols in names. """
+		[self.entries.pop(key) for key in [key for key,(v, fp, reads) in self.entries.items() if reads.keys() & set(names)]];
+
+	def clear(self):
+		self.entries.clear()
+
+def memoized(f):
+	"""
+	Decorator for methods of EnergyShell: self.f(*args, **kwargs) is memoized in self.memo under (f.__name__, args) where args are the bound arguments
+	(with defaults applied), such that e.g. self.f(), self.f('CO2') and self.f(CO2Idx = 'CO2') share one entry; computed as it is if self.memo is None.
+	Values are passed through self.shared (shared domain indices in compact mode) before they are cached.
+	"""
+	signature = inspect.signature(f)
+	@functools.wraps(f)
+	def wrapper(self, *args, **kwargs):
+		compute = lambda: self.shared(f(self, *args, **kwargs))
+		if self.memo is None:
+			return compute()
+		bound = signature.bind(self, *args, **kwargs)
+		bound.apply_defaults()
+		return self.memo(self.db, (f.__name__,)+tuple(bound.arguments.values())[1:], compute)
+	return wrapper
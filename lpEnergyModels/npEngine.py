@@ -0,0 +1,30 @@
+""" Helper functions for the NumPy compile engine: Symbols are mapped to dense arrays over integer-coded domains. Missing elements are NaN. """
+from lpEnergyModels.lazyBase import np, pd
+
+def codes(idx, values):
+	""" Integer positions of values in idx (-1 if not in idx). """
+	return idx.get_indexer(values)
+
+def dense1d(s, idx):
+	""" Array over idx from series defined over idx. """
+	return s.reindex(idx).values.astype(float)
+
+def dense2d(s, idx0, idx1):
+	""" Array of shape (len(idx0), len(idx1)) from series defined over (idx0, idx1). """
+	i0, i1 = codes(idx0, s.index.get_level_values(idx0.name)), codes(idx1, s.index.get_level_values(idx1.name))
+	keep = (i0 >= 0) & (i1 >= 0)
+	a = np.full((len(idx0), len(idx1)), np.nan)
+	a[i0[keep], i1[keep]] = s.values[keep]
+	return a
+
+def mapCodes(idx, mapping, idxType):
+	""" Position in idxType for each element in idx, using a many-to-one mapping (pd.MultiIndex over idx.name, idxType.name). -1 if not mapped."""
+	return codes(idxType, pd.Series(mapping.get_level_values(idxType.name), index = mapping.get_level_values(idx.name)).reindex(idx).values)
+
+def hrProfile(uHr, idxHr, idx, mapping, idxType):
+	""" Array of shape (len(idxHr), len(idx)) with hourly profiles uHr[idxHr, idxType] mapped to idx. """
+	return np.hstack([dense2d(uHr, idxHr, idxType), np.full((len(idxHr),1), np.nan)])[:, mapCodes(idx, mapping, idxType)] # column -1 is NaN for unmapped elements
+
+def fullDomain(values, idx):
+	""" pd.Series over the declared domain idx; values is an array in the order of idx (e.g. flattened (idxHr, idxGen) array from pd.MultiIndex.from_product). """
+	return pd.Series(np.ravel(values), index = idx)
@@ -0,0 +1,69 @@
+""" Presolve: Remove variables that are fixed at zero and constraint rows without entries before the LP is passed to the solver. """
+from lpEnergyModels.base import *
+from scipy import optimize, sparse
+
+class Presolve:
+	"""
+	Reduce the LP in sys.out before it is solved and map the solution back to the full LP:
+	- Variables with bounds (0, 0) are removed (e.g. generation of solar in hours with uHrCap = 0, generators with genCap = 0 and
+	  consumers with loadHr = 0), together with their entries in A_eq/A_ub.
+	- Constraint rows without entries are removed if they are satisfied (b_eq = 0 and b_ub >= 0; infeasible rows are kept for the solver to report).
+	self.expand maps the solution back: Removed variables are zero with reduced costs c-A'λ as bound marginals, removed rows have zero duals.
+	Reduced matrices are cached as long as A_eq/A_ub and the removed variables/rows are unchanged, such that warm-started solvers can update the LP in place.
+	"""
+	def __init__(self):
+		self.cache = {}
+
+	def __getstate__(self):
+		""" Cached matrices are not pickled. """
+		return self.__dict__ | {'cache': {}}
+
+	def reduce(self, out):
+		""" Reduced LP; self.cols, self.rows hold the positions of the kept variables and rows in out. """
+		fixed = (out['bounds'][:,0] == 0) & (out['bounds'][:,1] == 0)
+		self.cols, self.removed = np.flatnonzero(~fixed), np.flatnonzero(fixed)
+		keep = {k: self.keepRows(out, k, fixed) for k in ('eq','ub')}
+		self.rows = keep
+		self.stats = {'cols': (len(self.cols), len(fixed))} | {k: (len(v), 0 if out[f'b_{k}'] is None else len(out[f'b_{k}'])) for k,v in keep.items() if v is not None}
+		return {'c': out['c'][self.cols], 'bounds': out['bounds'][self.cols]} | {k: v for t in ('eq','ub') for k,v in self.reduceBlock(out, t, fixed).items()}
+
+	def keepRows(self, out, t, fixed):
+		if out[f'A_{t}'] is None:
+			return None
+		nnz = self.columnSlice(out[f'A_{t}'], fixed, t)[1]
+		b = np.asarray(out[f'b_{t}'], dtype = float)
+		return np.flatnonzero((nnz > 0) | (b != 0 if t == 'eq' else b < 0))
+
+	def columnSlice(self, A, fixed, t):
+		""" A without the columns of fixed variables and the number of entries in each row (cached). """
+		key = ('cols', t)
+		if key not in self.cache or self.cache[key][0] is not A or not np.array_equal(self.cache[key][1], fixed):
+			Ac = sparse.csr_array(A)[:, ~fixed]
+			self.cache[key] = (A, fixed, Ac, np.diff(Ac.indptr))
+		return self.cache[key][2:]
+
+	def reduceBlock(self, out, t, fixed):
+		if out[f'A_{t}'] is None:
+			return {f'A_{t}': None, f'b_{t}': None}
+		rows, key = self.rows[t], ('rows', t)
+		Ac = self.columnSlice(out[f'A_{t}'], fixed, t)[0]
+		if key not in self.cache or self.cache[key][0] is not Ac or not np.array_equal(self.cache[key][1], rows):
+			self.cache[key] = (Ac, rows, Ac[rows, :] if len(rows) < Ac.shape[0] else Ac)
+		A = self.cache[key][2]
+		return {f'A_{t}': A if A.shape[0] else None, f'b_{t}': np.asarray(out[f'b_{t}'], dtype = float)[rows] if A.shape[0] else None}
+
+	def expand(self, sol, out):
+		""" Solution to the full LP in out from the solution to the reduced LP (in the format of scipy.optimize.linprog). """
+		n = len(out['c'])
+		x, lower, upper = np.zeros(n), np.zeros(n), np.zeros(n)
+		x[self.cols], lower[self.cols], upper[self.cols] = sol['x'], sol['lower']['marginals'], sol['upper']['marginals']
+		duals = {t: self.expandDuals(sol, out, t) for t in ('eq','ub')}
+		d = out['c'][self.removed] - sum(out[f'A_{t}'].T @ duals[t] for t in ('eq','ub') if out[f'A_{t}'] is not None)[self.removed]
+		lower[self.removed], upper[self.removed] = np.where(d >= 0, d, 0), np.where(d < 0, d, 0)
+		return optimize.OptimizeResult(sol | {'x': x, 'eqlin': {'marginals': duals['eq']}, 'ineqlin': {'marginals': duals['ub']}, 'lower': {'marginals': lower}, 'upper': {'marginals': upper}})
+
+	def expandDuals(self, sol, out, t):
+		full = np.zeros(0 if out[f'b_{t}'] is None else len(out[f'b_{t}']))
+		if len(full) and len(self.rows[t]):
+			full[self.rows[t]] = sol['eqlin' if t == 'eq' else 'ineqlin']['marginals']
+		return full
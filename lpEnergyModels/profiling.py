@@ -0,0 +1,83 @@
+""" Opt-in profiling of compile stages, solver calls and postSolve outputs. """
+from lpEnergyModels.lazyBase import np, pd, noneInit
+from contextlib import contextmanager, nullcontext
+import time, tracemalloc
+
+def profile(profiler, kind, name):
+	""" Context for one profiled call; yields the event dictionary (a dummy dictionary if profiler is None). """
+	return nullcontext({}) if profiler is None else profiler(kind, name)
+
+def entrySize(x):
+	""" Number of elements in a self.sys.lp entry (Gpy symbol or AMatrix). """
+	from lpEnergyModels.lazyBase import AMatrix # symMaps is loaded lazily (see lazyBase)
+	return int(np.size(x.values if isinstance(x, AMatrix) else x.v))
+
+class Profiler:
+	"""
+	Records one event per profiled call with
+	- 'kind', 'name': Type of call ('maps', 'aux', 'params', 'sys', 'solve', 'postSolve') and name of the stage/output,
+	- 'wall': Wall time in seconds,
+	- 'peakBytes', 'netBytes': If memory, the peak and net memory allocated during the call (tracemalloc; includes nested calls),
+	- 'size': Size of the output (e.g. number of elements written to self.sys.lp by a parameter stage).
+	Each hook is called as hook(event) when an event is recorded. Tracing memory with tracemalloc slows down the profiled code.
+	"""
+	def __init__(self, memory = False, hooks = None):
+		self.memory = memory
+		self.hooks = list(noneInit(hooks, []))
+		self.records = []
+		self._stack = []
+		self._startedTracing = False
+
+	@contextmanager
+	def __call__(self, kind, name):
+		event = {'kind': kind, 'name': name, 'size': None}
+		frame = self._enter() if self.memory else None
+		t0 = time.perf_counter()
+		try:
+			yield event
+		finally:
+			event['wall'] = time.perf_counter()-t0
+			if self.memory:
+				event['peakBytes'], event['netBytes'] = self._exit(frame)
+			self.records.append(event)
+			[hook(event) for hook in self.hooks];
+
+	def _enter(self):
+		if not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self._startedTracing = True
+		current, peak = tracemalloc.get_traced_memory()
+		if self._stack:
+			self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+		tracemalloc.reset_peak()
+		frame = {'start': current, 'peak': current}
+		self._stack.append(frame)
+		return frame
+
+	def _exit(self, frame):
+		self._stack.pop()
+		current, peak = tracemalloc.get_traced_memory()
+		peak = max(frame['peak'], peak)
+		if self._stack:
+			self._stack[-1]['peak'] = max(self._stack[-1]['peak'], peak)
+		elif self._startedTracing:
+			tracemalloc.stop()
+			self._startedTracing = False
+		return peak-frame['start'], current-frame['start']
+
+	def report(self):
+		""" pd.DataFrame with one row per event. """
+		return pd.DataFrame(self.records, columns = ['kind','name','wall','size'] + (['peakBytes','netBytes'] if self.memory else []))
+
+	def summary(self):
+		""" Events aggregated by kind and name: Number of calls, total and maximum wall time, largest size and peak memory. """
+		df = self.report()
+		agg = {'calls': ('wall','count'), 'wall': ('wall','sum'), 'wallMax': ('wall','max'), 'size': ('size','max')} | ({'peakBytes': ('peakBytes','max')} if self.memory else {})
+		return df.groupby(['kind','name'], sort = False).agg(**agg).sort_values('wall', ascending = False)
+
+	def clear(self):
+		self.records = []
+
+	def __getstate__(self):
+		""" Hooks and records are not pickled (e.g. when models are shipped to worker processes). """
+		return self.__dict__ | {'hooks': [], 'records': [], '_stack': [], '_startedTracing': False}
@@ -0,0 +1,157 @@
+""" Streaming of loop results to disk: The outputs of each scenario are appended to a directory of .npy partitions (ResultsSink) and read back by output and scenario (ResultsStore). """
+from lpEnergyModels.lazyBase import itertools, np, pd, noneInit
+from lpEnergyModels.compileCache import encodeIndex, decodeIndex
+import json, os, tempfile
+
+def writeJSON(obj, file):
+	""" Write obj to file through a temporary file that replaces file (a crash leaves either the old or the new file). """
+	fd, tmp = tempfile.mkstemp(dir = os.path.dirname(file), suffix = '.tmp')
+	with os.fdopen(fd, 'w') as f:
+		json.dump(obj, f)
+	os.replace(tmp, file)
+
+class _Files:
+	""" Arrays stored as '{key}.npy' (with '/' replaced by '.') in directory path. """
+	def __init__(self, path, mmap = True):
+		self.path, self.mmap = path, mmap
+
+	def file(self, key):
+		return os.path.join(self.path, f"{key.replace('/','.')}.npy")
+
+	def __getitem__(self, key):
+		return np.load(self.file(key), mmap_mode = 'r' if self.mmap else None, allow_pickle = False)
+
+	def __setitem__(self, key, a):
+		np.save(self.file(key), a, allow_pickle = False)
+
+class ResultsSink:
+	"""
+	Append the outputs of each scenario in a loop to a results store in directory path:
+	- Outputs are buffered for chunkSize scenarios and then written as one partition: For each output an array (scenarios, elements) of type dtype
+	  in '{name}.part{j}.npy', and the scenario labels in 'scenarios.part{j}.*.npy'. The index of each series output is stored once ('{name}.index.*.npy').
+	- meta.json lists the outputs and the written partitions. It is replaced after each partition is written, so a sweep that stops
+	  partway keeps all partitions written before. A sink opened on an existing store resumes it; self.done holds the scenarios in the store.
+	- outputs: Names of the outputs to store (default: all outputs of the first solution).
+	- dtype = 'float32' halves the size of the store, but keeps only ~7 significant digits (e.g. a surplus of 7e7 is stored to within ~4).
+	Memory use is bounded by chunkSize solutions. Series outputs must have the same index in all scenarios.
+	"""
+	def __init__(self, path, chunkSize = 50, dtype = 'float64', outputs = None, names = None):
+		os.makedirs(path, exist_ok = True)
+		self.path, self.chunkSize, self.files = path, chunkSize, _Files(path, mmap = False)
+		self.metaFile = os.path.join(path, 'meta.json')
+		if os.path.exists(self.metaFile):
+			with open(self.metaFile) as f:
+				self.meta = json.load(f)
+		else:
+			self.meta = {'dtype': np.dtype(dtype).str, 'names': list(noneInit(names, [None])), 'outputs': {}, 'order': outputs, 'partitions': []}
+		self.indices = {k: decodeIndex(v['index'], f'{k}/index', self.files) for k,v in self.meta['outputs'].items() if v['type'] == 'series'}
+		self.buffer = []
+
+	@property
+	def done(self):
+		return set(itertools.chain.from_iterable(ResultsStore.partitionLabels(self.meta, j, self.files).tolist() for j in range(len(self.meta['partitions'])))) | {l for l,_ in self.buffer}
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.flush()
+
+	def append(self, l, solDict):
+		""" Add the outputs of scenario l; writes a partition when chunkSize scenarios are buffered. """
+		keys = self.meta['order'] = noneInit(self.meta['order'], list(solDict))
+		self.buffer.append((l, {k: self.encode(k, solDict[k]) for k in keys}))
+		if len(self.buffer) >= self.chunkSize:
+			self.flush()
+
+	def encode(self, k, v):
+		if k not in self.meta['outputs']:
+			if isinstance(v, pd.Series):
+				arrays = {}
+				self.meta['outputs'][k] = {'type': 'series', 'index': encodeIndex(v.index, f'{k}/index', arrays)}
+				[self.files.__setitem__(key, a) for key, a in arrays.items()];
+				self.indices[k] = v.index
+			else:
+				self.meta['outputs'][k] = {'type': 'scalar'}
+		if isinstance(v, pd.Series):
+			if not v.index.equals(self.indices[k]):
+				raise ValueError(f"Index of output '{k}' differs from the index in the first scenario.")
+			return v.values
+		return np.atleast_1d(v)
+
+	def flush(self):
+		""" Write buffered scenarios as a new partition and update meta.json. """
+		if not self.buffer:
+			return
+		j, dtype = len(self.meta['partitions']), np.dtype(self.meta['dtype'])
+		for k in self.meta['order']:
+			self.files[f'{k}/part{j}'] = np.vstack([v[k] for _,v in self.buffer]).astype(dtype)
+		labels, arrays = [l for l,_ in self.buffer], {}
+		scen = pd.MultiIndex.from_tuples(labels, names = self.meta['names']) if len(self.meta['names']) > 1 else pd.Index(labels, name = self.meta['names'][0])
+		self.meta['partitions'].append({'n': len(labels), 'scenarios': encodeIndex(scen, f'scenarios/part{j}', arrays)})
+		[self.files.__setitem__(key, a) for key, a in arrays.items()];
+		writeJSON(self.meta, self.metaFile)
+		self.buffer = []
+
+class ResultsStore:
+	"""
+	Read a results store written by ResultsSink. Arrays are memory-mapped (if mmap), and only the partitions holding the selected scenarios are read.
+	- self.load(name, scenarios = None) returns series outputs as DataFrames over (index, scenarios) and scalar outputs as series over scenarios
+	  (as loopUnpackToDFs), in the dtype of the store.
+	- self(names = None, scenarios = None) returns a dictionary of outputs.
+	"""
+	def __init__(self, path, mmap = True):
+		self.path, self.files = path, _Files(path, mmap = mmap)
+		with open(os.path.join(path, 'meta.json')) as f:
+			self.meta = json.load(f)
+
+	@staticmethod
+	def partitionLabels(meta, j, files):
+		return decodeIndex(meta['partitions'][j]['scenarios'], f'scenarios/part{j}', files)
+
+	@property
+	def symbols(self):
+		return list(self.meta['order'] or [])
+
+	@property
+	def scenarios(self):
+		""" Scenarios in the store (in the order they were written). """
+		parts = [self.partitionLabels(self.meta, j, self.files) for j in range(len(self.meta['partitions']))]
+		return parts[0].append(parts[1:]) if parts else pd.Index([])
+
+	def __iter__(self):
+		return iter(self.symbols)
+
+	def __len__(self):
+		return len(self.symbols)
+
+	def __getitem__(self, name):
+		return self.load(name)
+
+	def load(self, name, scenarios = None):
+		rows, labels = [], []
+		for j in range(len(self.meta['partitions'])):
+			idx = self.partitionLabels(self.meta, j, self.files)
+			pos = np.arange(len(idx)) if scenarios is None else np.flatnonzero(idx.isin(scenarios))
+			if len(pos):
+				rows.append(self.files[f'{name}/part{j}'][pos])
+				labels.append(idx[pos])
+		values = np.vstack(rows) if rows else np.zeros((0, 1), dtype = self.meta['dtype'])
+		labels = labels[0].append(labels[1:]) if labels else pd.Index([])
+		if self.meta['outputs'][name]['type'] == 'scalar':
+			return pd.Series(values[:,0], index = labels, name = name)
+		return pd.DataFrame(values.T, index = decodeIndex(self.meta['outputs'][name]['index'], f'{name}/index', self.files), columns = labels)
+
+	def __call__(self, names = None, scenarios = None):
+		return {k: self.load(k, scenarios = scenarios) for k in noneInit(names, self.symbols)}
+
+def streamLoop(m, grids, idxLoop, path, chunkSize = 50, dtype = 'float64', outputs = None, **kwargs):
+	"""
+	Version of ModelShell.lazyLoop that appends the outputs of each scenario to a results store in directory path (see ResultsSink) rather than
+	collecting them in memory. Scenarios already in the store are skipped, so an interrupted sweep is resumed by calling streamLoop again with the same path.
+	kwargs are passed to EnergyShell.lazyLoop_l (kwCompile, kwSolve, kwPostSolve). Returns a ResultsStore.
+	"""
+	with ResultsSink(path, chunkSize = chunkSize, dtype = dtype, outputs = outputs, names = idxLoop.names) as sink:
+		done = sink.done
+		[sink.append(l, m.lazyLoop_l(grids, l, idxLoop, outputs = sink.meta['order'], **kwargs)) for l in idxLoop if l not in done];
+	return ResultsStore(path)
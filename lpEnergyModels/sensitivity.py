@@ -0,0 +1,368 @@
+""" Sensitivity analysis and ranging from the optimal basis of a solved model. """
+from lpEnergyModels.base import *
+from lpEnergyModels.solvers import HighsSolver, boundsArrays, rowBounds, stackA
+from contextlib import contextmanager
+from scipy import optimize, sparse
+from scipy.sparse.linalg import splu
+
+_kLower, _kBasic, _kUpper, _kZero = 0, 1, 2, 3
+
+def basisStatus(h):
+	""" Column and row basis status (0 = lower, 1 = basic, 2 = upper, 3 = zero) of the HiGHS object h. """
+	basis = h.getBasis()
+	return (np.fromiter(map(int, basis.col_status), dtype = np.int8, count = len(basis.col_status)),
+			np.fromiter(map(int, basis.row_status), dtype = np.int8, count = len(basis.row_status)))
+
+def extended(out):
+	""" LP in sys.out as min cost'z s.t. [A, -I]z = 0, lo <= z <= up, where z = [x; Ax] stacks variables and row activities (rows are [A_ub; A_eq]). """
+	n = len(out['c'])
+	lb, ub = boundsArrays(out['bounds'])
+	rl, ru = rowBounds(out)
+	return {'cost': np.hstack([np.asarray(out['c'], dtype = float), np.zeros(len(rl))]), 'lo': np.hstack([lb, rl]), 'up': np.hstack([ub, ru]),
+			'A': stackA(out, n), 'nUb': len(rl)-len(noneInit(out['b_eq'], []))}
+
+def copyOut(out):
+	""" Copy of the vectors in sys.out (these are patched in place by incremental compiles); matrices are replaced rather than patched. """
+	return {k: v.copy() if isinstance(v, np.ndarray) else v for k,v in out.items()}
+
+def interpolate(out0, out1, t):
+	""" LP with data out0+t*(out1-out0). """
+	return {k: None if out0[k] is None else out0[k]+t*(out1[k]-out0[k]) for k in out0}
+
+def difference(new, old):
+	""" new-old where infinite values that coincide count as unchanged. """
+	with np.errstate(invalid = 'ignore'):
+		return np.where(new == old, 0, new-old)
+
+def stepRange(s, g, zero = 1e-12):
+	""" Elementwise interval of steps t such that s+t*g >= 0 (s >= 0 is clipped at zero; infinite s and |g| <= zero impose no restriction). """
+	s, g = np.maximum(s, 0), np.where(np.abs(g) > zero, g, 0)
+	with np.errstate(divide = 'ignore', invalid = 'ignore'):
+		t = np.where(np.isfinite(s), -s/g, np.nan)
+	return np.where((g > 0) & ~np.isnan(t), t, -np.inf), np.where((g < 0) & ~np.isnan(t), t, np.inf)
+
+def ratioRange(s, g):
+	""" Interval of steps t such that s+t*g >= 0 for all rows; with g of shape (m,k) an interval is returned for each column. """
+	tMin, tMax = stepRange(s, g)
+	return tMin.max(axis = 0, initial = -np.inf), tMax.min(axis = 0, initial = np.inf)
+
+def blocks(idx, m, chunk):
+	""" Split idx into blocks such that dense (m, len(block)) arrays have about chunk elements. """
+	return [b for b in np.array_split(idx, max(1, len(idx)*m//chunk)) if len(b)]
+
+class Basis:
+	"""
+	Factorized basis of an optimal solution to the LP in sys.out (with basis status from HiGHS, see basisStatus).
+	- self.solveAt(out) returns the solution to another LP with the same dimensions if the basis is still optimal (otherwise None),
+	- self.range(out) returns the interval of t such that the basis is optimal for the LP with data self.out+t*(out-self.out) (A fixed),
+	- self.costRanging and self.boundRanging return one-at-a-time ranging of costs and bounds.
+	Solutions are in the format of scipy.optimize.linprog with nit = 0 and analytic = True.
+	"""
+	def __init__(self, out, colStatus, rowStatus, tol = 1e-7):
+		self.A, self.tol = {k: out[k] for k in ('A_eq','A_ub')}, tol
+		self.status = np.hstack([colStatus, rowStatus])
+		self.n, self.m = len(colStatus), len(rowStatus)
+		self.basic = np.flatnonzero(self.status == _kBasic)
+		self.nonbasic = np.flatnonzero(self.status != _kBasic)
+		self.data = extended(out)
+		self.M = self.extendedA(self.data['A'])
+		self.lu = splu(self.M[:, self.basic].tocsc())
+		self.z, self.π, self.d = self.primalDual(self.data, self.M, self.lu)
+
+	def extendedA(self, A):
+		return sparse.hstack([A, -sparse.eye_array(self.m, format = 'csc')], format = 'csc')
+
+	def nonbasicValues(self, lo, up):
+		""" Values of nonbasic variables at the bound indicated by their status (free variables at zero). """
+		status = self.status[self.nonbasic]
+		return np.select([status == _kLower, status == _kUpper], [lo[self.nonbasic], up[self.nonbasic]], 0)
+
+	def primalDual(self, data, M, lu):
+		""" Primal values z, row duals π and reduced costs d for the basis. """
+		z = np.zeros(self.n+self.m)
+		z[self.nonbasic] = self.nonbasicValues(data['lo'], data['up'])
+		z[self.basic] = lu.solve(-(M[:, self.nonbasic] @ z[self.nonbasic]))
+		π = lu.solve(data['cost'][self.basic], trans = 'T')
+		return z, π, data['cost']-M.T @ π
+
+	def signs(self, lo, up):
+		""" Required sign of reduced costs of nonbasic variables: 1 at lower bounds, -1 at upper bounds, 0 if fixed (not restricted) or free (must be zero). """
+		status, fixed = self.status[self.nonbasic], lo[self.nonbasic] == up[self.nonbasic]
+		return np.select([fixed, status == _kLower, status == _kUpper], [0, 1, -1], 0), ~fixed & (status == _kZero)
+
+	def solveAt(self, out):
+		"""
+		Solution to the LP in out if the basis is optimal for it (None otherwise). The basis is refactorized if A_eq/A_ub differ from self.A;
+		None is also returned if the basis is singular for the new A_eq/A_ub (e.g. RESCap = 0 removes demand from the RES row).
+		"""
+		data = extended(out)
+		if len(data['cost']) != len(self.data['cost']):
+			return None
+		if all(out[k] is self.A[k] or HighsSolver.sameMatrix(out[k], self.A[k]) for k in self.A):
+			M, lu = self.M, self.lu
+		else:
+			M = self.extendedA(data['A'])
+			try:
+				lu = splu(M[:, self.basic].tocsc())
+			except RuntimeError: # singular basis
+				return None
+		with np.errstate(all = 'ignore'):
+			z, π, d = self.primalDual(data, M, lu)
+		if not (np.all(np.isfinite(z[self.basic])) and np.all(np.isfinite(π))):
+			return None
+		if self.primalFeasible(z, data['lo'], data['up']) and self.dualFeasible(d, data['lo'], data['up'], data['cost']):
+			return self.solution(z, π, d, data)
+
+	def primalFeasible(self, z, lo, up):
+		zB, loB, upB = z[self.basic], lo[self.basic], up[self.basic]
+		return bool(np.all(zB >= loB-self.tol*(1+np.abs(loB))) and np.all(zB <= upB+self.tol*(1+np.abs(upB))))
+
+	def dualFeasible(self, d, lo, up, cost):
+		sign, free = self.signs(lo, up)
+		d, tol = d[self.nonbasic], self.tol*(1+np.abs(cost[self.nonbasic]))
+		return bool(np.all(sign*d >= -tol) and np.all(~free | (np.abs(d) <= tol)))
+
+	def solution(self, z, π, d, data):
+		x, dx, colStatus = z[:self.n], d[:self.n], self.status[:self.n]
+		return optimize.OptimizeResult(x = x, fun = float(data['cost'][:self.n] @ x), status = 0, success = True, nit = 0, warm = True, analytic = True,
+										ineqlin = {'marginals': π[:data['nUb']]}, eqlin = {'marginals': π[data['nUb']:]},
+										lower = {'marginals': np.where(colStatus == _kLower, dx, 0)}, upper = {'marginals': np.where(colStatus == _kUpper, dx, 0)})
+
+	def direction(self, out):
+		""" Changes in cost, lo, up and A from self.data to the LP in out. """
+		data = extended(out)
+		return {k: difference(data[k], self.data[k]) for k in ('cost','lo','up')} | {'A': data['A']-self.data['A']}
+
+	def slope(self, Δ):
+		""" Change in the objective per unit of t for the LP with data self.out+t*Δ (Δ from self.direction) while the basis is optimal. """
+		return float(Δ['cost'] @ self.z + self.d[self.nonbasic] @ self.nonbasicValues(Δ['lo'], Δ['up']) - self.π @ (Δ['A'] @ self.z[:self.n]))
+
+	def range(self, out):
+		""" Interval (tMin, tMax) such that the basis is optimal for the LP with data self.out+t*(out-self.out); A_eq/A_ub must be unchanged. """
+		Δ = self.direction(out)
+		Δz = np.zeros(self.n+self.m)
+		Δz[self.nonbasic] = self.nonbasicValues(Δ['lo'], Δ['up'])
+		Δz[self.basic] = self.lu.solve(-(self.M[:, self.nonbasic] @ Δz[self.nonbasic]))
+		primal = self.primalRange(Δz, Δ['lo'], Δ['up'])
+		Δd = Δ['cost']-self.M.T @ self.lu.solve(Δ['cost'][self.basic], trans = 'T')
+		dual = self.dualRange(Δd[self.nonbasic])
+		return max(float(primal[0][0]), float(dual[0])), min(float(primal[1][0]), float(dual[1]))
+
+	def primalRange(self, Δz, Δlo, Δup):
+		""" Steps t such that basic variables z+t*Δz stay within bounds lo+t*Δlo and up+t*Δup (Δz is (n+m,) or (n+m,k)); returns arrays with k elements. """
+		b = self.basic
+		z, lo, up, Δlo, Δup = (x[b][:,None] for x in (self.z, self.data['lo'], self.data['up'], Δlo, Δup))
+		Δz = Δz[b].reshape(len(b), -1)
+		(loMin, loMax), (upMin, upMax) = ratioRange(z-lo, Δz-Δlo), ratioRange(up-z, Δup-Δz)
+		return np.maximum(loMin, upMin), np.minimum(loMax, upMax)
+
+	def dualRange(self, Δd):
+		""" Steps t such that reduced costs d+t*Δd of nonbasic variables keep the required sign (Δd is (nonbasic,) or (nonbasic,k)). """
+		sign, free = self.signs(self.data['lo'], self.data['up'])
+		d = self.d[self.nonbasic]
+		if Δd.ndim == 2:
+			sign, free, d = sign[:,None], free[:,None], d[:,None]
+		tMin, tMax = ratioRange(np.where(sign == 0, np.inf, sign*d), sign*Δd)
+		stuck = np.any(free & (np.abs(Δd) > self.tol), axis = 0) # reduced costs of free nonbasic variables must stay at zero
+		return np.where(stuck, 0, tMin), np.where(stuck, 0, tMax)
+
+	def costRanging(self, idx, Δc, chunk = 2**22):
+		"""
+		One-at-a-time ranging of costs of variables idx (positions in x) that change by δ*Δc. Returns arrays (δMin, δMax, slope):
+		The basis is optimal for δ in [δMin, δMax] and the objective then changes by δ*slope.
+		"""
+		idx, Δc = np.asarray(idx), np.broadcast_to(Δc, np.shape(idx)).astype(float)
+		δMin, δMax = np.full(len(idx), -np.inf), np.full(len(idx), np.inf)
+		row = np.full(self.n+self.m, -1)
+		row[self.basic] = np.arange(self.m)
+		isBasic = row[idx] >= 0
+		# nonbasic: the reduced cost changes by δ*Δc
+		nb = np.flatnonzero(~isBasic)
+		sign, free = self.signs(self.data['lo'], self.data['up'])
+		signNb, freeNb = (np.zeros(self.n+self.m), np.zeros(self.n+self.m, dtype = bool))
+		signNb[self.nonbasic], freeNb[self.nonbasic] = sign, free
+		δMin[nb], δMax[nb] = stepRange(np.where(signNb[idx[nb]] == 0, np.inf, signNb[idx[nb]]*self.d[idx[nb]]), signNb[idx[nb]]*Δc[nb])
+		zero = nb[freeNb[idx[nb]]]
+		δMin[zero], δMax[zero] = 0, 0
+		# basic: reduced costs of nonbasic variables change by -δ*Δc*α, where α is the row of the simplex tableau
+		MN = self.M[:, self.nonbasic].tocsc()
+		for block in blocks(np.flatnonzero(isBasic), self.m, chunk):
+			E = np.zeros((self.m, len(block)))
+			E[row[idx[block]], np.arange(len(block))] = Δc[block]
+			δMin[block], δMax[block] = self.dualRange(-(MN.T @ self.lu.solve(E, trans = 'T')))
+		return δMin, δMax, Δc*self.z[idx]
+
+	def boundRanging(self, idx, Δlo, Δup, chunk = 2**22):
+		"""
+		One-at-a-time ranging of bounds of positions idx in z = [x; Ax] that change by δ*Δlo and δ*Δup (e.g. (0,1) for an upper bound,
+		(1,1) for b_eq). Returns arrays (δMin, δMax, slope): The basis is optimal for δ in [δMin, δMax] and the objective then changes by δ*slope.
+		"""
+		idx = np.asarray(idx)
+		Δlo, Δup = (np.broadcast_to(x, idx.shape).astype(float) for x in (Δlo, Δup))
+		status, z, lo, up = self.status[idx], self.z[idx], self.data['lo'][idx], self.data['up'][idx]
+		Δz = np.where(status == _kBasic, 0, np.select([status == _kLower, status == _kUpper], [Δlo, Δup], 0))
+		(loMin, loMax), (upMin, upMax) = stepRange(z-lo, Δz-Δlo), stepRange(up-z, Δup-Δz) # own bounds
+		δMin, δMax = np.maximum(loMin, upMin), np.minimum(loMax, upMax)
+		for block in blocks(np.flatnonzero(Δz), self.m, chunk):
+			ΔzB = np.zeros((self.n+self.m, len(block)))
+			ΔzB[self.basic] = -self.lu.solve(self.M[:, idx[block]].toarray() * Δz[block])
+			bMin, bMax = self.primalRange(ΔzB, np.zeros(self.n+self.m), np.zeros(self.n+self.m))
+			δMin[block], δMax[block] = np.maximum(δMin[block], bMin), np.minimum(δMax[block], bMax)
+		return δMin, δMax, self.d[idx]*Δz
+
+class RangingSolver:
+	"""
+	Solver backend that reuses optimal bases: If one of the last 'memory' optimal bases is still optimal for the LP it is asked to solve
+	(e.g. the next point in a loop over taxEm or fuel prices), the solution is computed from the factorized basis without solving
+	(nit = 0, analytic = True). Otherwise the LP is solved with self.solver (a HighsSolver), and the new basis is factorized.
+	self.stats counts calls and solves.
+	"""
+	name = 'ranging'
+
+	def __init__(self, solver = None, tol = 1e-7, memory = 1):
+		self.solver = noneInit(solver, HighsSolver())
+		self.tol, self.memory = tol, memory
+		self.reset()
+
+	def reset(self):
+		self.solver.reset()
+		self.bases, self.stats = [], {'calls': 0, 'solves': 0}
+
+	def __getstate__(self):
+		""" Factorized bases are not pickled. """
+		return self.__dict__ | {'bases': []}
+
+	def __call__(self, out, solOptions = None):
+		self.stats['calls'] += 1
+		for i, basis in enumerate(self.bases):
+			sol = basis.solveAt(out)
+			if sol is not None:
+				self.bases.insert(0, self.bases.pop(i))
+				return sol
+		self.stats['solves'] += 1
+		sol = self.solver(out, solOptions)
+		if sol['status'] == 0:
+			self.bases = [Basis(out, *basisStatus(self.solver.h), tol = self.tol)]+self.bases[:self.memory-1]
+		return sol
+
+class Sensitivity:
+	"""
+	Sensitivity of the solution of the compiled model m to changes in database symbols, based on the optimal basis:
+	- self.ranging(name): Interval of each element of symbol 'name' (changed one at a time) for which the basis remains optimal,
+	  and the marginal value of the element (change in the objective per unit) within the interval. An element that enters several
+	  LP elements (e.g. genCap of a generator enters the capacity of all hours) moves them jointly.
+	- self.rangeOf(values): Interval of t such that the basis remains optimal when symbols move from their current values towards 'values'
+	  (a dictionary; t = 1 is 'values'), e.g. a shift in taxEm that moves all mcHr.
+	- self.solveAt(values): Solution with symbols set to 'values', computed from the basis if it remains optimal (re-solved otherwise).
+	Changes in symbols are mapped to changes in the LP by compiling the model (incrementally if m.incremental); the database is restored afterwards.
+	Intervals are computed analytically when costs, bounds, b_eq or b_ub change, and by bisection if A_eq/A_ub change (e.g. RESCap).
+	"""
+	def __init__(self, m, tol = 1e-7):
+		self.m = m
+		highs = next((s for s in (m.solver, getattr(m.solver, 'solver', None)) if isinstance(s, HighsSolver)), None) or HighsSolver()
+		self.sol = highs(m.sys.out, m.solOptions)
+		assert self.sol['status'] == 0, "Sensitivity requires an optimal solution."
+		self.out = copyOut(m.sys.out)
+		self.basis = Basis(self.out, *basisStatus(highs.h), tol = tol)
+
+	@contextmanager
+	def shocked(self, values):
+		""" Context with db symbols set to 'values' and the model compiled (auxiliary symbols in values are kept); the database is restored and the model recompiled on exit. """
+		old = {k: self.m.db[k] for k in values}
+		[self.m.db.__setitem__(k, v) for k,v in values.items()];
+		try:
+			self.m.compile(keys = [k for k in self.m.auxKeys if k not in values])
+			yield self.m.sys.out
+		finally:
+			[self.m.db.__setitem__(k, v) for k,v in old.items()];
+			self.m.compile()
+
+	def outAt(self, values):
+		""" Compiled LP (self.m.sys.out) with db symbols set to 'values'. """
+		with self.shocked(values) as out:
+			return copyOut(out)
+
+	def solveAt(self, values, postSolve = True):
+		""" Solution (after self.m.postSolve if postSolve) with db symbols set to 'values'. The model is only re-solved if the basis is not optimal. """
+		with self.shocked(values) as out:
+			sol = self.basis.solveAt(out)
+			sol = self.m.solve() if sol is None else sol
+			return self.m.postSolve(sol) if postSolve else sol
+
+	def rangeOf(self, values, tMax = 2.**20):
+		""" Interval (tMin, tMax) such that the basis is optimal for the LP at symbols (1-t)*current+t*values (assumes the LP is linear in the symbols). """
+		return self.rangeOut(self.outAt(values), tMax = tMax)
+
+	def rangeOut(self, out, tMax = 2.**20):
+		""" Interval (tMin, tMax) such that the basis is optimal for the LP self.out+t*(out-self.out). """
+		if all(self.basis.A[k] is out[k] or HighsSolver.sameMatrix(self.basis.A[k], out[k]) for k in self.basis.A):
+			return self.basis.range(out)
+		return tuple(self.bisect(out, sign, tMax = tMax) for sign in (-1, 1))
+
+	def bisect(self, out, sign, tMax = 2.**20, rtol = 1e-6):
+		""" Largest step sign*t (found by bisection) such that the basis is optimal for the LP at self.out+t*sign*(out-self.out). """
+		optimal = lambda t: self.basis.solveAt(interpolate(self.out, out, sign*t)) is not None
+		lo, hi = 0., 1.
+		while optimal(hi):
+			if hi >= tMax:
+				return sign*np.inf
+			lo, hi = hi, 2*hi
+		while hi-lo > rtol*(1+lo):
+			lo, hi = ((lo+hi)/2, hi) if optimal((lo+hi)/2) else (lo, (lo+hi)/2)
+		return sign*lo
+
+	def ranging(self, name):
+		"""
+		pd.DataFrame with the current value, the lower and upper values for which the basis remains optimal, and the marginal value
+		(change in the objective per unit) of each element of symbol 'name'. Elements are changed one at a time:
+		- Symbols defined over the domain of the variables/constraints they enter (e.g. mcHr, genCapHr, loadHr, emCap) are ranged from the basis
+		  directly. Elements are indexed by the domain (symbols that enter several domains are stacked with the domain as an outer index level).
+		- Elements that enter several LP elements (e.g. genCap over idxGen enters the capacities of all hours, taxEm the costs of all generators) are
+		  shifted with all the LP elements they enter (see self.rangeOf); this compiles the model once per element. Elements are indexed as the symbol.
+		- Symbols that enter A_eq/A_ub (e.g. RESCap) are shifted with all elements by the same amount; the frame has one row indexed by the symbol name.
+		"""
+		value = self.m.db(name)
+		out = self.outAt({name: value+1})
+		Δ = self.basis.direction(out)
+		if Δ['A'].count_nonzero():
+			tMin, tMax = self.rangeOut(out)
+			return pd.DataFrame({'value': value, 'lower': value+tMin, 'upper': value+tMax, 'marginal': self.basis.slope(Δ)}, index = pd.Index([name], name = 'symbol'))
+		cost, bound = np.flatnonzero(Δ['cost']), np.flatnonzero((Δ['lo'] != 0) | (Δ['up'] != 0))
+		if not self.oneToOne(value, np.union1d(cost, bound)):
+			return self.jointRanging(name, value)
+		if len(cost) and len(bound):
+			raise ValueError(f"Symbol '{name}' changes both costs and bounds/constraints; use self.rangeOf.")
+		ranges = self.basis.costRanging(cost, Δ['cost'][cost]) if len(cost) else self.basis.boundRanging(bound, Δ['lo'][bound], Δ['up'][bound])
+		frames = {k: self.rangingFrame(value, pos, *ranges) for k,pos in self.domains(cost if len(cost) else bound).items()}
+		return frames.popitem()[1] if len(frames) == 1 else pd.concat(frames, names = ['domain'])
+
+	def oneToOne(self, value, idx):
+		""" True if each element of value enters one element of the LP (positions idx in z = [x; Ax]), i.e. value is defined over the domains it enters. """
+		if np.ndim(value) == 0:
+			return len(idx) == 1
+		return all(set(index.names) == set(value.index.names) for index, pos in self.domains(idx).values())
+
+	def jointRanging(self, name, value):
+		""" Ranging of elements of symbol 'name' that each enter several LP elements: Element i is shifted by δ, moving all LP elements it enters. """
+		index = pd.Index([name], name = 'symbol') if np.ndim(value) == 0 else value.index
+		rows = []
+		for i in range(len(index)):
+			shift = 1 if np.ndim(value) == 0 else pd.Series(np.arange(len(index)) == i, index = index, dtype = float)
+			out = self.outAt({name: value+shift})
+			rows.append((*self.rangeOut(out), self.basis.slope(self.basis.direction(out))))
+		tMin, tMax, slope = (np.array(x) for x in zip(*rows))
+		v = np.full(len(index), value) if np.ndim(value) == 0 else value.values
+		return pd.DataFrame({'value': v, 'lower': v+tMin, 'upper': v+tMax, 'marginal': slope}, index = index)
+
+	def domains(self, idx):
+		""" Positions in idx (positions in z = [x; Ax]) grouped by the domain of the variable or constraint; returns {name: (index, positions in idx)}. """
+		offsets = {'v': 0, 'ub': self.basis.n, 'eq': self.basis.n+self.basis.data['nUb']}
+		loc = pd.Series(np.arange(len(idx)), index = idx)
+		return {name: (s.index[hit], loc.values[loc.index.get_indexer(s.values[hit]+offsets[attr])])
+				for attr in offsets for name, s in self.m.sys.maps[attr].items() if (hit := np.isin(s.values+offsets[attr], idx)).any()}
+
+	@staticmethod
+	def rangingFrame(value, pos, δMin, δMax, slope):
+		index, i = pos
+		v = pd.Series(value, index = index) if np.ndim(value) == 0 else pd.Series(reorder(value, order = index.names).reindex(index).values, index = index)
+		return pd.DataFrame({'value': v, 'lower': v+δMin[i], 'upper': v+δMax[i], 'marginal': slope[i]}, index = index)
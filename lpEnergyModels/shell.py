@@ -0,0 +1,363 @@
+from lpEnergyModels.base import *
+import os
+from contextlib import contextmanager
+from lpEnergyModels.trackedDB import TrackedDB
+from lpEnergyModels.energySys import EnergySys
+from lpEnergyModels.solution import LazySolution
+from lpEnergyModels.profiling import profile, entrySize
+# Feature modules (solvers, presolve, sensitivity, decompose, loops, ...) are imported in the methods that use them.
+
+class EnergyShell(ModelShell):
+	"""
+	ModelShell with methods shared by the energy models in this package. Used as a mixin before a model class, e.g.
+	class MBasicInt(EnergyShell, mBasicInt.MBasicInt) in mBasicIntShell: The model defines the stages (initArgs_*, aux_*, initArgsV_*, ...)
+	and EnergyShell the compile, solve and postSolve routines that dispatch them. Auxiliary symbols self.aux_{k} for k in self.auxKeys are
+	updated by self.updateAux.
+
+	Incremental compilation:
+	- The database is a TrackedDB that versions each symbol. Stages dispatched through self.runStage/self.runAux
+	  (initArgs_*, aux_*, initArgsV_*, initArgsEq_*, initArgsUb_*) record the db symbols they read in self.stages,
+	  and self.stageOutputs records the self.sys.lp entries each parameter stage writes.
+	- If self.incremental (default False), self.compile only reruns stages that read symbols that changed since the last compile,
+	  and patches the affected slices of self.sys.out. Changes to symbols read when defining domains (initArgs_*)
+	  trigger a full compile. Symbols changed in place (e.g. m.db('genCap').iloc[0] = 0) are found by comparing content fingerprints
+	  taken at the last compile (see TrackedDB.sync). With updateAux, auxiliary symbols are recomputed if their inputs changed or if they
+	  were overwritten, as in a full compile.
+
+	Compile engines:
+	- engine = 'pandas' (default) builds parameters from pandas series using symMaps.LPSys broadcasting.
+	- engine = 'numpy' uses stages named np{Stage} (e.g. npAux_mcHr, npInitArgsEq_equilibrium) where they are defined. These
+	  build parameters as dense arrays over integer-coded domains and produce the same self.sys.out.
+
+	Compile cache:
+	- cache (a CompileCache or a directory) stores compiled systems on disk. The first compile of a model looks for an entry matching the
+	  model class and the current database and loads it instead of compiling; otherwise the compiled system is stored.
+	  A model loaded from the cache has no self.sys.lp entries, so its next compile is a full compile.
+
+	Solutions:
+	- self.postSolve returns a LazySolution: Variables and shadow values are mapped eagerly, derived outputs are computed on first access.
+	- Loops (self.lazyLoop, self.lazyLoopAsDFs, self.parallelLoop, self.batchLoop) accept outputs = [...] to compute and return only the listed outputs.
+
+	Batched loops:
+	- self.batchLoop/self.batchLoopAsDFs compile batchSize scenarios at a time, stack them in one block-diagonal LP and solve it once.
+	  This is faster than self.lazyLoop for small LPs (e.g. MBasic, MBasicInt with few hours); with postSolve = False, batchLoopAsDFs
+	  unpacks variables and shadow values of all scenarios at once.
+
+	Streaming results:
+	- self.streamLoop(grids, idxLoop, path) appends the outputs of each scenario to a store of .npy partitions on disk (float64 by default)
+	  instead of keeping them in memory, and resumes interrupted sweeps. The returned results.ResultsStore reads selected outputs and scenarios.
+
+	Solver backends:
+	- solver = 'auto' (default) solves single LPs (self.solve) from scratch with scipy.optimize.linprog (solvers.ScipySolver), as ModelShell.solve.
+	  Loops and sweeps (self.lazyLoop, self.parallelLoop, self.batchLoop, self.streamLoop, self.solveDecomposed) solve with self.loopSolver: a persistent
+	  HiGHS LP (solvers.HighsSolver, requires highspy; ScipySolver if it is not installed) that is updated in place and warm-started from the
+	  previous basis when only c, bounds or b_eq/b_ub change. With ties (several optimal solutions), the two may return different optimal dispatches.
+	- solver = 'highs', 'scipy' or a solver instance is used for all solves.
+	- solver = sensitivity.RangingSolver() computes solutions from the last optimal basis as long as it remains optimal and only solves
+	  when a change leaves the range of the basis.
+
+	Presolve:
+	- presolve = True (default False) removes variables fixed at zero (e.g. solar generation at night, zero capacities or loads) and constraint
+	  rows left without entries before the LP is solved; solutions and duals are mapped back to the full LP (see presolve.Presolve).
+
+	Memoization:
+	- memo = True (default False) caches derived symbols (aux_* properties, derived indices such as RESGenIdx) in self.memo (a memo.Memo) with
+	  fingerprints of the content of the db symbols they read. Changes to self.db (including in-place changes) only invalidate the entries that
+	  read the changed symbols, so repeated compile/postSolve cycles on unchanged inputs reuse them. Pass memo = Memo(maxsize) to bound the cache differently.
+
+	Compact mode:
+	- self.enableCompact(domains = ('idxHr',), dtype = 'float32') codes the labels of domains as integers in the db, shares one index object
+	  between symbols over the same domain and stores postSolve outputs in dtype (see compact.Compact). This reduces memory use of hourly
+	  symbols and solutions. self.decode(x) converts outputs back to labels and float64; self.disableCompact() restores the db.
+	  Symbols written to the db in compact mode (including grids in loops) must be coded, e.g. with self.compact.encode(x).
+
+	Sensitivity:
+	- self.sensitivity() returns a Sensitivity object with ranging of symbols (e.g. mcHr, genCapHr, loadHr, emCap, RESCap) and
+	  intervals/solutions for changes in symbols based on the optimal basis of the compiled model.
+
+	Target seeking:
+	- self.seekTarget(control, target, value) finds e.g. the taxEm that yields emissions = value, or the emCap/RESCap that yields a target pAvg
+	  (bracketing, secant and bisection steps; the tax for an emission target comes from the dual of emCap where the model has the cap).
+
+	Profiling:
+	- self.enableProfiling() attaches a Profiler (or pass profiler = Profiler(...)) that records wall time, allocated memory (optional)
+	  and output size of each dispatched stage, the assembly in self.sys, the solver call and each postSolve output. See self.profiler.summary().
+	"""
+	auxKeys = ()
+	lpMaps = {'c': 'v', 'l': 'v', 'u': 'v', 'b_eq': 'eq', 'b_ub': 'ub'} # self.sys.lp vector components -> domains they are defined over
+
+	def __init__(self, db = None, sys = None, incremental = False, engine = 'pandas', scalarDual = True, cache = None, profiler = None, solver = 'auto', presolve = False, memo = False, **kwargs):
+		super().__init__(db = db, sys = noneInit(sys, EnergySys(db = db, scalarDual = scalarDual)), scalarDual = scalarDual, **kwargs)
+		self.sys.db = TrackedDB.fromDB(self.sys.db)
+		self.incremental = incremental
+		self.engine = engine
+		from lpEnergyModels.solvers import getSolver
+		self.cache = cache
+		if isinstance(cache, (str, os.PathLike)):
+			from lpEnergyModels.compileCache import CompileCache
+			self.cache = CompileCache(cache)
+		self.profiler = profiler
+		self.solver = getSolver(solver)
+		self.loopSolver = getSolver(solver, loop = True) if solver == 'auto' else None # None: loops use self.solver
+		self.presolve = presolve or None
+		if presolve is True:
+			from lpEnergyModels.presolve import Presolve
+			self.presolve = Presolve()
+		self.memo = None if memo is False else memo
+		if memo is True:
+			from lpEnergyModels.memo import Memo
+			self.memo = Memo()
+		self.compact = None
+		self.resetStages()
+
+	@property
+	def profiler(self):
+		return self.sys.profiler
+
+	@profiler.setter
+	def profiler(self, profiler):
+		self.sys.profiler = profiler
+
+	def enableProfiling(self, memory = False, hooks = None):
+		""" Attach a new Profiler; hooks are called with each recorded event. Returns the profiler. """
+		from lpEnergyModels.profiling import Profiler
+		self.profiler = Profiler(memory = memory, hooks = hooks)
+		return self.profiler
+
+	def disableProfiling(self):
+		self.profiler = None
+
+	def enableCompact(self, domains = ('idxHr',), dtype = 'float32'):
+		""" Code the labels of domains in the db (and in outputs) as integers and store postSolve outputs in dtype; see compact.Compact. Returns self.compact. """
+		from lpEnergyModels.compact import Compact
+		self.disableCompact()
+		self.compact = Compact.fromDB(self.db, domains = domains, dtype = dtype)
+		[self.db.__setitem__(k, self.compact.encode(self.db(k))) for k in list(self.db.symbols) if self.compact.coded(self.db(k))];
+		return self.compact
+
+	def disableCompact(self):
+		""" Restore the labels of coded domains in the db. """
+		if self.compact is not None:
+			[self.db.__setitem__(k, self.compact.decode(self.db(k))) for k in list(self.db.symbols) if self.compact.coded(self.db(k))];
+			self.compact = None
+
+	def shared(self, x):
+		""" x over the shared index of its domain in compact mode (see compact.Compact.share); x as it is otherwise. """
+		return x if self.compact is None else self.compact.share(x, self._domains().values())
+
+	def decode(self, x):
+		""" Solution, dict or pandas object x in the standard representation (labels and float64 values); x as it is if compact mode is off. """
+		return x if self.compact is None else self.compact.decode(x)
+
+	def resetStages(self):
+		self.stages = {k: {} for k in ('maps','aux','params')} # stage name -> set of db symbols read.
+		self.stageOutputs = {} # parameter stage name -> list of (attr, key) entries written to self.sys.lp
+		self.compiledAt = None # value of self.db.counter at the last compile
+		self.fingerprints = None # fingerprints of the db symbols at the last compile (if incremental)
+		self.auxCompiled, self.compiledEngine = False, None
+
+	def compile(self, updateAux = True, keys = None, incremental = None, **kwargs):
+		""" Compile model. If incremental (defaults to self.incremental) and the model has been compiled before, only rerun the stages affected by changes to the database. """
+		incremental = noneInit(incremental, self.incremental)
+		if incremental and self.recompile(updateAux = updateAux, keys = keys):
+			return self.sys.out
+		useCache = self.cache is not None and updateAux and keys is None and self.sys.out['c'] is None
+		self.resetStages()
+		if useCache and self.cache.load(self):
+			return self.sys.out
+		self.compileMaps()
+		if updateAux:
+			self.updateAux(keys = keys)
+		self.compileParams()
+		self.compiledAt, self.auxCompiled, self.compiledEngine = self.db.counter, updateAux, self.engine
+		self.fingerprints = self.db.fingerprints() if incremental else None
+		if useCache:
+			self.cache.store(self)
+		return self.sys.out
+
+	def compileMaps(self):
+		[self.runStage(f'initArgs_{k}', 'maps') for k in ('v','eq','ub') if hasattr(self, f'initArgs_{k}')]; # specify domains for variables and equations
+		self.sys.compileMaps()
+
+	def updateAux(self, keys = None):
+		[self.db.__setitem__(k, self.runAux(k)) for k in noneInit(keys, self.auxKeys)]; # update auxiliary variables
+
+	def compileParams(self):
+		[self.runStage(f'initArgsV_{k}', 'params') for k in self.sys.v]; # specify c,l,u for all variables
+		[self.runStage(f'initArgsEq_{k}', 'params') for k in self.sys.eq]; # add A_eq and b_eq.
+		[self.runStage(f'initArgsUb_{k}', 'params') for k in self.sys.ub]; # add A_ub and b_ub.
+		self.sys.compileParams()
+		return self.sys.out
+
+	def engineStage(self, name):
+		""" Name of the method/property used for stage 'name' with the current engine. """
+		npName = f'np{name[0].upper()}{name[1:]}'
+		return npName if self.engine == 'numpy' and hasattr(type(self), npName) else name
+
+	def runStage(self, name, kind):
+		""" Call method 'name' and record the db symbols it reads. """
+		before = self._lpEntries()
+		domains = self._domains() if kind == 'maps' else None
+		with profile(self.profiler, kind, name) as event:
+			with self.db.trace() as reads:
+				getattr(self, self.engineStage(name))()
+			if kind == 'params':
+				self.stageOutputs[name] = [k for k,v in self._lpEntries().items() if before.get(k) is not v]
+				event['size'] = sum(entrySize(self.sys.lp[attr][k]) for attr,k in self.stageOutputs[name])
+			elif kind == 'maps':
+				event['size'] = sum(self.sys.domLen(v) for k,v in self._domains().items() if domains.get(k) is not v)
+		self.stages[kind][name] = frozenset(reads)
+
+	def runAux(self, k):
+		""" Return auxiliary symbol self.aux_{k} and record the db symbols it reads. """
+		with profile(self.profiler, 'aux', k) as event:
+			with self.db.trace() as reads:
+				v = getattr(self, self.engineStage(f'aux_{k}'))
+			event['size'] = int(np.size(v))
+		self.stages['aux'][k] = frozenset(reads)
+		return self.shared(v)
+
+	def _domains(self):
+		return {(attr, k): v for attr in ('v','eq','ub') for k,v in getattr(self.sys, attr).items()}
+
+	def _lpEntries(self):
+		return {(attr, k): v for attr in self.sys.lp for k,v in self.sys.lp[attr].symbols.items()}
+
+	def affectedStages(self, kind, changed):
+		return [k for k,reads in self.stages[kind].items() if reads & changed]
+
+	def recompile(self, updateAux = True, keys = None):
+		"""
+		Incremental compile. Returns False if a full compile is required, i.e. if the model has not been compiled incrementally (with the current engine),
+		if a symbol used to define domains has changed, or if auxiliary symbols have not been tracked.
+		"""
+		if self.compiledAt is None or self.fingerprints is None or self.compiledEngine != self.engine:
+			return False
+		self.db.sync(self.fingerprints)
+		changed = self.db.changedSince(self.compiledAt)
+		if self.affectedStages('maps', changed):
+			return False
+		if updateAux:
+			auxKeys = noneInit(keys, list(self.stages['aux']))
+			if not self.auxCompiled or any(k not in self.stages['aux'] for k in auxKeys):
+				return False
+			[self.db.__setitem__(k, self.runAux(k)) for k in auxKeys if k in changed or self.stages['aux'][k] & changed];
+			changed = self.db.changedSince(self.compiledAt)
+		[self.patchStage(name) for name in self.affectedStages('params', changed)];
+		self.compiledAt, self.fingerprints = self.db.counter, self.db.fingerprints()
+		return True
+
+	def patchStage(self, name):
+		""" Rerun parameter stage 'name' and patch the entries it writes in self.sys.out. """
+		old = {(attr, k): self.sys.lp[attr][k] for attr,k in self.stageOutputs[name] if k in self.sys.lp[attr].symbols}
+		self.runStage(name, 'params')
+		[self.patchV(attr, sym, reset = True) for (attr, k), sym in old.items() if not attr.startswith('A_')];
+		[self.patchV(attr, self.sys.lp[attr][k]) for attr, k in self.stageOutputs[name] if not attr.startswith('A_')];
+		matrices = {attr for attr,k in old.keys() | set(self.stageOutputs[name]) if attr.startswith('A_')}
+		[self.sys.out.__setitem__(attr, getattr(self.sys, f'sparse_{attr}')()) for attr in matrices];
+
+	def patchV(self, attr, sym, reset = False):
+		""" Write vector component sym from self.sys.lp[attr] to self.sys.out. If reset, write the default values used by LPSys.dense_* instead."""
+		rows = self.sys.getGlobalIdx1d(sym.name, sym.index, self.lpMaps[attr])
+		if attr in ('l','u'):
+			self.sys.out['bounds'][rows, ('l','u').index(attr)] = ((0 if attr == 'l' else np.nan) if reset else sym.array())
+		else:
+			self.sys.out[attr][rows] = 0 if reset else sym.array()
+
+	@contextmanager
+	def looping(self):
+		""" Context for loops over scenarios: Solves use self.loopSolver (if it is not None). """
+		solver, self.solver = self.solver, noneInit(self.loopSolver, self.solver)
+		try:
+			yield self
+		finally:
+			self.solver = solver
+
+	def solve(self, **kwargs):
+		""" Solve compiled model with self.solver (after self.presolve reduces the LP, if it is not None). """
+		return self.solveOut(self.sys.out)
+
+	def solveOut(self, out):
+		""" Solve the LP in out (in the format of self.sys.out) with presolve and self.solver. """
+		if self.presolve is None:
+			return self.solveLP(out)
+		with profile(self.profiler, 'solve', 'presolve') as event:
+			reduced = self.presolve.reduce(out)
+			event['size'] = len(self.presolve.cols)
+		sol = self.solveLP(reduced)
+		with profile(self.profiler, 'solve', 'postsolve'):
+			return self.presolve.expand(sol, out)
+
+	def solveLP(self, out):
+		with profile(self.profiler, 'solve', self.solver.name) as event:
+			sol = self.solver(out, self.solOptions)
+			assert sol['status'] == 0, f"{type(self.solver).__name__} did not yield solution status == 0."
+			event['size'] = sol.get('nit', None)
+		return sol
+
+	def postSolve(self, sol, **kwargs):
+		""" Variables and shadow values (see ModelShell.postSolve) as a LazySolution; models add derived outputs with solDict.lazy. """
+		with profile(self.profiler, 'postSolve', 'unloadSol') as event:
+			solDict = ModelShell.postSolve(self, sol, **kwargs) # skips the (eager) postSolve of the model class
+			event['size'] = int(sum(np.size(v) for v in solDict.values()))
+		return LazySolution(solDict, profiler = self.profiler, cast = None if self.compact is None else self.compact.cast)
+
+	def lazyLoop(self, grids, idxLoop, **kwargs):
+		""" ModelShell.lazyLoop with the solver for loops (see self.looping). """
+		with self.looping():
+			return super().lazyLoop(grids, idxLoop, **kwargs)
+
+	def lazyLoop_l(self, grids, l, idxLoop, outputs = None, **kwargs):
+		""" ModelShell.lazyLoop_l. If outputs is a list of names, only these outputs are computed and returned (as a dict). """
+		solDict = super().lazyLoop_l(grids, l, idxLoop, **kwargs)
+		return solDict if outputs is None else solDict.subset(outputs)
+
+	def sensitivity(self, **kwargs):
+		""" Sensitivity analysis and ranging from the optimal basis of the compiled model; see sensitivity.Sensitivity. """
+		from lpEnergyModels.sensitivity import Sensitivity
+		return Sensitivity(self, **kwargs)
+
+	def seekTarget(self, control, target, value, **kwargs):
+		""" Value of db symbol 'control' such that solution output 'target' equals value, with few solves; see targets.seekTarget. """
+		from lpEnergyModels import targets
+		return targets.seekTarget(self, control, target, value, **kwargs)
+
+	def solveDecomposed(self, windowSize = 24, **kwargs):
+		""" Solve compiled model by splitting hours into windows that are solved separately; see decompose.solveDecomposed. """
+		from lpEnergyModels import decompose
+		with self.looping():
+			return decompose.solveDecomposed(self, windowSize = windowSize, **kwargs)
+
+	def memoryReport(self):
+		""" Shape, nnz and bytes of each constraint block and of the compiled self.sys.out; see EnergySys.memoryReport. """
+		return self.sys.memoryReport()
+
+	def parallelLoop(self, grids, idxLoop, **kwargs):
+		""" See loops.parallelLoop. """
+		from lpEnergyModels import loops
+		with self.looping():
+			return loops.parallelLoop(self, grids, idxLoop, **kwargs)
+
+	def parallelLoopAsDFs(self, grids, idxLoop, **kwargs):
+		""" Parallel version of self.lazyLoopAsDFs; see loops.parallelLoop. """
+		from lpEnergyModels import loops
+		with self.looping():
+			return loops.parallelLoopAsDFs(self, grids, idxLoop, **kwargs)
+
+	def batchLoop(self, grids, idxLoop, batchSize = 100, **kwargs):
+		""" See batch.batchLoop. """
+		from lpEnergyModels import batch
+		with self.looping():
+			return batch.batchLoop(self, grids, idxLoop, batchSize = batchSize, **kwargs)
+
+	def batchLoopAsDFs(self, grids, idxLoop, batchSize = 100, **kwargs):
+		""" Batched version of self.lazyLoopAsDFs that solves batchSize scenarios in one block-diagonal LP; see batch.batchLoopAsDFs. """
+		from lpEnergyModels import batch
+		with self.looping():
+			return batch.batchLoopAsDFs(self, grids, idxLoop, batchSize = batchSize, **kwargs)
+
+	def streamLoop(self, grids, idxLoop, path, **kwargs):
+		""" Loop that writes the outputs of each scenario to a results store in directory path; see results.streamLoop. """
+		from lpEnergyModels import results
+		with self.looping():
+			return results.streamLoop(self, grids, idxLoop, path, **kwargs)
@@ -0,0 +1,71 @@
+""" Solution dictionaries with outputs that are computed on first access. """
+from lpEnergyModels.lazyBase import np, noneInit
+from lpEnergyModels.profiling import profile
+from collections.abc import MutableMapping
+
+class _Pending:
+	__slots__ = ('f',)
+	def __init__(self, f):
+		self.f = f
+
+class LazySolution(MutableMapping):
+	"""
+	Dictionary of solution outputs where some outputs are computed the first time they are accessed:
+	- self[k] = v adds a value; self.lazy(k, f) adds output k computed as f(self) when it is first accessed (the result is cached).
+	- Functions should only depend on the solution and on values captured when they are added (not on the current state of the model),
+	  such that outputs are the same whenever they are accessed.
+	- Iterating over items/values computes all outputs; use self.subset(keys) to compute only selected outputs.
+	Pickling computes all pending outputs and stores plain values. If profiler is a Profiler, the computation of each output is profiled.
+	If cast is a function, values are stored as cast(v) (e.g. compact.Compact.cast stores float32 outputs).
+	"""
+	profiler = None
+	cast = None
+
+	def __init__(self, values = None, profiler = None, cast = None):
+		self.profiler, self.cast = profiler, cast
+		self.data = {k: self._cast(v) for k,v in noneInit(values, {}).items()}
+
+	def _cast(self, v):
+		return v if self.cast is None else self.cast(v)
+
+	def lazy(self, k, f):
+		self.data[k] = _Pending(f)
+
+	def __getitem__(self, k):
+		v = self.data[k]
+		if isinstance(v, _Pending):
+			with profile(self.profiler, 'postSolve', k) as event:
+				v = self.data[k] = self._cast(v.f(self))
+				event['size'] = int(np.size(v))
+		return v
+
+	def __setitem__(self, k, v):
+		self.data[k] = self._cast(v)
+
+	def __delitem__(self, k):
+		del self.data[k]
+
+	def __iter__(self):
+		return iter(self.data)
+
+	def __len__(self):
+		return len(self.data)
+
+	@property
+	def computed(self):
+		""" Names of outputs that are available without computation. """
+		return [k for k,v in self.data.items() if not isinstance(v, _Pending)]
+
+	@property
+	def pending(self):
+		return [k for k,v in self.data.items() if isinstance(v, _Pending)]
+
+	def subset(self, keys):
+		""" Plain dictionary with outputs 'keys' (computed if necessary). """
+		return {k: self[k] for k in keys}
+
+	def __getstate__(self):
+		return {'data': dict(self.items())}
+
+	def __repr__(self):
+		return f"LazySolution(computed = {self.computed}, pending = {self.pending})"
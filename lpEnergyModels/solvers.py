@@ -0,0 +1,150 @@
+""" Solver backends for compiled models. All backends return solutions in the format of scipy.optimize.linprog (method = 'highs'). """
+from lpEnergyModels.base import *
+from scipy import optimize, sparse
+try:
+	import highspy as _highs
+	_Highs = _highs.Highs
+except ImportError: # HighsSolver is unavailable; 'auto' falls back to ScipySolver
+	_highs = _Highs = None
+
+def boundsArrays(bounds):
+	""" Lower and upper bounds from the (n,2) array in sys.out['bounds'] (NaN = unbounded, as in scipy.optimize.linprog). """
+	bounds = np.asarray(bounds, dtype = float).reshape(-1, 2)
+	return np.where(np.isnan(bounds[:,0]), -np.inf, bounds[:,0]), np.where(np.isnan(bounds[:,1]), np.inf, bounds[:,1])
+
+def rowBounds(out):
+	""" Row bounds of the stacked constraint matrix [A_ub; A_eq]. """
+	nUb = 0 if out['b_ub'] is None else len(out['b_ub'])
+	bUb, bEq = (np.zeros(0) if out[k] is None else np.asarray(out[k], dtype = float) for k in ('b_ub','b_eq'))
+	return np.hstack([np.full(nUb, -np.inf), bEq]), np.hstack([bUb, bEq])
+
+def stackA(out, n):
+	blocks = [sparse.csr_array(out[k]) for k in ('A_ub','A_eq') if out[k] is not None]
+	return sparse.vstack(blocks, format = 'csc') if blocks else sparse.csc_array((0, n))
+
+def highsOptions(solOptions):
+	""" HiGHS options from the options passed to scipy.optimize.linprog (solOptions['options']); 'disp' and 'maxiter' are translated. """
+	opts = dict(noneInit(solOptions, {}).get('options', None) or {})
+	out = {'output_flag': bool(opts.pop('disp', False))}
+	if 'maxiter' in opts:
+		out['simplex_iteration_limit'] = opts.pop('maxiter')
+	if isinstance(opts.get('presolve', None), bool):
+		opts['presolve'] = 'on' if opts['presolve'] else 'off'
+	return out | opts
+
+def getSolver(solver = 'auto', loop = False):
+	"""
+	Solver instance from a name ('auto', 'highs', 'scipy') or an instance. 'auto' uses ScipySolver for single solves and, with loop = True
+	(solvers for loops over scenarios), HighsSolver if highspy is installed and ScipySolver otherwise.
+	Where an LP has several optimal solutions (ties, e.g. generators with equal marginal costs), HighsSolver may return another optimal
+	dispatch than scipy.optimize.linprog; use 'scipy' to reproduce the solutions of ModelShell.solve.
+	"""
+	if not isinstance(solver, str):
+		return solver
+	elif solver == 'auto':
+		return HighsSolver() if loop and _Highs is not None else ScipySolver()
+	return {'highs': HighsSolver, 'scipy': ScipySolver}[solver]()
+
+class ScipySolver:
+	""" Solve each LP from scratch with scipy.optimize.linprog. """
+	name = 'scipy'
+
+	def __call__(self, out, solOptions = None):
+		sol = optimize.linprog(**out, **noneInit(solOptions, {}))
+		sol['nit'] = sol.get('nit', None)
+		return sol
+
+	def reset(self):
+		pass
+
+class HighsSolver:
+	"""
+	Persistent HiGHS LP (through highspy). The first call loads sys.out. Later calls compare sys.out with the loaded LP and
+	- update c, bounds, b_eq and b_ub in place (only the elements that changed), such that HiGHS warm-starts from the previous basis,
+	- reload the LP if A_eq/A_ub changed (the previous basis is passed to the new LP if the dimensions are unchanged).
+	HiGHS options are taken from solOptions['options'] (the options for scipy.optimize.linprog, see highsOptions) and self.options.
+	Solutions include 'nit' (simplex iterations in this call) and 'warm' (True if the LP was updated rather than loaded).
+	"""
+	name = 'highs'
+
+	def __init__(self, options = None):
+		if _Highs is None:
+			raise ImportError("HighsSolver requires highspy (pip install highspy).")
+		self.options = noneInit(options, {})
+		self.reset()
+
+	def reset(self):
+		self.h, self.loaded = None, None
+
+	def __getstate__(self):
+		""" The HiGHS object is not pickled; the LP is loaded again on the first call after unpickling. """
+		return self.__dict__ | {'h': None, 'loaded': None}
+
+	def __call__(self, out, solOptions = None):
+		warm = self.update(out) if self.h is not None else False
+		if not warm:
+			self.load(out, solOptions)
+		self.h.run()
+		return self.solution(warm)
+
+	def load(self, out, solOptions = None):
+		basis = self.h.getBasis() if self.h is not None and self.loaded is not None else None
+		n = len(out['c'])
+		A = stackA(out, n)
+		lb, ub = boundsArrays(out['bounds'])
+		rl, ru = rowBounds(out)
+		lp = _highs.HighsLp()
+		lp.num_col_, lp.num_row_ = n, A.shape[0]
+		lp.col_cost_, lp.col_lower_, lp.col_upper_, lp.row_lower_, lp.row_upper_ = np.array(out['c'], dtype = float), lb, ub, rl, ru
+		lp.a_matrix_.format_ = _highs.MatrixFormat.kColwise
+		lp.a_matrix_.num_col_, lp.a_matrix_.num_row_ = n, A.shape[0]
+		lp.a_matrix_.start_, lp.a_matrix_.index_, lp.a_matrix_.value_ = A.indptr, A.indices, A.data
+		if self.h is None:
+			self.h = _Highs()
+			[self.h.setOptionValue(k, v) for k,v in (highsOptions(solOptions) | self.options).items()];
+		self.h.passModel(lp)
+		if basis is not None and self.loaded['shape'] == A.shape and basis.valid:
+			self.h.setBasis(basis)
+		self.loaded = {'c': np.array(out['c'], dtype = float), 'lb': lb, 'ub': ub, 'rl': rl, 'ru': ru, 'A_eq': out['A_eq'], 'A_ub': out['A_ub'], 'shape': A.shape, 'nUb': len(rl)-len(noneInit(out['b_eq'], []))}
+
+	def update(self, out):
+		""" Update the loaded LP in place; returns False if it has to be reloaded. """
+		if any(out[k] is not self.loaded[k] and not self.sameMatrix(out[k], self.loaded[k]) for k in ('A_eq','A_ub')):
+			return False
+		c = np.asarray(out['c'], dtype = float)
+		lb, ub = boundsArrays(out['bounds'])
+		rl, ru = rowBounds(out)
+		if len(c) != len(self.loaded['c']) or len(rl) != len(self.loaded['rl']):
+			return False
+		self._change(self.h.changeColsCost, self.loaded['c'], c)
+		self._change(self.h.changeColsBounds, (self.loaded['lb'], self.loaded['ub']), (lb, ub))
+		self._change(self.h.changeRowsBounds, (self.loaded['rl'], self.loaded['ru']), (rl, ru))
+		self.loaded.update({'c': c.copy(), 'lb': lb, 'ub': ub, 'rl': rl, 'ru': ru, 'A_eq': out['A_eq'], 'A_ub': out['A_ub']})
+		return True
+
+	@staticmethod
+	def sameMatrix(A, B):
+		if A is None or B is None:
+			return A is B
+		return A.shape == B.shape and (sparse.csr_array(A) != sparse.csr_array(B)).nnz == 0
+
+	@staticmethod
+	def _change(f, old, new):
+		old, new = (old, new) if isinstance(old, tuple) else ((old,), (new,))
+		idx = np.flatnonzero(np.logical_or.reduce([o != n for o,n in zip(old, new)])).astype(np.int32)
+		if len(idx):
+			f(len(idx), idx, *(n[idx] for n in new))
+
+	def solution(self, warm):
+		""" Solution in the format of scipy.optimize.linprog. """
+		status, info = self.h.getModelStatus(), self.h.getInfo()
+		if status != _highs.HighsModelStatus.kOptimal:
+			return optimize.OptimizeResult(status = 4, success = False, message = self.h.modelStatusToString(status), nit = info.simplex_iteration_count, warm = warm)
+		sol, basis = self.h.getSolution(), self.h.getBasis()
+		colDual = np.asarray(sol.col_dual)
+		colStatus = np.fromiter(map(int, basis.col_status), dtype = int, count = len(colDual))
+		rowDual, nUb = np.asarray(sol.row_dual), self.loaded['nUb']
+		return optimize.OptimizeResult(x = np.asarray(sol.col_value), fun = info.objective_function_value, status = 0, success = True, nit = info.simplex_iteration_count, warm = warm,
+										ineqlin = {'marginals': rowDual[:nUb]}, eqlin = {'marginals': rowDual[nUb:]},
+										lower = {'marginals': np.where(colStatus == int(_highs.HighsBasisStatus.kLower), colDual, 0)},
+										upper = {'marginals': np.where(colStatus == int(_highs.HighsBasisStatus.kUpper), colDual, 0)})
@@ -0,0 +1,195 @@
+""" Target seeking: Find the value of a control symbol (e.g. taxEm, emCap, RESCap) such that a solution output (e.g. emissions, pAvg, RESShare) hits a target. """
+from lpEnergyModels.base import *
+from lpEnergyModels.solvers import HighsSolver
+from lpEnergyModels.sensitivity import RangingSolver
+from scipy import optimize
+
+class _Converged(Exception):
+	pass
+
+def setControl(m, control, x, key = None):
+	""" Set db symbol 'control' to x: Scalars are replaced, element 'key' of series is set (all elements if key is None). """
+	v = m.db(control)
+	if np.ndim(v) == 0:
+		m.db[control] = x
+	else:
+		v = v.astype(float)
+		v.loc[v.index if key is None else key] = x
+		m.db[control] = v
+
+def getControl(m, control, key = None):
+	v = m.db(control)
+	return float(v if np.ndim(v) == 0 else v.iloc[0] if key is None else v.loc[key])
+
+def getOutput(solDict, target, key = None):
+	""" Scalar output 'target' (name in solDict or function of solDict); element 'key' of series outputs (required if the series has several elements). """
+	v = target(solDict) if callable(target) else solDict[target]
+	if np.ndim(v) == 0:
+		return float(v)
+	elif key is None and len(v) > 1:
+		raise ValueError(f"Output '{target}' has several elements; specify targetKey.")
+	return float(v.iloc[0] if key is None else v.loc[key])
+
+class TargetSeeker:
+	"""
+	Solve output(x) = value for a scalar control x, where output(x) is the (piecewise linear or piecewise constant) response of a solution
+	output to the control. Each evaluation compiles (incrementally if m.incremental), solves and postSolves the model; evaluations are memoized.
+	1. Bracketing: Starting from x0 (or the endpoints of 'bracket'), steps that double in size are taken towards the target until the sign changes.
+	2. The bracket is narrowed with scipy.optimize.root_scalar (method 'brentq' combines secant/inverse quadratic steps with bisection;
+	   'bisect' only bisects). method = 'secant' takes secant steps from x0 and x0+step first and falls back to bracketing if they fail.
+	The model is solved with a RangingSolver during the search: Evaluations where one of the optimal bases found so far (up to 'memory')
+	remains optimal are computed without solving the LP, so the number of solves is about the number of bases visited. Evaluations stop when |output-value| <= ftol*(1+|value|)
+	or the bracket is narrower than xtol*(1+|x|). For piecewise constant responses (e.g. emissions as a function of a tax) the target is in
+	general not attained; the result is then an endpoint of the narrowest bracket around the jump: The endpoint with output <= value if
+	side = 'below', output >= value if side = 'above' and, if side is None, the endpoint where the target is met coming from the first
+	evaluated point (e.g. emissions below the target when the tax is raised to cut emissions). The endpoint is confirmed with the model's
+	solver and moved away from the jump if the solver picks the dispatch on the other side (see self.settle).
+	"""
+	def __init__(self, m, control, target, value, controlKey = None, targetKey = None, bounds = (0, np.inf), ftol = 1e-9, xtol = 1e-8, maxEvals = 100, memory = 16, side = None):
+		self.m, self.control, self.target, self.value = m, control, target, value
+		self.controlKey, self.targetKey = controlKey, targetKey
+		self.bounds, self.ftol, self.xtol, self.maxEvals, self.memory, self.side = bounds, ftol, xtol, maxEvals, memory, side
+		self.evals = {} # x -> (residual, solDict)
+
+	def __call__(self, x):
+		x = float(np.clip(x, *self.bounds))
+		if x not in self.evals:
+			if len(self.evals) >= self.maxEvals:
+				raise RuntimeError(f"Target not found in {self.maxEvals} evaluations.")
+			setControl(self.m, self.control, x, self.controlKey)
+			self.m.compile()
+			solDict = self.m.postSolve(self.m.solve())
+			self.evals[x] = (getOutput(solDict, self.target, self.targetKey)-self.value, solDict)
+		if self.attained(x):
+			raise _Converged(x)
+		return self.evals[x][0]
+
+	def attained(self, x):
+		return abs(self.evals[x][0]) <= self.ftol*(1+abs(self.value))
+
+	@property
+	def best(self):
+		""" Evaluated point closest to the target if it is attained; otherwise the endpoint of self.signChange on the feasible side (see self.side). """
+		closest = min(self.evals, key = lambda x: abs(self.evals[x][0]))
+		if self.attained(closest) or self.signChange is None:
+			return closest
+		return next(x for x in self.signChange if np.sign(self.evals[x][0]) == self.feasibleSign)
+
+	@property
+	def feasibleSign(self):
+		""" Sign of output-value on the feasible side of a jump (see self.side). """
+		return {'below': -1, 'above': 1}[self.side] if self.side is not None else -np.sign(next(iter(self.evals.values()))[0])
+
+	def settle(self, x, maxSteps = 30):
+		"""
+		Confirm an endpoint x of self.signChange (target not attained) with a solve by the model's solver: At a jump, dispatches on both sides can be
+		optimal within solver tolerances, so x is moved away from the other endpoint (doubling the distance) until the output is on the feasible side.
+		Returns x and the number of solves.
+		"""
+		if self.attained(x) or self.signChange is None or x not in self.signChange:
+			return x, 0
+		a = next(y for y in self.signChange if y != x)
+		for k in range(maxSteps):
+			setControl(self.m, self.control, x, self.controlKey)
+			self.m.compile()
+			solDict = self.m.postSolve(self.m.solve())
+			self.evals[x] = (getOutput(solDict, self.target, self.targetKey)-self.value, solDict)
+			if np.sign(self.evals[x][0]) == self.feasibleSign or x in self.bounds:
+				break
+			x = float(np.clip(2*x-a, *self.bounds))
+		return x, k+1
+
+	@property
+	def signChange(self):
+		""" Narrowest pair of neighbouring evaluated points where output-value changes sign (None if there is none). """
+		xs = sorted(self.evals)
+		pairs = [(a, b) for a,b in zip(xs, xs[1:]) if np.sign(self.evals[a][0]) != np.sign(self.evals[b][0])]
+		return min(pairs, key = lambda p: p[1]-p[0]) if pairs else None
+
+	def findBracket(self, x0, step):
+		"""
+		Bracket [a, b] with a sign change. Steps from x0 double in size in both directions; a direction is dropped when |output-value|
+		increases or the bound is reached (flat responses are followed in both directions).
+		"""
+		fa, ends = self(x0), {1: x0, -1: x0}
+		while ends:
+			for d, prev in list(ends.items()):
+				b = float(np.clip(x0+d*step, *self.bounds))
+				fb = self(b)
+				if np.sign(fb) != np.sign(fa):
+					return sorted((prev, b))
+				ends[d] = b
+				if b in self.bounds or abs(fb) > abs(self.evals[prev][0]):
+					del ends[d]
+			step *= 2
+		raise ValueError(f"Target {self.value} for {self.target} not attained by changing {self.control} within bounds {self.bounds}.")
+
+	def solve(self, x0 = None, bracket = None, step = None, method = 'brentq'):
+		x0 = noneInit(x0, getControl(self.m, self.control, self.controlKey))
+		step = noneInit(step, max(abs(x0), 1)/2)
+		solver = self.m.solver
+		self.m.solver = RangingSolver(solver = getattr(solver, 'solver', solver) if isinstance(getattr(solver, 'solver', solver), HighsSolver) else HighsSolver(), memory = self.memory)
+		res = {'bracket': None, 'converged': True}
+		try:
+			if method == 'secant':
+				try:
+					optimize.root_scalar(self, x0 = x0, x1 = x0+step, method = 'secant', xtol = self.xtol)
+				except (RuntimeError, ZeroDivisionError, FloatingPointError):
+					pass
+				method = 'brentq'
+			if bracket is not None and np.sign(self(bracket[0])) != np.sign(self(bracket[1])):
+				res['bracket'] = sorted(bracket)
+			else:
+				res['bracket'] = self.findBracket(x0, step) if bracket is None else self.findBracket(bracket[0], bracket[1]-bracket[0])
+			sol = optimize.root_scalar(self, bracket = res['bracket'], method = method, xtol = self.xtol*(1+np.abs(res['bracket']).max()))
+			res['converged'] = sol.converged
+		except _Converged:
+			pass
+		finally:
+			solves, self.m.solver = self.m.solver.stats['solves'], solver
+		bracket = noneInit(self.signChange, res['bracket'])
+		x, settleSolves = self.settle(self.best)
+		return self.result(x, method = method, solves = solves+settleSolves, **(res | {'bracket': bracket}))
+
+	def result(self, x, **kwargs):
+		""" Set the control to x (see self.best) and compile; returns an OptimizeResult with the solution at x. """
+		setControl(self.m, self.control, x, self.controlKey)
+		self.m.compile()
+		residual, solDict = self.evals[x]
+		return optimize.OptimizeResult(x = x, value = residual+self.value, residual = residual, attained = self.attained(x), sol = solDict, evals = len(self.evals), **kwargs)
+
+def dualTax(m, value, controlKey = None, targetKey = None, tol = 1e-9):
+	"""
+	Emission tax that yields emissions = value from a single solve with the emission cap emCap set to value: The tax is taxEm-λub_emCap,
+	where λub_emCap is the shadow value of the cap. Requires a model with an emCap constraint where the cap is proportional to emissions
+	(m.emCapScale = emissions per unit of emCap; None otherwise). Returns None if the cap does not bind at the current tax (emissions are below value).
+	Result.sol is the solution with the cap; dispatch and prices are those with tax x (where the model without the cap is indifferent between dispatches).
+	"""
+	key = noneInit(targetKey, controlKey)
+	old = m.db['emCap']
+	setControl(m, 'emCap', value/m.emCapScale, key)
+	m.compile()
+	solDict = m.postSolve(m.solve())
+	λ = getOutput(solDict, 'λub_emCap', key)
+	m.db['emCap'] = old
+	if λ > -tol:
+		m.compile()
+		return None
+	x = getControl(m, 'taxEm', controlKey)-λ
+	setControl(m, 'taxEm', x, controlKey)
+	m.compile()
+	residual = getOutput(solDict, 'emissions', targetKey)-value
+	return optimize.OptimizeResult(x = x, value = residual+value, residual = residual, attained = abs(residual) <= 1e-9*(1+abs(value)), sol = solDict, solves = 1, evals = 1, bracket = None, converged = True, method = 'dual')
+
+def seekTarget(m, control, target, value, controlKey = None, targetKey = None, x0 = None, bracket = None, step = None, method = 'brentq', dual = True, **kwargs):
+	"""
+	Find the value x of db symbol 'control' (element controlKey) such that output 'target' (element targetKey) of the solution equals value.
+	If dual and the target is emissions with control taxEm, the tax is computed from the shadow value of the emission cap when the model has one (see dualTax).
+	Otherwise see TargetSeeker (kwargs: bounds, ftol, xtol, maxEvals, side). Returns an OptimizeResult with x, value (output at x), residual, attained, sol (solution at x),
+	solves (number of LP solves), evals (number of evaluations), bracket, converged and method. The control is left at x in the database.
+	"""
+	if dual and control == 'taxEm' and target == 'emissions' and 'emCap' in m.sys.ub and getattr(m, 'emCapScale', None) is not None:
+		res = dualTax(m, value, controlKey = controlKey, targetKey = targetKey)
+		if res is not None:
+			return res
+	return TargetSeeker(m, control, target, value, controlKey = controlKey, targetKey = targetKey, **kwargs).solve(x0 = x0, bracket = bracket, step = step, method = method)
@@ -0,0 +1,107 @@
+""" Aggregation of hourly profiles to representative hours with weights. """
+from lpEnergyModels.lazyBase import np, pd
+
+def hrFeatures(uHrCap, uHrLoad, normalize = True):
+	""" Matrix with one row per hour in uHrCap/uHrLoad (idxHr) and one column per variation type (idxHVTGen and idxHVTCons). """
+	X = pd.concat([uHrCap.unstack('idxHVTGen'), uHrLoad.unstack('idxHVTCons')], axis = 1)
+	std = X.std(axis = 0).replace(0, 1) if normalize else 1
+	return (X / std).fillna(0)
+
+def sqDist(X, C):
+	""" Squared euclidean distances between rows of X and rows of C. """
+	return np.maximum((X**2).sum(1)[:,None] - 2 * X @ C.T + (C**2).sum(1)[None,:], 0)
+
+def kmeansPP(X, k, rng):
+	""" k-means++ seeding; returns positions of k rows in X. """
+	idx = [rng.integers(len(X))]
+	d = sqDist(X, X[idx])[:,0]
+	for _ in range(1, k):
+		idx.append(rng.choice(len(X), p = d/d.sum()) if d.sum() > 0 else rng.integers(len(X)))
+		d = np.minimum(d, sqDist(X, X[idx[-1:]])[:,0])
+	return np.array(idx)
+
+def kmeans(X, k, seed = 0, maxIter = 300):
+	""" Lloyd's algorithm. Returns cluster labels (array over rows of X) and centroids. """
+	rng = np.random.default_rng(seed)
+	C = X[kmeansPP(X, k, rng)]
+	labels = None
+	for _ in range(maxIter):
+		new = sqDist(X, C).argmin(1)
+		if labels is not None and (new == labels).all():
+			break
+		labels = new
+		counts = np.bincount(labels, minlength = k)
+		sums = np.zeros_like(C)
+		np.add.at(sums, labels, X)
+		C = np.where(counts[:,None] > 0, sums / np.maximum(counts, 1)[:,None], C)
+	return labels, C
+
+def kmedoids(X, k, seed = 0, maxIter = 100):
+	""" Alternating (Voronoi iteration) k-medoids. Returns cluster labels and positions of the medoids in X. """
+	medoids = kmeansPP(X, k, np.random.default_rng(seed))
+	for _ in range(maxIter):
+		labels = sqDist(X, X[medoids]).argmin(1)
+		new = np.array([medoid(X, np.flatnonzero(labels == j), medoids[j]) for j in range(k)])
+		if (new == medoids).all():
+			break
+		medoids = new
+	return sqDist(X, X[medoids]).argmin(1), medoids
+
+def medoid(X, members, default):
+	return members[np.sqrt(sqDist(X[members], X[members])).sum(1).argmin()] if len(members) else default
+
+def durationCurve(X, k, score = None):
+	""" Sort hours by score (defaults to the first principal component of X) and split the sorted hours into k segments of (almost) equal size. """
+	if score is None:
+		Xc = X - X.mean(0)
+		score = Xc @ np.linalg.svd(Xc, full_matrices = False)[2][0]
+	labels = np.empty(len(X), dtype = int)
+	labels[np.argsort(score, kind = 'stable')] = np.repeat(np.arange(k), np.diff(np.linspace(0, len(X), k+1).round().astype(int)))
+	return labels
+
+def clusterHours(X, k, method = 'kmeans', seed = 0, score = None):
+	""" Cluster labels for each row in X. method ∈ {'kmeans','kmedoids','duration'}. Returns labels and (for 'kmedoids') medoid positions. score is used to sort hours with method 'duration'. """
+	if method == 'kmeans':
+		return kmeans(X, k, seed = seed)[0], None
+	elif method == 'kmedoids':
+		return kmedoids(X, k, seed = seed)
+	elif method == 'duration':
+		return durationCurve(X, k, score = score), None
+	raise ValueError(f"Unknown clustering method '{method}'")
+
+def aggregateHours(uHrCap, uHrLoad, k, method = 'kmeans', hoursPerYear = 8760, seed = 0, normalize = True, score = None):
+	"""
+	Aggregate hourly profiles (defined over 'idxHr' and 'idxHVTGen'/'idxHVTCons') to k representative hours.
+	- 'kmeans' and 'duration': Representative profiles are the cluster means (preserves the weighted mean of uHrLoad and uHrCap).
+	- 'kmedoids': Representative profiles are the profiles of the medoid hours (preserves observed combinations and extremes).
+	- 'duration': Hours are sorted by score (pd.Series over 'idxHr', e.g. net load; defaults to the first principal component of the profiles) and split into k segments.
+	Returns dictionary with symbols:
+	- 'idxHr': Representative hours h0001,...
+	- 'uHrCap', 'uHrLoad': Profiles over representative hours.
+	- 'hrWeight': Hours per year represented by each representative hour; sums to hoursPerYear.
+	- 'hrMap': Mapping (pd.MultiIndex) from original hours 'idxHrFull' to representative hours 'idxHr'.
+	"""
+	X = hrFeatures(uHrCap, uHrLoad, normalize = normalize)
+	labels, medoids = clusterHours(X.values, k, method = method, seed = seed, score = None if score is None else score.reindex(X.index).values)
+	used, labels = np.unique(labels, return_inverse = True) # drop empty clusters
+	order = np.argsort(np.array([np.flatnonzero(labels == j)[0] for j in range(len(used))])) # order representative hours chronologically by first member
+	labels = np.argsort(order)[labels]
+	idxHr = pd.Index([f'h{i+1:04d}' for i in range(len(used))], name = 'idxHr')
+	rep = lambda s, level: representative(s.unstack(level), labels, idxHr, None if medoids is None else np.asarray(medoids)[used[order]]).stack().rename(s.name).reorder_levels(s.index.names)
+	return {'idxHr': idxHr,
+			'uHrCap': rep(uHrCap, 'idxHVTGen'),
+			'uHrLoad': rep(uHrLoad, 'idxHVTCons'),
+			'hrWeight': pd.Series(np.bincount(labels) * hoursPerYear / len(labels), index = idxHr, name = 'hrWeight'),
+			'hrMap': pd.MultiIndex.from_arrays([X.index.rename('idxHrFull'), idxHr[labels]])}
+
+def representative(df, labels, idxHr, medoids = None):
+	""" Cluster means (or medoid rows) of df (hours × types). """
+	return (df.iloc[medoids] if medoids is not None else df.groupby(labels).mean()).set_axis(idxHr, axis = 0)
+
+def aggregationError(full, agg, keys = ('fuelCons','emissions','utilGenCap','utilGenCapHVT','unitGenCapCosts','pAvg','pAvgGen','mEV')):
+	""" Compare outputs from postSolve of a full and an aggregated model. Returns DataFrame with full and aggregated values, and absolute and relative errors. """
+	stack = lambda sol: pd.concat({k: sol[k] if isinstance(sol[k], pd.Series) else pd.Series([sol[k]]) for k in keys if k in sol}).rename_axis(['symbol','element'])
+	df = pd.DataFrame({'full': stack(full), 'agg': stack(agg)})
+	df['absError'] = df['agg'] - df['full']
+	df['relError'] = df['absError'] / df['full'].abs().replace(0, np.nan)
+	return df
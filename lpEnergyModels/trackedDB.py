@@ -0,0 +1,88 @@
+from lpEnergyModels.lazyBase import np, pd, SimpleDB
+import hashlib
+from contextlib import contextmanager
+
+def fingerprint(v):
+	""" Hash of the values of v (and the identity of its index), used to detect in-place changes. Indices are immutable and identified by the object. """
+	if isinstance(v, pd.Index):
+		return id(v)
+	return id(getattr(v, 'index', None)), hashlib.blake2b(np.ascontiguousarray(getattr(v, 'values', v)).tobytes(), digest_size = 16).digest()
+
+class TrackedDB(SimpleDB):
+	"""
+	SimpleDB that keeps a version number for each symbol and can record which symbols are read.
+	- Writes through __setitem__, set, aom/aomGpy (used by ModelShell.lazyLoop) and __delitem__ bump the version of the symbol.
+	- self.trace() records the names of symbols accessed through self[...] and self(...) while the context is active.
+	- In-place changes to a symbol (e.g. m.db('genCap').iloc[0] = 0) do not pass through these methods. They are detected by comparing content
+	  fingerprints (see self.fingerprint): self.sync(fingerprints) bumps the versions of the symbols that changed since the fingerprints were taken.
+	"""
+	def __init__(self, name = None, symbols = None, alias = None):
+		super().__init__(name = name, symbols = symbols, alias = alias)
+		self.counter = 0
+		self.version = dict.fromkeys(self.symbols, 0)
+		self._reads = []
+
+	@classmethod
+	def fromDB(cls, db):
+		""" Initialize from existing SimpleDB (symbols are not copied). """
+		if isinstance(db, cls):
+			return db
+		obj = cls(name = db.name, symbols = db.symbols)
+		obj.alias = db.alias
+		return obj
+
+	def touch(self, item):
+		self.counter += 1
+		self.version[item] = self.counter
+
+	def fingerprint(self, item):
+		""" Fingerprint of the value of symbol item (see fingerprint). """
+		return fingerprint(getattr(self.symbols[item], 'v', self.symbols[item]))
+
+	def fingerprints(self):
+		return {k: self.fingerprint(k) for k in self.symbols}
+
+	def sync(self, fingerprints):
+		""" Touch the symbols whose fingerprints differ from fingerprints (e.g. from an earlier self.fingerprints()), i.e. that were changed in place. Returns the names. """
+		changed = [k for k,v in fingerprints.items() if k in self.symbols and self.fingerprint(k) != v]
+		[self.touch(k) for k in changed];
+		return changed
+
+	def changedSince(self, counter):
+		return {k for k,v in self.version.items() if v > counter}
+
+	@contextmanager
+	def trace(self):
+		reads = set()
+		self._reads.append(reads)
+		try:
+			yield reads
+		finally:
+			self._reads.pop()
+
+	def recordReads(self, items):
+		""" Record items as read in the active traces (e.g. for values taken from a cache rather than computed from self). """
+		[reads.update(items) for reads in self._reads];
+
+	def __getitem__(self, item):
+		[reads.add(item) for reads in self._reads];
+		return super().__getitem__(item)
+
+	def __contains__(self, item):
+		[reads.add(item) for reads in self._reads];
+		return item in self.symbols
+
+	def __setitem__(self, item, value):
+		super().__setitem__(item, value)
+		self.touch(item)
+
+	def __delitem__(self, item):
+		super().__delitem__(item)
+		self.touch(item)
+
+	def aomGpy(self, symbol, **kwargs):
+		super().aomGpy(symbol, **kwargs)
+		self.touch(symbol.name)
+
+	def __getstate__(self):
+		return self.__dict__ | {'_reads': []}
@@ -0,0 +1,104 @@
+"""Compare memory use of hourly symbols and solutions in the standard and the compact representation (EnergyShell.enableCompact).
+
+MBasicInt is compiled on the hourly data (default: DK2025 with 8760 hours) and solved for --scenarios values of taxEm.
+For each representation the script reports:
+- db: hourly symbols in the database (mcHr, genCapHr, loadHr, uHrCap, uHrLoad, idxHr),
+- results: the hourly outputs (--outputs) of all scenarios, as kept by lazyLoop,
+measured as bytes of values plus each distinct index object once (compact.memoryUsage) and as memory retained according to tracemalloc.
+Results of the compact mode are decoded (EnergyShell.decode) and checked against the standard representation.
+
+CLI Example:
+    python scripts/bench_compact.py --scenarios 10 --dtype float32
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from lpEnergyModels.compact import memoryUsage  # noqa: E402
+from lpEnergyModels.dataStore import readSource  # noqa: E402
+from lpEnergyModels.mBasicIntShell import MBasicInt  # noqa: E402
+
+DATA = os.path.join(ROOT, "data", "EX_MBasicInt_DK2025_8760.xlsx")
+HOURLY = ("mcHr", "genCapHr", "loadHr", "uHrCap", "uHrLoad", "idxHr")
+OUTPUTS = ("generation", "demand", "λu_generation", "λeq_equilibrium")
+
+
+def traced(f):
+    """Result of f() and the memory it retains according to tracemalloc."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    out = f()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return out, retained
+
+
+def tax_grid(idxEm: pd.Index, scenarios: int, tax_max: float = 200) -> tuple:
+    idx = pd.Index(range(scenarios), name="l")
+    grid = pd.concat({e: pd.Series(np.linspace(0, tax_max, scenarios), index=idx) for e in idxEm}, names=["idxEm"])
+    return grid.reorder_levels(["l", "idxEm"]).rename("taxEm"), idx
+
+
+def run_mode(data: dict, compact: bool, scenarios: int, outputs: Sequence[str], dtype: Optional[str]) -> tuple:
+    def build():
+        m = MBasicInt()
+        [m.db.__setitem__(k, v) for k, v in data.items()]
+        if compact:
+            m.enableCompact(dtype=dtype)
+        m.compile()
+        return m
+
+    m, _ = traced(build)
+    grid, idx = tax_grid(data["idxEm"], scenarios)
+    t0 = time.perf_counter()
+    sols, retained = traced(lambda: m.lazyLoop(grid, idx, outputs=list(outputs)))
+    elapsed = time.perf_counter() - t0
+    db = memoryUsage([m.db(k) for k in HOURLY])
+    row = {"mode": "compact" if compact else "standard", "db_bytes": db, "results_bytes": memoryUsage([v for s in sols.values() for v in s.values()]),
+           "results_traced": retained, "loop_s": elapsed}
+    return row, m, sols
+
+
+def max_diff(a: dict, b: dict) -> float:
+    return max(float(np.nanmax(np.abs(a[l][k].astype(float) - b[l][k].reindex(a[l][k].index).astype(float)))) for l in a for k in a[l])
+
+
+def run(path: str = DATA, scenarios: int = 10, outputs: Sequence[str] = OUTPUTS, dtype: Optional[str] = "float32") -> pd.DataFrame:
+    data = readSource(path)
+    data.pop("__meta__", None)
+    std, _, ref = run_mode(data, False, scenarios, outputs, dtype)
+    cmp, m, sols = run_mode(data, True, scenarios, outputs, dtype)
+    cmp["max_abs_diff"] = max_diff(ref, {l: m.decode(s) for l, s in sols.items()})
+    df = pd.DataFrame([std, cmp]).set_index("mode")
+    for k in ("db_bytes", "results_bytes", "results_traced"):
+        df[f"{k}_ratio"] = df[k] / df.loc["standard", k]
+    return df
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Compare memory use of the standard and the compact representation of hourly symbols and solutions")
+    p.add_argument("--data", default=DATA)
+    p.add_argument("--scenarios", type=int, default=10)
+    p.add_argument("--outputs", nargs="+", default=list(OUTPUTS))
+    p.add_argument("--dtype", default="float32", help="dtype of results in compact mode ('none' keeps float64)")
+    args = p.parse_args(argv)
+    df = run(args.data, scenarios=args.scenarios, outputs=args.outputs, dtype=None if args.dtype.lower() == "none" else args.dtype)
+    print(df.to_string(float_format="{:.4g}".format))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(cli())
@@ -0,0 +1,92 @@
+"""Benchmark the pandas and NumPy compile engines of MBasicInt.
+
+Datasets with 24, 168, 2190 and 8760 hours are created by selecting the first
+N hours of data/EX_MBasicInt_DK2025_8760.xlsx. For each size the script
+compiles the model with engine='pandas' and engine='numpy', checks that
+sys.out is identical, and reports the best-of-n compile times.
+
+CLI Example:
+    python scripts/bench_compile_engine.py --hours 24 168 2190 8760 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pyDbs  # noqa: E402
+from lpEnergyModels.mBasicIntShell import MBasicInt, MBasicIntEmCap, MBasicIntRES  # noqa: E402
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "EX_MBasicInt_DK2025_8760.xlsx")
+MODELS = {"MBasicInt": MBasicInt, "MBasicIntEmCap": MBasicIntEmCap, "MBasicIntRES": MBasicIntRES}
+
+
+def load_data(path: str = DATA) -> dict:
+    data = pyDbs.ExcelSymbolLoader(path)()
+    data.pop("__meta__", None)
+    data.setdefault("emCap", pd.Series(1e6, index=data["idxEm"], name="emCap"))
+    data.setdefault("RESCap", 0.5)
+    return data
+
+
+def subset_hours(data: dict, n: int) -> dict:
+    """Return copy of data restricted to the first n hours of idxHr."""
+    idxHr = data["idxHr"][:n]
+    out = dict(data)
+    out["idxHr"] = idxHr
+    for k in ("uHrCap", "uHrLoad"):
+        out[k] = data[k][data[k].index.get_level_values("idxHr").isin(idxHr)]
+    return out
+
+
+def build(cls, data: dict, engine: str):
+    m = cls(engine=engine)
+    [m.db.__setitem__(k, v) for k, v in data.items()]
+    return m
+
+
+def time_compile(cls, data: dict, engine: str, repeat: int):
+    best, m = np.inf, None
+    for _ in range(repeat):
+        m = build(cls, data, engine)
+        t0 = time.perf_counter()
+        m.compile()
+        best = min(best, time.perf_counter() - t0)
+    return best, m
+
+
+def same_out(a, b) -> bool:
+    vec = all(np.array_equal(a.sys.out[k], b.sys.out[k], equal_nan=True) for k in ("c", "b_eq", "b_ub", "bounds"))
+    mat = all((a.sys.out[k].tocsr() != b.sys.out[k].tocsr()).nnz == 0 for k in ("A_eq", "A_ub"))
+    return vec and mat
+
+
+def run(hours: Sequence[int], model: str = "MBasicInt", repeat: int = 3, path: str = DATA) -> pd.DataFrame:
+    data, rows = load_data(path), []
+    for n in hours:
+        d = subset_hours(data, n)
+        tp, mp = time_compile(MODELS[model], d, "pandas", repeat)
+        tn, mn = time_compile(MODELS[model], d, "numpy", repeat)
+        rows.append({"hours": n, "pandas_s": tp, "numpy_s": tn, "speedup": tp / tn, "identical": same_out(mp, mn)})
+    return pd.DataFrame(rows).set_index("hours")
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark MBasicInt compile engines")
+    p.add_argument("--hours", nargs="+", type=int, default=[24, 168, 2190, 8760])
+    p.add_argument("--model", default="MBasicInt", choices=list(MODELS))
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--data", default=DATA)
+    args = p.parse_args(argv)
+    print(run(args.hours, model=args.model, repeat=args.repeat, path=args.data).to_string())
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(cli())
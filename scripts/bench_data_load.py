@@ -0,0 +1,91 @@
+"""Benchmark loading datasets from .xlsx, .pkl and the binary data store.
+
+For each dataset the script converts the workbook to a pickle and a data
+store in a temporary directory and reports best-of-n times for:
+- xlsx:        pyDbs.ExcelSymbolLoader (all symbols)
+- pkl:         pickle.load of the symbol dict
+- store_open:  DataStore(...).db() (reads meta.json only)
+- store_all:   DataStore(...)() (all symbols, large arrays memory-mapped)
+- store_model: DataStore(...).db() followed by MBasicInt.compile (reads only the symbols the model uses)
+- pkl_model:   pickle.load followed by MBasicInt.compile
+
+CLI Example:
+    python scripts/bench_data_load.py --data data/EX_MBasicInt_CA.xlsx data/EX_MBasicInt_DK2025_8760.xlsx --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+from typing import Callable, Optional, Sequence
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import pyDbs  # noqa: E402
+from lpEnergyModels.dataStore import DataStore, readSource, writeStore  # noqa: E402
+from lpEnergyModels.mBasicIntShell import MBasicInt  # noqa: E402
+
+DATA = [os.path.join(ROOT, "data", f) for f in ("EX_MBasicInt_CA.xlsx", "EX_MBasicInt_DK2025_8760.xlsx")]
+
+
+def best_of(f: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def load_pkl(path: str) -> dict:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def compile_from(data: dict, engine: str) -> MBasicInt:
+    m = MBasicInt(engine=engine)
+    [m.db.__setitem__(k, v) for k, v in data.items()]
+    m.compile()
+    return m
+
+
+def run(paths: Sequence[str] = DATA, repeat: int = 3, engine: str = "numpy", xlsx_repeat: int = 1) -> pd.DataFrame:
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            data = readSource(path)
+            pkl, store = os.path.join(tmp, f"{name}.pkl"), os.path.join(tmp, name)
+            with open(pkl, "wb") as f:
+                pickle.dump(data, f)
+            writeStore(data, store)
+            rows.append({
+                "dataset": name,
+                "xlsx": best_of(lambda: pyDbs.ExcelSymbolLoader(path)(), xlsx_repeat),
+                "pkl": best_of(lambda: load_pkl(pkl), repeat),
+                "store_open": best_of(lambda: DataStore(store).db(), repeat),
+                "store_all": best_of(lambda: DataStore(store)(), repeat),
+                "store_model": best_of(lambda: MBasicInt(db=DataStore(store).db(), engine=engine).compile(), repeat),
+                "pkl_model": best_of(lambda: compile_from(load_pkl(pkl), engine), repeat),
+            })
+    return pd.DataFrame(rows).set_index("dataset")
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark loading datasets from xlsx, pkl and the binary data store")
+    p.add_argument("--data", nargs="+", default=DATA)
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--xlsx-repeat", type=int, default=1)
+    p.add_argument("--engine", default="numpy", choices=["pandas", "numpy"])
+    args = p.parse_args(argv)
+    print(run(args.data, repeat=args.repeat, engine=args.engine, xlsx_repeat=args.xlsx_repeat).to_string(float_format="{:.4f}".format))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(cli())
@@ -0,0 +1,65 @@
+"""Benchmark import time of lpEnergyModels.
+
+Each statement is run in a fresh interpreter (best of --repeat). The script reports the time of the statement itself (the interpreter
+start is excluded), the number of modules it loads, and whether it loads symMaps/scipy.optimize/highspy. 'import pandas' is a reference:
+Every model needs pandas, but e.g. scripts/fetch_prices.py-style tools that only use lpEnergyModels.dataStore do not need symMaps.
+
+CLI Example:
+    python scripts/bench_import.py --repeat 5
+    python scripts/bench_import.py --statements "from lpEnergyModels import MBasicInt"
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Optional, Sequence
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATEMENTS = (
+    "import pandas",
+    "import lpEnergyModels",
+    "from lpEnergyModels import kernels",
+    "from lpEnergyModels.dataStore import writeStore",
+    "from lpEnergyModels import MBasic",
+    "from lpEnergyModels import MBasicInt",
+    "from lpEnergyModels import *",
+)
+HEAVY = ("symMaps", "scipy.optimize", "highspy")
+PROBE = """
+import sys, time, json
+before = set(sys.modules)
+t0 = time.perf_counter()
+exec({stmt!r})
+t = time.perf_counter() - t0
+print(json.dumps({{"seconds": t, "modules": len(set(sys.modules) - before), **{{k: k in sys.modules for k in {heavy!r}}}}}))
+"""
+
+
+def time_statement(stmt: str, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(stmt=stmt, heavy=HEAVY)], cwd=ROOT, capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {"statement": stmt, **min(runs, key=lambda r: r["seconds"])}
+
+
+def run(statements: Sequence[str] = STATEMENTS, repeat: int = 5) -> pd.DataFrame:
+    return pd.DataFrame([time_statement(s, repeat) for s in statements]).set_index("statement")
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark import time of lpEnergyModels in fresh interpreters")
+    p.add_argument("--statements", nargs="+", default=list(STATEMENTS))
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args(argv)
+    print(run(args.statements, repeat=args.repeat).to_string(float_format="{:.3f}".format))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(cli())
@@ -0,0 +1,127 @@
+"""Benchmark the vectorized helper functions (lpEnergyModels.kernels) against the pandas implementations.
+
+Two workloads are timed (best of --repeat):
+- grid: mc and fuelCost with a gridded taxEm over --points grid points (as in docs/Shocks.ipynb):
+  pandas (kernels.pdMc), the pandas-compatible wrapper (kernels.mc) and the array kernel on pre-coded arrays (kernels.npMc).
+- loop: fuelConsumption, emissionsFuel, avgGenPrice, unitGenC and mEV for --scenarios solutions of MBasicInt
+  (a taxEm sweep over the first --hours hours of the data): the pandas functions called once per scenario and
+  the wrappers called once on the DataFrames from batchLoopAsDFs (scenarios in columns).
+Results of the vectorized versions are checked against the pandas versions.
+
+CLI Example:
+    python scripts/bench_kernels.py --points 10 100 1000 --hours 24 168 --scenarios 100
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from lpEnergyModels import kernels  # noqa: E402
+from lpEnergyModels.dataStore import readSource  # noqa: E402
+from lpEnergyModels.mBasicIntShell import MBasicInt, uHrGenCap  # noqa: E402
+
+DATA = os.path.join(ROOT, "data", "EX_MBasicInt_DK2025_8760.xlsx")
+
+
+def best_of(f, repeat: int):
+    best, out = np.inf, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = f()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def max_diff(a, b) -> float:
+    a, b = (x.sort_index() if isinstance(x, (pd.Series, pd.DataFrame)) else x for x in (a, b))
+    return float(np.nanmax(np.abs(np.asarray(a, dtype=float) - np.asarray(b, dtype=float)))) if np.size(a) else 0.0
+
+
+def tax_grid(idxEm: pd.Index, points: int, tax_max: float = 200) -> pd.Series:
+    grid = pd.Series(np.linspace(0, tax_max, points), index=pd.Index(range(points), name="l"))
+    return pd.concat({e: grid for e in idxEm}, names=["idxEm"]).reorder_levels(["l", "idxEm"]).rename("taxEm")
+
+
+def bench_grid(data: dict, points: int, repeat: int) -> list:
+    tax = tax_grid(data["idxEm"], points)
+    args = (data["uFuel"], data["VOM"], data["pFuel"], data["uEm"], tax)
+    doms = kernels.domains([(data["uFuel"], ("idxF", "idxGen")), (data["uEm"], ("idxF", "idxEm"))])
+    grid = ("levels", tax.index.droplevel("idxEm").unique().sort_values())
+    coded = [kernels.dense(x, dims, doms, grid) for x, dims in zip(args, [("idxF", "idxGen"), ("idxGen",), ("idxF",), ("idxF", "idxEm"), ("idxEm",)])]
+    t_pd, ref = best_of(lambda: kernels.pdMc(*args), repeat)
+    t_wrap, res = best_of(lambda: kernels.mc(*args), repeat)
+    t_np, _ = best_of(lambda: kernels.npMc(*coded), repeat)
+    t_pdF, refF = best_of(lambda: kernels.pdFuelCost(data["pFuel"], data["uEm"], tax), repeat)
+    t_wrapF, resF = best_of(lambda: kernels.fuelCost(data["pFuel"], data["uEm"], tax), repeat)
+    return [{"workload": "grid", "function": "mc", "size": points, "pandas_s": t_pd, "vectorized_s": t_wrap, "kernel_s": t_np, "max_abs_diff": max_diff(res, ref)},
+            {"workload": "grid", "function": "fuelCost", "size": points, "pandas_s": t_pdF, "vectorized_s": t_wrapF, "kernel_s": np.nan, "max_abs_diff": max_diff(resF, refF)}]
+
+
+def subset_hours(data: dict, n: int) -> dict:
+    out = dict(data)
+    out["idxHr"] = data["idxHr"][:n]
+    for k in ("uHrCap", "uHrLoad"):
+        out[k] = data[k][data[k].index.get_level_values("idxHr").isin(out["idxHr"])]
+    return out
+
+
+def bench_loop(data: dict, hours: int, scenarios: int, repeat: int) -> list:
+    d = subset_hours(data, hours)
+    m = MBasicInt(engine="numpy")
+    [m.db.__setitem__(k, v) for k, v in d.items()]
+    m.compile()
+    tax = tax_grid(d["idxEm"], scenarios)
+    idx = tax.index.levels[0]
+    sols = m.batchLoopAsDFs(tax, idx, postSolve=False)
+    gen, pHr, λ = sols["generation"], sols["λeq_equilibrium"], sols["λu_generation"]
+    mcHr, uCap = m.db("mcHr"), uHrGenCap(d["uHrCap"], d["idxGen2HVTGen"])
+    cases = {
+        "fuelConsumption": (lambda g: kernels.pdFuelConsumption(g, d["uFuel"], m.scale, ["idxGen", "idxHr"]), lambda G: kernels.fuelConsumption(G, d["uFuel"], m.scale, ["idxGen", "idxHr"]), [gen]),
+        "avgGenPrice": (lambda g, p: kernels.pdAvgGenPrice(g, p), lambda G, P: kernels.avgGenPrice(G, P), [gen, pHr]),
+        "unitGenC": (lambda g: kernels.pdUnitGenC(mcHr, d["FOM"], d["INVC"], g, d["genCap"], m.scale), lambda G: kernels.unitGenC(mcHr, d["FOM"], d["INVC"], G, d["genCap"], m.scale), [gen]),
+        "mEV": (lambda l: kernels.pdMEV(l, uCap, d["FOM"], d["INVC"], d["genCap"], m.scale), lambda L: kernels.mEV(L, uCap, d["FOM"], d["INVC"], d["genCap"], m.scale), [λ]),
+    }
+    rows = []
+    for name, (f_pd, f_vec, inputs) in cases.items():
+        t_pd, ref = best_of(lambda: pd.concat({l: f_pd(*(x[l] for x in inputs)) for l in idx}, axis=1), repeat)
+        t_vec, res = best_of(lambda: f_vec(*inputs), repeat)
+        rows.append({"workload": f"loop_{hours}h", "function": name, "size": scenarios, "pandas_s": t_pd, "vectorized_s": t_vec, "kernel_s": np.nan, "max_abs_diff": max_diff(res, ref)})
+    fc = kernels.fuelConsumption(gen, d["uFuel"], m.scale, ["idxGen", "idxHr"])
+    t_pd, ref = best_of(lambda: pd.concat({l: kernels.pdEmissionsFuel(fc[l], d["uEm"]) for l in idx}, axis=1), repeat)
+    t_vec, res = best_of(lambda: kernels.emissionsFuel(fc, d["uEm"]), repeat)
+    rows.append({"workload": f"loop_{hours}h", "function": "emissionsFuel", "size": scenarios, "pandas_s": t_pd, "vectorized_s": t_vec, "kernel_s": np.nan, "max_abs_diff": max_diff(res, ref)})
+    return rows
+
+
+def run(path: str = DATA, points: Sequence[int] = (10, 100, 1000), hours: Sequence[int] = (24, 168), scenarios: int = 100, repeat: int = 3) -> pd.DataFrame:
+    data = readSource(path)
+    data.pop("__meta__", None)
+    rows = [r for p in points for r in bench_grid(data, p, repeat)] + [r for h in hours for r in bench_loop(data, h, scenarios, repeat)]
+    df = pd.DataFrame(rows)
+    df["speedup"] = df["pandas_s"] / df["vectorized_s"]
+    return df
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark vectorized helper functions against the pandas implementations")
+    p.add_argument("--data", default=DATA)
+    p.add_argument("--points", type=int, nargs="+", default=[10, 100, 1000], help="grid points in the gridded mc/fuelCost workload")
+    p.add_argument("--hours", type=int, nargs="+", default=[24, 168], help="hours in the loop workload (first N hours of the data)")
+    p.add_argument("--scenarios", type=int, default=100, help="scenarios in the loop workload")
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args(argv)
+    df = run(args.data, points=args.points, hours=args.hours, scenarios=args.scenarios, repeat=args.repeat)
+    print(df.to_string(index=False, float_format="{:.4g}".format))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(cli())
@@ -0,0 +1,234 @@
+"""Benchmark suite for the compile, solve and postSolve phases of the models.
+
+Each case combines a model class, a dataset and a compile engine. The
+phases compileMaps, updateAux, compileParams, solve and postSolve (with all
+outputs computed) are timed separately (best of --repeat runs). A separate
+run with tracemalloc records the peak memory allocated by Python/NumPy in
+each phase. The suite covers:
+- MBasic, MBasicEmCap, MBasicRES on data/EX_MBasic.xlsx
+- MBasicInt, MBasicIntEmCap, MBasicIntRES on data/EX_MBasicInt_CA.xlsx,
+  data/EX_MBasicInt_DK2025.xlsx (24 hours) and data/EX_MBasicInt_DK2025_8760.xlsx
+- Synthetic datasets built from the 8760-hour data with each generator
+  replicated --gen-factor times and hours tiled to --synthetic-hours.
+
+Results are written as JSON (records plus metadata such as the git commit)
+or CSV, depending on the extension of --out. --compare prints the ratio of
+times and peak memory to an earlier result file.
+
+CLI Example:
+    python scripts/bench_models.py --out bench/results.json
+    python scripts/bench_models.py --cases MBasicInt:DK2025_8760 --engines numpy --compare bench/results.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from lpEnergyModels.dataStore import readSource  # noqa: E402
+from lpEnergyModels.mBasicShell import MBasic, MBasicEmCap, MBasicRES  # noqa: E402
+from lpEnergyModels.mBasicIntShell import MBasicInt, MBasicIntEmCap, MBasicIntRES  # noqa: E402
+
+PHASES = ("compileMaps", "updateAux", "compileParams", "solve", "postSolve")
+MODELS = {c.__name__: c for c in (MBasic, MBasicEmCap, MBasicRES, MBasicInt, MBasicIntEmCap, MBasicIntRES)}
+DATASETS = {
+    "MBasic": os.path.join(ROOT, "data", "EX_MBasic.xlsx"),
+    "CA": os.path.join(ROOT, "data", "EX_MBasicInt_CA.xlsx"),
+    "DK2025": os.path.join(ROOT, "data", "EX_MBasicInt_DK2025.xlsx"),
+    "DK2025_8760": os.path.join(ROOT, "data", "EX_MBasicInt_DK2025_8760.xlsx"),
+}
+CASES = [f"{m}:MBasic" for m in ("MBasic", "MBasicEmCap", "MBasicRES")] + [
+    f"{m}:{d}" for d in ("CA", "DK2025", "DK2025_8760", "synthetic") for m in ("MBasicInt", "MBasicIntEmCap", "MBasicIntRES")
+]
+
+
+# ---- Data -------------------------------------------------------------------
+def with_defaults(data: dict) -> dict:
+    """Add emCap and RESCap (used by the EmCap/RES variants) if the dataset does not define them."""
+    data = dict(data)
+    data.setdefault("emCap", pd.Series(1e6, index=data["idxEm"], name="emCap"))
+    data.setdefault("RESCap", 0.5)
+    return data
+
+
+def replicate(x, level: str, mapping: pd.DataFrame):
+    """Replace each element of 'level' in x (pd.Index or pd.Series) by its copies; mapping has columns [level, 'new']."""
+    frame = (x.to_frame(index=False) if isinstance(x, pd.Index) else x.rename("__v").reset_index()).merge(mapping, on=level)
+    frame[level] = frame.pop("new")
+    names = list(x.names if isinstance(x, pd.Index) else x.index.names)
+    index = pd.MultiIndex.from_frame(frame[names]) if len(names) > 1 else pd.Index(frame[level], name=level)
+    return index if isinstance(x, pd.Index) else pd.Series(frame["__v"].values, index=index, name=x.name)
+
+
+def tile_hours(s: pd.Series, level: str, idxHr: pd.Index, pos: np.ndarray) -> pd.Series:
+    """Hourly profile s (over 'idxHr' and 'level') with hour positions pos of the original hours assigned to the new hours idxHr."""
+    wide = s.unstack(level).iloc[pos].set_axis(idxHr, axis=0)
+    return wide.stack().rename(s.name).reorder_levels(s.index.names)
+
+
+def synthetic(data: dict, gen_factor: int = 4, hours: int = 8760) -> dict:
+    """Dataset with each generator replicated gen_factor times (capacity split evenly, VOM perturbed to avoid ties) and hourly profiles tiled to 'hours' hours."""
+    gens = data["idxGen"]
+    mapping = pd.DataFrame({"idxGen": np.repeat(gens, gen_factor), "new": [f"{g}_{c}" for g in gens for c in range(gen_factor)]})
+    out = {k: replicate(v, "idxGen", mapping) if "idxGen" in getattr(v, "names", getattr(getattr(v, "index", None), "names", [])) else v for k, v in data.items()}
+    copy = pd.Series(np.tile(np.arange(gen_factor), len(gens)), index=pd.Index(mapping["new"], name="idxGen"))
+    out["genCap"] = out["genCap"] / gen_factor
+    out["VOM"] = out["VOM"].add(0.01 * copy, fill_value=0).rename("VOM")
+    idxHr = pd.Index([f"h{i + 1:0{max(4, len(str(hours)))}d}" for i in range(hours)], name="idxHr")
+    pos = np.arange(hours) % len(data["idxHr"])
+    out["idxHr"] = idxHr
+    out["uHrCap"] = tile_hours(data["uHrCap"], "idxHVTGen", idxHr, pos)
+    out["uHrLoad"] = tile_hours(data["uHrLoad"], "idxHVTCons", idxHr, pos)
+    return out
+
+
+def load_datasets(names: Sequence[str], gen_factor: int, hours: int) -> Dict[str, dict]:
+    out = {}
+    for name in names:
+        if name == "synthetic":
+            base = out.get("DK2025_8760") or readSource(DATASETS["DK2025_8760"])
+            out[name] = with_defaults(synthetic(base, gen_factor=gen_factor, hours=hours))
+        else:
+            out[name] = with_defaults(readSource(DATASETS[name]))
+    return out
+
+
+# ---- Timing -------------------------------------------------------------------
+def build(cls, data: dict, engine: str):
+    m = cls(engine=engine)
+    [m.db.__setitem__(k, v) for k, v in data.items()]
+    return m
+
+
+def phases(m) -> Dict[str, Callable]:
+    """Steps of m.compile (full compile), m.solve and m.postSolve; each step uses the result of the previous ones."""
+    state = {}
+    return {
+        "compileMaps": lambda: (m.resetStages(), m.compileMaps()),
+        "updateAux": lambda: m.updateAux(),
+        "compileParams": lambda: m.compileParams(),
+        "solve": lambda: state.__setitem__("sol", m.solve()),
+        "postSolve": lambda: dict(m.postSolve(state["sol"]).items()),
+    }
+
+
+def time_phases(cls, data: dict, engine: str) -> Dict[str, float]:
+    out = {}
+    for phase, f in phases(build(cls, data, engine)).items():
+        t0 = time.perf_counter()
+        f()
+        out[phase] = time.perf_counter() - t0
+    return out
+
+
+def peak_memory(cls, data: dict, engine: str) -> Dict[str, int]:
+    """Peak bytes allocated (tracemalloc) in each phase, relative to the allocations when the phase starts."""
+    out, m = {}, build(cls, data, engine)
+    tracemalloc.start()
+    try:
+        for phase, f in phases(m).items():
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            f()
+            out[phase] = tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return out
+
+
+def size_of(m) -> Dict[str, int]:
+    return {"n_v": int(m.sys.len["v"]), "n_eq": int(m.sys.len["eq"]), "n_ub": int(m.sys.len["ub"]),
+            "nnz": int(m.sys.out["A_eq"].nnz + m.sys.out["A_ub"].nnz)}
+
+
+def run_case(model: str, dataset: str, data: dict, engine: str, repeat: int) -> List[dict]:
+    cls = MODELS[model]
+    times = [time_phases(cls, data, engine) for _ in range(repeat)]
+    peaks = peak_memory(cls, data, engine)
+    m = build(cls, data, engine)
+    m.compile()
+    return [{"model": model, "dataset": dataset, "engine": engine, "phase": phase,
+             "time_s": min(t[phase] for t in times), "peak_bytes": peaks[phase], **size_of(m)} for phase in PHASES]
+
+
+def run(cases: Sequence[str] = CASES, engines: Sequence[str] = ("pandas", "numpy"), repeat: int = 3,
+        gen_factor: int = 4, hours: int = 8760) -> pd.DataFrame:
+    pairs = [c.split(":") for c in cases]
+    datasets = load_datasets(list(dict.fromkeys(d for _, d in pairs)), gen_factor, hours)
+    rows = []
+    for model, dataset in pairs:
+        for engine in engines:
+            if engine == "numpy" and not model.startswith("MBasicInt"):
+                continue  # MBasic has no NumPy stages
+            rows += run_case(model, dataset, datasets[dataset], engine, repeat)
+            print(f"{model:16s} {dataset:12s} {engine:7s} done", file=sys.stderr)
+    return pd.DataFrame(rows)
+
+
+# ---- Output -------------------------------------------------------------------
+def metadata(args: Optional[argparse.Namespace] = None) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "python": platform.python_version(),
+            "platform": platform.platform(), "numpy": np.__version__, "pandas": pd.__version__, "args": vars(args) if args else None}
+
+
+def write(df: pd.DataFrame, path: str, meta: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith(".csv"):
+        df.assign(commit=meta["commit"]).to_csv(path, index=False)
+    else:
+        with open(path, "w") as f:
+            json.dump({"meta": meta, "results": df.to_dict(orient="records")}, f, indent=1)
+
+
+def read(path: str) -> pd.DataFrame:
+    if path.endswith(".csv"):
+        return pd.read_csv(path)
+    with open(path) as f:
+        return pd.DataFrame(json.load(f)["results"])
+
+
+def compare(new: pd.DataFrame, old: pd.DataFrame) -> pd.DataFrame:
+    """Ratio new/old of time and peak memory for cases in both results (> 1 means slower/larger)."""
+    keys = ["model", "dataset", "engine", "phase"]
+    df = new.merge(old, on=keys, suffixes=("", "_old"))
+    return df.assign(time_ratio=df["time_s"] / df["time_s_old"], mem_ratio=df["peak_bytes"] / df["peak_bytes_old"].replace(0, np.nan))[
+        keys + ["time_s", "time_s_old", "time_ratio", "peak_bytes", "peak_bytes_old", "mem_ratio"]]
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark compile/solve/postSolve phases of the model variants")
+    p.add_argument("--cases", nargs="+", default=CASES, help="model:dataset pairs, datasets: " + ", ".join(list(DATASETS) + ["synthetic"]))
+    p.add_argument("--engines", nargs="+", default=["pandas", "numpy"], choices=["pandas", "numpy"])
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--gen-factor", type=int, default=4, help="copies of each generator in the synthetic dataset")
+    p.add_argument("--synthetic-hours", type=int, default=8760)
+    p.add_argument("--out", default=None, help="result file (.json or .csv)")
+    p.add_argument("--compare", default=None, help="earlier result file to compare with")
+    args = p.parse_args(argv)
+    df = run(args.cases, engines=args.engines, repeat=args.repeat, gen_factor=args.gen_factor, hours=args.synthetic_hours)
+    if args.out:
+        write(df, args.out, metadata(args))
+    with pd.option_context("display.width", 200):
+        print(df.pivot_table(index=["model", "dataset", "engine"], columns="phase", values="time_s", sort=False)[list(PHASES)].to_string(float_format="{:.4f}".format))
+        if args.compare:
+            print(compare(df, read(args.compare)).to_string(index=False, float_format="{:.3f}".format))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(cli())
@@ -0,0 +1,104 @@
+"""Benchmark warm-started solves in scenario loops.
+
+A taxEm sweep (as in docs/Shocks.ipynb) is run with each solver backend:
+- scipy: scipy.optimize.linprog from scratch in every scenario (ScipySolver)
+- cold:  HiGHS with the LP reloaded in every scenario (HighsSolver reset before each solve)
+- warm:  persistent HiGHS LP updated in place and warm-started from the previous basis (HighsSolver)
+- ranging: solutions computed from the last optimal basis while it remains optimal (sensitivity.RangingSolver)
+For each scenario the script reports simplex iterations and solve time, checks
+that the objective matches the scipy solve, and prints the iterations and time
+saved per scenario relative to scipy.
+
+CLI Example:
+    python scripts/bench_warm_start.py --data data/EX_MBasicInt_DK2025_8760.xlsx --model MBasicIntEmCap --points 20 --tax-max 200
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from lpEnergyModels.dataStore import readSource  # noqa: E402
+from lpEnergyModels.mBasicIntShell import MBasicInt, MBasicIntEmCap, MBasicIntRES  # noqa: E402
+from lpEnergyModels.sensitivity import RangingSolver  # noqa: E402
+from lpEnergyModels.solvers import HighsSolver, ScipySolver  # noqa: E402
+
+DATA = os.path.join(ROOT, "data", "EX_MBasicInt_DK2025_8760.xlsx")
+MODELS = {"MBasicInt": MBasicInt, "MBasicIntEmCap": MBasicIntEmCap, "MBasicIntRES": MBasicIntRES}
+
+
+class ColdHighsSolver(HighsSolver):
+    """HighsSolver that loads the LP from scratch in every call."""
+    name = "cold"
+
+    def __call__(self, out, solOptions=None):
+        self.reset()
+        return super().__call__(out, solOptions)
+
+
+SOLVERS = {"scipy": ScipySolver, "cold": ColdHighsSolver, "warm": HighsSolver, "ranging": RangingSolver}
+
+
+def tax_grid(idxEm: pd.Index, points: int, tax_max: float) -> pd.Series:
+    grid = pd.Series(np.linspace(0, tax_max, points), index=pd.Index(range(points), name="l"))
+    return pd.concat({e: grid for e in idxEm}, names=["idxEm"]).reorder_levels(["l", "idxEm"]).rename("taxEm")
+
+
+def sweep(cls, data: dict, solver: str, grid: pd.Series, engine: str) -> pd.DataFrame:
+    m = cls(engine=engine, solver=SOLVERS[solver]())
+    [m.db.__setitem__(k, v) for k, v in data.items()]
+    m.compile()
+    m.solve()  # initial solve at the base taxEm (not timed)
+    rows = []
+    for l in grid.index.levels[0]:
+        m.db.aom(grid.xs(l), name="taxEm", priority="first")
+        m.compile()
+        t0 = time.perf_counter()
+        sol = m.solve()
+        rows.append({"solver": solver, "scenario": l, "nit": sol["nit"], "time_s": time.perf_counter() - t0, "fun": sol["fun"], "analytic": sol.get("analytic", False)})
+    return pd.DataFrame(rows)
+
+
+def run(path: str = DATA, model: str = "MBasicInt", points: int = 10, tax_max: float = 200, engine: str = "numpy",
+        solvers: Sequence[str] = ("scipy", "cold", "warm", "ranging")):
+    data = readSource(path)
+    data.setdefault("emCap", pd.Series(1e6, index=data["idxEm"], name="emCap"))
+    data.setdefault("RESCap", 0.5)
+    grid = tax_grid(data["idxEm"], points, tax_max)
+    df = pd.concat([sweep(MODELS[model], data, s, grid, engine) for s in solvers], ignore_index=True)
+    ref = df[df["solver"] == solvers[0]].set_index("scenario")["fun"]
+    df["rel_obj_diff"] = (df["fun"] - df["scenario"].map(ref)).abs() / ref.abs().reindex(df["scenario"]).values
+    summary = df.groupby("solver", sort=False).agg(nit=("nit", "mean"), time_s=("time_s", "mean"), solves=("analytic", lambda a: int((~a).sum())), max_rel_obj_diff=("rel_obj_diff", "max"))
+    base = summary.loc[solvers[0]]
+    summary["nit_saved"] = base["nit"] - summary["nit"]
+    summary["time_saved_s"] = base["time_s"] - summary["time_s"]
+    summary["speedup"] = base["time_s"] / summary["time_s"]
+    return df, summary
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark warm-started solves in a taxEm sweep")
+    p.add_argument("--data", default=DATA)
+    p.add_argument("--model", default="MBasicInt", choices=list(MODELS))
+    p.add_argument("--points", type=int, default=10)
+    p.add_argument("--tax-max", type=float, default=200)
+    p.add_argument("--engine", default="numpy", choices=["pandas", "numpy"])
+    p.add_argument("--solvers", nargs="+", default=["scipy", "cold", "warm", "ranging"], choices=list(SOLVERS))
+    p.add_argument("--per-scenario", action="store_true", help="also print iterations and time of each scenario")
+    args = p.parse_args(argv)
+    df, summary = run(args.data, model=args.model, points=args.points, tax_max=args.tax_max, engine=args.engine, solvers=args.solvers)
+    if args.per_scenario:
+        print(df.pivot(index="scenario", columns="solver", values=["nit", "time_s"]).to_string(float_format="{:.4f}".format))
+    print(summary.to_string(float_format="{:.4g}".format))
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(cli())
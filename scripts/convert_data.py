@@ -0,0 +1,50 @@
+"""Convert symbol workbooks (.xlsx) or pickled symbol dicts (.pkl) to the
+binary data store read by lpEnergyModels.dataStore.DataStore.
+
+The store is a directory with one .npy file per array of each symbol
+(values, index levels and integer codes of the index elements) and a
+meta.json file. Models read symbols lazily from the store:
+
+    from lpEnergyModels.dataStore import DataStore
+    m = MBasicInt(db=DataStore("data/store/EX_MBasicInt_DK2025_8760").db())
+
+CLI Example:
+    python scripts/convert_data.py data/EX_MBasicInt_DK2025_8760.xlsx data/EX_MBasicInt_CA.pkl \
+        --out-dir data/store
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from typing import Optional, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lpEnergyModels.dataStore import writeStore  # noqa: E402
+
+
+def store_path(source: str, out_dir: str) -> str:
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(source))[0])
+
+
+def convert(sources: Sequence[str], out_dir: str) -> list:
+    paths = []
+    for source in sources:
+        path = store_path(source, out_dir)
+        meta = writeStore(source, path)
+        print(f"{source} -> {path} ({len(meta)} symbols)")
+        paths.append(path)
+    return paths
+
+
+def cli(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Convert .xlsx/.pkl datasets to binary data stores")
+    p.add_argument("sources", nargs="+")
+    p.add_argument("--out-dir", default=os.path.join("data", "store"))
+    args = p.parse_args(argv)
+    convert(args.sources, args.out_dir)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    raise SystemExit(cli())
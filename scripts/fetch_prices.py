@@ -5,12 +5,17 @@ Focus: Elspot (day-ahead) prices for DK1 / DK2 with conversion to €/GJ so they
 can be compared directly to model marginal prices produced by MBasicInt.
 
 Features:
-- Fetch and paginate Elspotprices dataset via public API.
+- Fetch and paginate Elspotprices dataset via public API: date chunks and pages are
+  requested concurrently, with retries (exponential backoff) and an optional on-disk
+  cache of fetched chunks, so repeated runs are incremental (and offline once cached).
 - Filter for selected PriceArea list (default: DK1, DK2).
 - Convert SpotPriceEUR (€/MWh) to SpotPriceGJ (€/GJ).
 - Handle DST duplication (8784 hours) by collapsing duplicate local hours.
 - Provide helpers to: pivot wide, assign model hour index (h0001..hXXXX),
   compute quantiles, normalize to mean = 1 shape.
+- Convert prices for many areas and years in one pass into model symbols
+  (idxHr, hourly shapes/prices over (idxHr, type), quantiles) and write them as
+  a .pkl symbol dictionary or data store (price_profiles, --out-profiles).
 - Optional CLI to save raw long format and a wide pivot CSV.
 
 No external dependency beyond pandas & (optional) requests. Falls back to
@@ -24,15 +29,20 @@ Example (Python):
 
 CLI Example:
     python scripts/fetch_prices.py --start 2024-01-01 --end 2024-12-31 --areas DK1 DK2 \
-        --out-long data/elspot_2024_long.csv --out-wide data/elspot_2024_wide.csv
+        --out-long data/elspot_2024_long.csv --out-wide data/elspot_2024_wide.csv --cache-dir data/.elspot_cache
 
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import math
+import os
+import random
 import sys
+import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Iterable, List, Optional, Sequence
 from urllib.parse import quote
@@ -44,9 +54,11 @@ try:  # optional
 except ImportError:  # pragma: no cover
     requests = None  # fall back to urllib
 
+import numpy as np
 import pandas as pd
 
 API_BASE = "https://api.energidataservice.dk/dataset/Elspotprices"
+RECORD_COLUMNS = ("HourUTC", "HourDK", "PriceArea", "SpotPriceEUR")
 
 
 @dataclass
@@ -66,6 +78,96 @@ def _http_get(url: str, timeout: int = 60) -> dict:
     return json.loads(data)
 
 
+def _retryable(exc: Exception) -> bool:
+    """True for errors worth retrying: connection problems, timeouts, truncated JSON, HTTP 429 and 5xx."""
+    status = getattr(exc, "code", None) if isinstance(exc, HTTPError) else getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(exc, (OSError, ValueError))
+
+
+def _get_json(url: str, retries: int = 4, backoff: float = 0.5, timeout: int = 60) -> dict:
+    """_http_get with up to `retries` retries of retryable errors, waiting backoff * 2**attempt seconds (with jitter) in between."""
+    for attempt in range(retries + 1):
+        try:
+            return _http_get(url, timeout=timeout)
+        except Exception as exc:  # noqa: BLE001 (requests and urllib raise different types)
+            if attempt == retries or not _retryable(exc):
+                raise
+            time.sleep(backoff * 2**attempt * (1 + random.random()))
+    raise AssertionError("unreachable")
+
+
+def _page_frame(records: List[dict]) -> pd.DataFrame:
+    """Typed DataFrame from the records of one page (HourUTC tz-aware UTC, HourDK naive local time, PriceArea str, SpotPriceEUR float)."""
+    df = pd.DataFrame.from_records(records, columns=list(RECORD_COLUMNS))
+    return df.astype({"PriceArea": object, "SpotPriceEUR": "float64"}).assign(
+        HourUTC=pd.to_datetime(df["HourUTC"], utc=True, errors="coerce"),
+        HourDK=pd.to_datetime(df["HourDK"], errors="coerce"),
+    )
+
+
+def date_chunks(start: str, end: str, freq: Optional[str] = "MS") -> List[tuple]:
+    """Split [start, end] into consecutive (start, end) date ranges at the boundaries of pandas frequency `freq` (None: one range)."""
+    inner = [] if freq is None else [d.strftime("%Y-%m-%d") for d in pd.date_range(start, end, freq=freq)]
+    bounds = [start] + [d for d in inner if start < d < end] + [end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+@dataclass(eq=False)
+class _Chunk:
+    area: str
+    start: str
+    end: str
+    total: int = 0
+    pages: Optional[dict] = None  # offset -> typed page frame
+    error: Optional[Exception] = None
+
+    def url(self, api_base: str, limit: int, offset: int) -> str:
+        filter_str = quote(json.dumps({"PriceArea": [self.area]}, separators=(",", ":")))
+        return f"{api_base}?start={self.start}&end={self.end}&filter={filter_str}&sort=HourUTC&limit={limit}&offset={offset}"
+
+
+class PriceCache:
+    """On-disk cache of fetched chunks: one pickled typed DataFrame per (api_base, area, start, end) in `path`.
+
+    Chunks ending after today (UTC) are not cached, as their prices may not be published yet.
+    """
+
+    def __init__(self, path: Optional[str], api_base: str = API_BASE):
+        self.path = path
+        self.tag = hashlib.sha1(api_base.encode()).hexdigest()[:10]  # separates entries fetched from different endpoints
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def file(self, area: str, start: str, end: str) -> str:
+        return os.path.join(self.path, f"elspot_{self.tag}_{area}_{start}_{end}.pkl")
+
+    def get(self, area: str, start: str, end: str) -> Optional[pd.DataFrame]:
+        if self.path and os.path.exists(self.file(area, start, end)):
+            return pd.read_pickle(self.file(area, start, end))
+        return None
+
+    def put(self, area: str, start: str, end: str, df: pd.DataFrame) -> None:
+        if self.path and pd.Timestamp(end) <= pd.Timestamp.now(tz="UTC").tz_localize(None).normalize():
+            tmp = self.file(area, start, end) + ".tmp"
+            df.to_pickle(tmp)
+            os.replace(tmp, self.file(area, start, end))
+
+
+def _fill_gaps(c: _Chunk, page) -> None:
+    """Request the records missing after short pages of chunk c (pages with fewer records than up to the next page or c.total)."""
+    offsets = sorted(c.pages)
+    for o, end in zip(offsets, offsets[1:] + [c.total]):
+        pos = o + len(c.pages[o])
+        while pos < end:
+            df = page(c, pos)[1].iloc[: end - pos]
+            if df.empty:
+                break
+            c.pages[pos] = df
+            pos += len(df)
+
+
 def fetch_elspot_prices(
     start: str,
     end: str,
@@ -74,9 +176,25 @@ def fetch_elspot_prices(
     include_local: bool = True,
     to_gj: bool = True,
     verbose: bool = True,
+    chunk: Optional[str] = "MS",
+    max_workers: int = 8,
+    retries: int = 4,
+    backoff: float = 0.5,
+    timeout: int = 60,
+    cache_dir: Optional[str] = None,
+    strict: bool = True,
+    api_base: str = API_BASE,
 ) -> pd.DataFrame:
     """Fetch hourly day-ahead spot prices.
 
+    The period is split into date chunks (per area) that are fetched concurrently: The first page of all
+    chunks is requested in a thread pool, followed by the remaining pages (at offsets limit, 2*limit, ...)
+    of chunks with more than `limit` records. If the API returns fewer records than requested on a page
+    (e.g. a server-side cap below `limit`), the rest of the page is requested from where it ended until
+    the next page or an empty page is reached. Failed requests are retried with exponential backoff.
+    Fetched chunks are stored in `cache_dir` (per api_base), so repeated runs only request chunks that
+    are not cached (and run offline if all are).
+
     Parameters
     ----------
     start, end : str
@@ -91,6 +209,19 @@ def fetch_elspot_prices(
         Add SpotPriceGJ = SpotPriceEUR / 3.6.
     verbose : bool
         Print progress info.
+    chunk : str or None
+        pandas frequency at which the period is split into chunks (default monthly, "MS"); None fetches one range per area.
+    max_workers : int
+        Maximum number of concurrent requests.
+    retries, backoff, timeout :
+        Retries per request, base wait in seconds (doubled for each retry) and request timeout in seconds.
+    cache_dir : str or None
+        Directory of the chunk cache (see PriceCache); None disables caching.
+    strict : bool
+        If True, raise RuntimeError if a chunk still fails after retries (chunks fetched in the meantime are cached,
+        so a rerun only requests the failed chunks). If False, print a warning and return the chunks that succeeded.
+    api_base : str
+        Dataset URL (e.g. a local stub server in tests).
 
     Returns
     -------
@@ -98,48 +229,63 @@ def fetch_elspot_prices(
       HourUTC (UTC tz-aware Timestamp), HourDK (local naive or tz-aware),
       PriceArea, SpotPriceEUR, SpotPriceGJ (optional)
     """
-    filt = {"PriceArea": list(areas)}
-    filter_str = quote(json.dumps(filt, separators=(",", ":")))
-    params_common = f"start={start}&end={end}&filter={filter_str}&sort=HourUTC&limit={limit}"
-    url0 = f"{API_BASE}?{params_common}&offset=0"
-    data = _http_get(url0)
-    records = data.get("records", [])
-    total = data.get("total", len(records))
+    cache = PriceCache(cache_dir, api_base=api_base)
+    chunks = [_Chunk(area, s, e) for area in areas for s, e in date_chunks(start, end, chunk)]
+    frames = {id(c): cache.get(c.area, c.start, c.end) for c in chunks}
+    todo = [c for c in chunks if frames[id(c)] is None]
     if verbose:
-        print(f"Fetched {len(records)}/{total} initial records")
-    fetched = len(records)
-    while fetched < total:
-        url_page = f"{API_BASE}?{params_common}&offset={fetched}"
-        page = _http_get(url_page)
-        rec_page = page.get("records", [])
-        if not rec_page:
-            break
-        records.extend(rec_page)
-        fetched += len(rec_page)
-        if verbose:
-            print(f"Fetched {fetched}/{total} records")
-
-    if not records:
+        print(f"{len(chunks) - len(todo)}/{len(chunks)} chunks cached; fetching {len(todo)}")
+
+    def page(c: _Chunk, offset: int):
+        data = _get_json(c.url(api_base, limit, offset), retries=retries, backoff=backoff, timeout=timeout)
+        return data.get("total", 0), _page_frame(data.get("records", []))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        first = {c: pool.submit(page, c, 0) for c in todo}
+        rest = {}
+        for c, fut in first.items():
+            try:
+                c.total, df0 = fut.result()
+                c.pages = {0: df0}
+                rest.update({(c, o): pool.submit(page, c, o) for o in range(limit, c.total, limit) if len(df0)})
+            except Exception as exc:  # noqa: BLE001
+                c.error = exc
+        for (c, o), fut in rest.items():
+            try:
+                c.pages[o] = fut.result()[1]
+            except Exception as exc:  # noqa: BLE001
+                c.error = exc
+        gaps = {c: pool.submit(_fill_gaps, c, page) for c in todo if c.error is None}
+        for c, fut in gaps.items():
+            try:
+                fut.result()
+            except Exception as exc:  # noqa: BLE001
+                c.error = exc
+
+    for c in todo:
+        if c.error is None:
+            frames[id(c)] = pd.concat([c.pages[o] for o in sorted(c.pages)], ignore_index=True)
+            cache.put(c.area, c.start, c.end, frames[id(c)])
+            if verbose:
+                print(f"Fetched {len(frames[id(c)])}/{c.total} records for {c.area} {c.start}..{c.end}")
+    failed = [c for c in todo if c.error is not None]
+    if failed:
+        msg = f"{len(failed)} of {len(chunks)} chunks failed: " + "; ".join(f"{c.area} {c.start}..{c.end}: {c.error!r}" for c in failed[:5])
+        if strict:
+            raise RuntimeError(msg)
+        print(f"Warning: {msg}", file=sys.stderr)
+
+    parts = [frames[id(c)] for c in chunks if frames[id(c)] is not None]
+    df = pd.concat(parts, ignore_index=True) if parts else _page_frame([])
+    if df.empty:
         raise RuntimeError("No records returned from API; check date range or network connectivity.")
-
-    df = pd.DataFrame(records)
-    keep = [c for c in ["HourUTC", "HourDK", "PriceArea", "SpotPriceEUR"] if c in df.columns]
-    df = df[keep].copy()
-    # Parse timestamps
-    if "HourUTC" in df.columns:
-        df["HourUTC"] = pd.to_datetime(df["HourUTC"], utc=True, errors="coerce")
-    if include_local and "HourDK" in df.columns:
-        # API returns local time; parse but may not include tz info
-        df["HourDK"] = pd.to_datetime(df["HourDK"], errors="coerce")
-    else:
-        if "HourDK" in df.columns:
-            df = df.drop(columns=["HourDK"])  # remove if not desired
-
-    if to_gj and "SpotPriceEUR" in df.columns:
+    if not include_local:
+        df = df.drop(columns=["HourDK"])  # remove if not desired
+    if to_gj:
         df["SpotPriceGJ"] = df["SpotPriceEUR"] / 3.6
 
-    df = df.dropna(subset=["HourUTC"]).sort_values(["PriceArea", "HourUTC"]).reset_index(drop=True)
-    return df
+    df = df.dropna(subset=["HourUTC"]).drop_duplicates(subset=["PriceArea", "HourUTC"])
+    return df.sort_values(["PriceArea", "HourUTC"]).reset_index(drop=True)
 
 
 def collapse_dst(df: pd.DataFrame) -> pd.DataFrame:
@@ -147,21 +293,20 @@ def collapse_dst(df: pd.DataFrame) -> pd.DataFrame:
 
     If there are duplicate (PriceArea, HourDK) pairs, average their prices.
     Requires HourDK column. If not present, returns df unchanged.
+    Only the duplicated rows are aggregated; the result is sorted by PriceArea, HourDK.
     """
     if "HourDK" not in df.columns:
         return df
-    # Identify duplicates
-    dup_mask = df.duplicated(subset=["PriceArea", "HourDK"], keep=False)
+    keys = ["PriceArea", "HourDK"]
+    dup_mask = df.duplicated(subset=keys, keep=False).to_numpy()
     if not dup_mask.any():
         return df
-    grouped = (
-        df.groupby(["PriceArea", "HourDK"], as_index=False)
-        .agg({c: ("mean" if c.startswith("SpotPrice") else "first") for c in df.columns if c not in ["PriceArea", "HourDK"]})
-    )
-    # Recreate HourUTC ordering by sorting; HourUTC may not collapse exactly; keep earliest mapping if multiple
-    if "HourUTC" in df.columns:
-        grouped = grouped.sort_values(["PriceArea", "HourDK"]).reset_index(drop=True)
-    return grouped
+    other = [c for c in df.columns if c not in keys]
+    prices = [c for c in other if c.startswith("SpotPrice")]
+    dups = df[dup_mask].groupby(keys, sort=False)
+    merged = dups[[c for c in other if c not in prices]].first().join(dups[prices].mean()).reset_index()
+    out = pd.concat([df.loc[~dup_mask, keys + other], merged[keys + other]], ignore_index=True)
+    return out.sort_values(keys, kind="stable").reset_index(drop=True)
 
 
 def pivot_wide(df: pd.DataFrame, value_col: str = "SpotPriceGJ") -> pd.DataFrame:
@@ -172,22 +317,25 @@ def pivot_wide(df: pd.DataFrame, value_col: str = "SpotPriceGJ") -> pd.DataFrame
     return wide
 
 
+def model_hour_labels(n: int, width: int = 4) -> pd.Index:
+    """Model hour labels h0001..hNNNN (zero-padded to `width` digits, e.g. width=2 for h01..h24) as idxHr."""
+    return pd.Index(np.char.add("h", np.char.zfill(np.arange(1, n + 1).astype(str), width)), dtype=object, name="idxHr")
+
+
 def prepare_model_hours(df: pd.DataFrame, area: str = "DK1", value_col: str = "SpotPriceGJ") -> pd.Series:
     """Return a Series indexed by modelHour h0001..hNNNN for selected area.
 
     If duplicate or missing hours exist, attempt simple reconciliation.
     """
-    sub = df[df["PriceArea"] == area].copy()
+    sub = df[df["PriceArea"] == area]
     if "HourUTC" not in sub.columns:
         raise ValueError("HourUTC column required")
-    sub = sub.sort_values("HourUTC")
-    # Remove any exact duplicate HourUTC
-    sub = sub[~sub["HourUTC"].duplicated(keep="first")]
-    n = len(sub)
-    sub["modelHour"] = [f"h{h:04d}" for h in range(1, n + 1)]
     if value_col not in sub.columns:
         raise KeyError(f"{value_col} not found; available: {list(sub.columns)}")
-    return sub.set_index("modelHour")[value_col]
+    sub = sub.sort_values("HourUTC", kind="stable")
+    # Remove any exact duplicate HourUTC
+    sub = sub[~sub["HourUTC"].duplicated(keep="first").to_numpy()]
+    return pd.Series(sub[value_col].to_numpy(), index=model_hour_labels(len(sub)).rename("modelHour"), name=value_col)
 
 
 def price_quantiles(series: pd.Series, qs: Sequence[float] = (0.05,0.1,0.25,0.5,0.75,0.9,0.95,0.99)) -> pd.Series:
@@ -198,6 +346,89 @@ def shape_factor(series: pd.Series) -> pd.Series:
     return series / series.mean()
 
 
+def hourly_matrix(
+    df: pd.DataFrame,
+    value_col: str = "SpotPriceGJ",
+    idxHr: Optional[pd.Index] = None,
+    time_col: str = "HourUTC",
+    drop_leap_day: bool = True,
+    complete: bool = True,
+) -> pd.DataFrame:
+    """Hourly prices of all (PriceArea, year) pairs in one pass: DataFrame over idxHr with columns (PriceArea, year).
+
+    Hours are ordered and assigned to years by `time_col` (UTC by default, such that years have 8760 hours without DST gaps).
+    Duplicate hours are removed and Feb 29 is dropped if drop_leap_day. idxHr: Labels of the model hours (e.g. m.db('idxHr'));
+    default h0001..hNNNN with NNNN the number of hours in the longest year. If complete, (area, year) pairs with fewer hours
+    (e.g. partial first/last years) are dropped; otherwise missing hours are NaN.
+    """
+    sub = df.dropna(subset=[time_col]).drop_duplicates(subset=["PriceArea", time_col])
+    t = sub[time_col].dt
+    if drop_leap_day:
+        keep = ~((t.month == 2) & (t.day == 29)).to_numpy()
+        sub, t = sub[keep], sub[keep][time_col].dt
+    sub = sub.assign(year=t.year.to_numpy()).sort_values(["PriceArea", "year", time_col], kind="stable")
+    groups = sub.groupby(["PriceArea", "year"], sort=False)
+    col, hour = groups.ngroup().to_numpy(), groups.cumcount().to_numpy()
+    cols = pd.MultiIndex.from_tuples(list(groups.groups), names=["PriceArea", "year"])
+    n = len(idxHr) if idxHr is not None else (int(hour.max()) + 1 if len(hour) else 0)
+    keep = hour < n
+    values = np.full((n, len(cols)), np.nan)
+    values[hour[keep], col[keep]] = sub[value_col].to_numpy(dtype=float)[keep]
+    wide = pd.DataFrame(values, index=model_hour_labels(n) if idxHr is None else pd.Index(idxHr, name="idxHr"), columns=cols)
+    return wide.loc[:, np.bincount(col, minlength=len(cols)) >= n] if complete else wide
+
+
+def profile_symbols(
+    wide: pd.DataFrame,
+    shape: str = "uHrPrice",
+    level: str = "pPriceObs",
+    quantiles: str = "pQuantObs",
+    type_name: str = "idxHVTPrice",
+    qs: Sequence[float] = (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99),
+) -> dict:
+    """Model symbols from an hourly price matrix (see hourly_matrix) in the format of MBasicInt inputs:
+
+    - idxHr and type_name: Hours and variation types (one per column, labelled '{area}_{year}').
+    - shape: Normalized hourly shapes (mean = 1 per type, see shape_factor) over (idxHr, type_name), as uHrCap/uHrLoad.
+    - level: Hourly prices over (idxHr, type_name).
+    - quantiles: Price quantiles over (type_name, 'quantile').
+    For instance shape='uHrLoad', type_name='idxHVTCons' gives a load shape input.
+    """
+    types = pd.Index(["_".join(map(str, c)) for c in wide.columns], name=type_name)
+    values = wide.to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shapes = values / np.nanmean(values, axis=0)
+    long = pd.MultiIndex.from_product([wide.index.rename("idxHr"), types])
+    keep = ~np.isnan(values.ravel())
+    q = np.nanquantile(values, qs, axis=0).T if len(values) else np.full((len(types), len(qs)), np.nan)
+    return {
+        "idxHr": wide.index.rename("idxHr"),
+        type_name: types,
+        shape: pd.Series(shapes.ravel()[keep], index=long[keep], name=shape),
+        level: pd.Series(values.ravel()[keep], index=long[keep], name=level),
+        quantiles: pd.Series(q.ravel(), index=pd.MultiIndex.from_product([types, pd.Index(qs, name="quantile")]), name=quantiles),
+    }
+
+
+def write_symbols(symbols: dict, path: str) -> None:
+    """Write symbols in a format read by lpEnergyModels.dataStore.readSource (.pkl: pickled dictionary) or as a binary data store (directory, see writeStore)."""
+    if path.endswith(".pkl"):
+        pd.to_pickle(symbols, path)
+        return
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from lpEnergyModels.dataStore import writeStore
+
+    writeStore(symbols, path)
+
+
+def price_profiles(df: pd.DataFrame, value_col: str = "SpotPriceGJ", idxHr: Optional[pd.Index] = None, out: Optional[str] = None, **kwargs) -> dict:
+    """Long-format prices (many areas and years) -> model symbols (see hourly_matrix and profile_symbols); written to `out` if given."""
+    symbols = profile_symbols(hourly_matrix(df, value_col=value_col, idxHr=idxHr), **kwargs)
+    if out:
+        write_symbols(symbols, out)
+    return symbols
+
+
 def cli(argv: Optional[Sequence[str]] = None) -> int:
     p = argparse.ArgumentParser(description="Fetch Danish Elspot prices and export CSVs")
     p.add_argument("--start", required=True)
@@ -207,6 +438,14 @@ def cli(argv: Optional[Sequence[str]] = None) -> int:
     p.add_argument("--out-wide", dest="out_wide", help="Path to save wide pivot CSV (€/GJ)")
     p.add_argument("--no-gj", action="store_true", help="Do NOT add €/GJ conversion column")
     p.add_argument("--quiet", action="store_true", help="Reduce logging")
+    p.add_argument("--cache-dir", dest="cache_dir", help="Directory for cached chunks (repeated runs only fetch missing chunks)")
+    p.add_argument("--workers", type=int, default=8, help="Maximum number of concurrent requests")
+    p.add_argument("--retries", type=int, default=4, help="Retries per request")
+    p.add_argument("--chunk", default="MS", help="pandas frequency at which the period is split into chunks ('none': one chunk per area)")
+    p.add_argument("--api-base", dest="api_base", default=API_BASE, help="Dataset URL (e.g. a local stub server)")
+    p.add_argument("--out-profiles", dest="out_profiles", help="Write hourly shapes, prices and quantiles per area and year as model symbols (.pkl or data store directory)")
+    p.add_argument("--profile-symbol", dest="profile_symbol", default="uHrPrice", help="Name of the hourly shape symbol")
+    p.add_argument("--profile-type", dest="profile_type", default="idxHVTPrice", help="Name of the variation type index of the shapes")
     args = p.parse_args(argv)
 
     df = fetch_elspot_prices(
@@ -215,6 +454,11 @@ def cli(argv: Optional[Sequence[str]] = None) -> int:
         areas=args.areas,
         to_gj=not args.no_gj,
         verbose=not args.quiet,
+        chunk=None if args.chunk.lower() == "none" else args.chunk,
+        max_workers=args.workers,
+        retries=args.retries,
+        cache_dir=args.cache_dir,
+        api_base=args.api_base,
     )
     df = collapse_dst(df)
 
@@ -228,6 +472,11 @@ def cli(argv: Optional[Sequence[str]] = None) -> int:
         wide.to_csv(args.out_wide)
         if not args.quiet:
             print(f"Saved wide format to {args.out_wide}")
+    if args.out_profiles:
+        symbols = price_profiles(df, value_col=("SpotPriceGJ" if (not args.no_gj) else "SpotPriceEUR"), out=args.out_profiles,
+                                 shape=args.profile_symbol, type_name=args.profile_type)
+        if not args.quiet:
+            print(f"Saved {len(symbols[args.profile_type])} hourly profiles to {args.out_profiles}")
 
     # Print quick stats for first area
     first_area = args.areas[0]
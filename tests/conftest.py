@@ -0,0 +1,63 @@
+""" Shared fixtures: Models loaded with the example data in data/ (EX_MBasic for MBasic*, EX_MBasicInt_CA for MBasicInt*). """
+import os, pickle, sys
+import numpy as np, pandas as pd, pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from lpEnergyModels.mBasicShell import MBasic, MBasicEmCap, MBasicRES
+from lpEnergyModels.mBasicIntShell import MBasicInt, MBasicIntEmCap, MBasicIntRES
+
+DATA = {'MBasic': os.path.join(ROOT, 'data', 'EX_MBasic.pkl'), 'MBasicInt': os.path.join(ROOT, 'data', 'EX_MBasicInt_CA.pkl')}
+
+def exampleData(name):
+	with open(DATA[name], 'rb') as f:
+		data = pickle.load(f)
+	data = {k: v for k,v in data.items() if not k.startswith('__')}
+	data.setdefault('emCap', pd.Series(1e6, index = data['idxEm'], name = 'emCap'))
+	data.setdefault('RESCap', 0.5)
+	return data
+
+def loadModel(cls, **kwargs):
+	""" Instance of model class cls (from mBasicShell/mBasicIntShell or the model modules mBasic/mBasicInt) with the example data in its database. """
+	m = cls(**kwargs)
+	[m.db.__setitem__(k, v) for k,v in exampleData('MBasicInt' if cls.__name__.startswith('MBasicInt') else 'MBasic').items()];
+	return m
+
+def baseModel(cls, **kwargs):
+	""" Model with the features added to EnergyShell turned off (full compiles, scipy.optimize.linprog, no presolve or memoization): The reference path of ModelShell. """
+	return loadModel(cls, **({'incremental': False, 'solver': 'scipy', 'presolve': False, 'memo': False} | kwargs))
+
+def taxGrid(n = 6, hi = 250):
+	""" Grid of taxEm (over 'l', 'idxEm') for loops. """
+	grid = pd.Series(np.linspace(0, hi, n), index = pd.Index(range(n), name = 'l'))
+	return pd.concat({'CO2': grid}, names = ['idxEm']).reorder_levels(['l','idxEm']).rename('taxEm')
+
+def assertDFsEqual(ref, dfs, keys = None, rtol = 1e-6, atol = 1e-6):
+	""" Outputs of loops (DataFrames over (domain, idxLoop) or Series over idxLoop, see loopUnpackToDFs) are equal on keys (default: keys of ref). """
+	for k in (keys or ref.keys()):
+		if isinstance(ref[k], pd.DataFrame):
+			pd.testing.assert_frame_equal(ref[k], dfs[k].reindex(ref[k].index), check_names = False, rtol = rtol, atol = atol)
+		else:
+			pd.testing.assert_series_equal(ref[k], dfs[k], check_names = False, rtol = rtol, atol = atol)
+
+def baseSolve(m):
+	""" Compile, solve and postSolve with the default path. """
+	m.compile()
+	return m.postSolve(m.solve())
+
+def assertSolEqual(a, b, keys = None, rtol = 1e-6, atol = 1e-6):
+	""" Solutions (dicts of scalars and pandas series) a and b are equal on keys (default: keys of a). """
+	for k in (keys or a.keys()):
+		x, y = a[k], b[k]
+		if isinstance(x, pd.Series):
+			pd.testing.assert_series_equal(x.sort_index(), y.reindex(x.index).sort_index(), check_names = False, rtol = rtol, atol = atol)
+		else:
+			np.testing.assert_allclose(x, y, rtol = rtol, atol = atol, err_msg = k)
+
+@pytest.fixture
+def mBasic():
+	return loadModel(MBasic)
+
+@pytest.fixture
+def mBasicInt():
+	return loadModel(MBasicInt)
@@ -0,0 +1,18 @@
+from conftest import *
+
+@pytest.mark.parametrize('cls', [MBasic, MBasicEmCap, MBasicInt, MBasicIntRES])
+@pytest.mark.parametrize('postSolve', [True, False])
+def test_batchLoopAsDFs_matches_lazyLoopAsDFs(cls, postSolve):
+	grid = taxGrid()
+	ref = loadModel(cls, solver = 'scipy').lazyLoopAsDFs(grid, grid.index.levels[0])
+	dfs = loadModel(cls, solver = 'scipy').batchLoopAsDFs(grid, grid.index.levels[0], batchSize = 4, postSolve = postSolve)
+	keys = ['surplus'] + (['λeq_equilibrium'] if cls in (MBasic, MBasicEmCap) else ['pHr','pAvg'] if postSolve else [])
+	assertDFsEqual(ref, dfs, keys)
+	if not postSolve:
+		assert set(dfs) == {k for k in ref if k.startswith('λ') or k in ('generation','demand','surplus')}
+
+def test_batchLoop_outputs():
+	grid = taxGrid()
+	sols = loadModel(MBasicInt).batchLoop(grid, grid.index.levels[0], batchSize = 3, outputs = ['surplus','emissions'])
+	ref = loadModel(MBasicInt).lazyLoop(grid, grid.index.levels[0], outputs = ['surplus','emissions'])
+	[assertSolEqual(ref[l], sols[l]) for l in ref];
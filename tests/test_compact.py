@@ -0,0 +1,39 @@
+from conftest import *
+from lpEnergyModels.compact import memoryUsage
+
+keys = ['surplus','generation','demand','pHr','pAvg','pAvgGen','emissions','mEV']
+
+@pytest.mark.parametrize('cls', [MBasicInt, MBasicIntEmCap, MBasicIntRES])
+@pytest.mark.parametrize('dtype', ['float32', None])
+def test_compact_solution_matches_standard(cls, dtype):
+	ref = baseSolve(baseModel(cls))
+	m = loadModel(cls)
+	m.enableCompact(dtype = dtype)
+	assert isinstance(m.db('idxHr'), pd.RangeIndex)
+	sol = baseSolve(m)
+	if dtype:
+		assert sol['generation'].dtype == np.float32
+	tol = 1e-4 if dtype else 1e-6
+	assertSolEqual(ref, m.decode(sol), keys = keys, rtol = tol, atol = tol)
+
+def test_compact_loop_matches_standard():
+	grid = taxGrid(n = 4)
+	ref = loadModel(MBasicInt).lazyLoopAsDFs(grid, grid.index.levels[0], outputs = ['surplus','generation','pHr'])
+	m = loadModel(MBasicInt)
+	m.enableCompact(dtype = None)
+	dfs = m.decode(m.lazyLoopAsDFs(grid, grid.index.levels[0], outputs = ['surplus','generation','pHr']))
+	assertDFsEqual(ref, dfs)
+
+def test_disable_compact_restores_db():
+	m, ref = loadModel(MBasicInt), loadModel(MBasicInt)
+	m.enableCompact()
+	m.disableCompact()
+	for k in ('idxHr','uHrCap','uHrLoad'):
+		x, y = m.db(k), ref.db(k)
+		pd.testing.assert_index_equal(x, y) if isinstance(y, pd.Index) else pd.testing.assert_series_equal(x, y)
+
+def test_compact_uses_less_memory():
+	m, ref = loadModel(MBasicInt), loadModel(MBasicInt)
+	m.enableCompact()
+	sol, refSol = baseSolve(m), baseSolve(ref)
+	assert memoryUsage(dict(sol).values()) < memoryUsage(dict(refSol).values())
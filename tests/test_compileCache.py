@@ -0,0 +1,37 @@
+from conftest import *
+from lpEnergyModels import compileCache
+from lpEnergyModels.compileCache import CompileCache, classKey
+
+def test_cache_hit_matches_compile(tmp_path):
+	ref = baseSolve(loadModel(MBasicIntEmCap))
+	baseSolve(loadModel(MBasicIntEmCap, cache = str(tmp_path)))
+	m = loadModel(MBasicIntEmCap, cache = str(tmp_path))
+	m.compile()
+	assert not m.stageOutputs # loaded from the cache
+	assertSolEqual(ref, m.postSolve(m.solve()), keys = ['surplus','generation','demand','emissions','pAvg'])
+
+def test_cache_miss_on_data_change(tmp_path):
+	baseSolve(loadModel(MBasicInt, cache = str(tmp_path)))
+	m = loadModel(MBasicInt, cache = str(tmp_path))
+	m.db['taxEm'] = m.db('taxEm')*2
+	assert not m.cache.load(m)
+
+def test_classKey_depends_on_package(monkeypatch):
+	key = classKey(MBasicInt)
+	assert classKey(MBasicIntRES) != key
+	monkeypatch.setattr(compileCache, 'packageKey', lambda: 'edited')
+	assert classKey(MBasicInt) != key
+
+def test_packageKey_covers_compile_modules(monkeypatch, tmp_path):
+	""" Editing a module outside the class MRO (e.g. npEngine.py) changes the key. """
+	src = os.path.join(ROOT, 'lpEnergyModels')
+	[open(os.path.join(tmp_path, f), 'wb').write(open(os.path.join(src, f), 'rb').read()) for f in os.listdir(src) if f.endswith('.py')];
+	monkeypatch.setattr(compileCache, '__file__', os.path.join(tmp_path, 'compileCache.py'))
+	compileCache.packageKey.cache_clear()
+	key = compileCache.packageKey()
+	with open(os.path.join(tmp_path, 'npEngine.py'), 'a') as f:
+		f.write('\n# edited\n')
+	compileCache.packageKey.cache_clear()
+	assert compileCache.packageKey() != key
+	monkeypatch.undo()
+	compileCache.packageKey.cache_clear()
@@ -0,0 +1,34 @@
+from conftest import *
+from lpEnergyModels.dataStore import readSource, writeStore, DataStore
+
+@pytest.fixture
+def store(tmp_path):
+	writeStore(DATA['MBasicInt'], tmp_path)
+	return DataStore(tmp_path, mmapBytes = 0)
+
+def test_store_roundtrip(store):
+	source = readSource(DATA['MBasicInt'])
+	assert set(store) == set(source)
+	for k,v in source.items():
+		x = store.load(k)
+		if isinstance(v, pd.Series):
+			pd.testing.assert_index_equal(v.index, x.index, exact = False)
+			np.testing.assert_array_equal(v.values, x.values)
+		elif isinstance(v, pd.Index):
+			pd.testing.assert_index_equal(v, x, exact = False)
+		else:
+			assert v == x
+
+def test_lazy_db(store):
+	db = store.db()
+	assert not db.symbols.loaded
+	db('genCap')
+	assert list(db.symbols.loaded) == ['genCap']
+	assert set(db.symbols) == set(store)
+
+@pytest.mark.parametrize('cls', [MBasicInt, MBasicIntEmCap])
+def test_store_model_matches_pkl(cls, store):
+	ref = baseSolve(loadModel(cls))
+	m = cls(db = store.db())
+	m.db['emCap'] = pd.Series(1e6, index = m.db('idxEm'), name = 'emCap')
+	assertSolEqual(ref, baseSolve(m), keys = ['surplus','generation','demand','pHr','emissions'])
@@ -0,0 +1,68 @@
+from conftest import *
+from lpEnergyModels import decompose, solvers
+from lpEnergyModels.presolve import Presolve
+
+def capped(cls):
+	""" Model with a binding coupling constraint. """
+	m = loadModel(cls)
+	if cls is MBasicIntEmCap:
+		m.db['emCap'] = 0.7*baseSolve(m)['emissions']/m.scale
+	elif cls is MBasicIntRES:
+		m.db['RESCap'] = 0.8
+	return m
+
+@pytest.mark.parametrize('cls', [MBasicInt, MBasicIntEmCap, MBasicIntRES])
+@pytest.mark.parametrize('windowSize', [1, 6, 24])
+def test_matches_solve(cls, windowSize):
+	m = capped(cls)
+	ref = baseSolve(m)
+	sol = m.solveDecomposed(windowSize = windowSize)
+	assertSolEqual(ref, m.postSolve(sol), keys = ['surplus','pHr'], rtol = 1e-5)
+	assert abs(sol['gap']) <= 1e-5*abs(sol['fun']) and sol['maxViolation'] <= 1e-4
+
+@pytest.mark.parametrize('solver, presolve', [('scipy', False), ('highs', True), ('highs', False)])
+def test_uses_model_solver(solver, presolve):
+	m = capped(MBasicIntRES)
+	m.solver, m.presolve = solvers.getSolver(solver), (Presolve() if presolve else None)
+	ref = baseSolve(m)
+	assertSolEqual(ref, m.postSolve(m.solveDecomposed(windowSize = 6)), keys = ['surplus','pHr'], rtol = 1e-5)
+	lps, coupling = decompose.windowLPs(m.sys, decompose.hourWindows(m.db('idxHr'), 6))
+	ws = decompose.WindowSolver(lps, solver = m.solver, presolve = m.presolve)
+	ws(np.ones(1))
+	assert all(type(s) is type(m.solver) and s is not m.solver and type(p) is type(m.presolve) for s,p in ws.windows)
+	if solver == 'highs':
+		assert all(s.loaded is not None for s,p in ws.windows) # one persistent LP per window
+
+def test_workers():
+	m = capped(MBasicIntEmCap)
+	ref = baseSolve(m)
+	assertSolEqual(ref, m.postSolve(m.solveDecomposed(windowSize = 6, nWorkers = 2)), keys = ['surplus','pHr'], rtol = 1e-5)
+
+def twoCaps():
+	""" MBasicIntEmCap with emission types CO2 and CH4 (two coupling constraints). """
+	m = loadModel(MBasicIntEmCap)
+	ch4 = pd.Series([0.001, 0.003, 0.0005], index = pd.MultiIndex.from_product([['coal','natgas','biomass'], ['CH4']], names = ['idxF','idxEm']))
+	m.db['uEm'] = pd.concat([m.db('uEm'), ch4]).rename('uEm')
+	m.db['idxEm'] = pd.Index(['CO2','CH4'], name = 'idxEm')
+	m.db['taxEm'] = pd.Series([35., 0.], index = m.db('idxEm'), name = 'taxEm')
+	m.db['emCap'] = pd.Series(1e9, index = m.db('idxEm'), name = 'emCap')
+	m.db['emCap'] = 0.7*baseSolve(m)['emissions']/m.scale
+	return m
+
+def test_gap_reported_with_several_coupling_constraints():
+	m = twoCaps()
+	obj = -baseSolve(m)['surplus']
+	sol = m.solveDecomposed(windowSize = 6, maxIter = 50, step0 = 1e3, gapTol = None)
+	assert sol['maxViolation'] <= 1e-6*(1+m.db('emCap').max())
+	assert sol['dual'] <= obj+1e-6*abs(obj) <= sol['fun']+2e-6*abs(obj)
+	np.testing.assert_allclose(sol['gap'], sol['fun']-sol['dual'])
+	with pytest.raises(RuntimeError, match = 'duality gap'):
+		m.solveDecomposed(windowSize = 6, maxIter = 50, step0 = 1e3)
+
+def test_coupling_violations_raise():
+	m = twoCaps()
+	m.compile()
+	lps, coupling = decompose.windowLPs(m.sys, decompose.hourWindows(m.db('idxHr'), 6))
+	sol = {'fun': 0., 'x': np.full(coupling['A_ub'].shape[1], 1e6)}
+	with pytest.raises(RuntimeError, match = 'violates coupling constraints'):
+		decompose.withGap(sol, 0., coupling, gapTol = None, tol = 1e-6)
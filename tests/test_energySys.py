@@ -0,0 +1,19 @@
+from conftest import *
+from lpEnergyModels.base import LPSys
+
+@pytest.mark.parametrize('cls', [MBasicEmCap, MBasicRES, MBasicIntEmCap, MBasicIntRES])
+def test_sparse_assembly_matches_LPSys(cls):
+	m = loadModel(cls)
+	m.compile()
+	for attr in ('eq','ub'):
+		np.testing.assert_allclose(m.sys.out[f'A_{attr}'].toarray(), getattr(LPSys, f'sparse_A_{attr}')(m.sys).toarray())
+		assert m.sys.out[f'A_{attr}'].format == m.sys.sparseFormat
+
+def test_memoryReport():
+	m = loadModel(MBasicIntEmCap)
+	m.compile()
+	report = m.memoryReport()
+	assert {('A_eq','eq2Gen'), ('A_eq','eq2Dem'), ('A_ub','emCap2Gen'), ('out','A_eq'), ('out','c')} <= set(report.index)
+	assert report.loc[('out','A_eq'), 'nnz'] == m.sys.out['A_eq'].nnz
+	assert report.loc[('A_eq','eq2Gen'), 'nnz'] == len(m.db('idxHr'))*len(m.db('idxGen'))
+	assert ((report['density'] > 0) & (report['density'] <= 1)).loc[['A_eq','A_ub']].all()
@@ -0,0 +1,105 @@
+""" scripts/fetch_prices.py against a local http.server stub of the Elspotprices API. """
+from conftest import *
+import functools, json, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from scripts import fetch_prices
+
+class Stub(ThreadingHTTPServer):
+	""" Hourly records for [start, end) per PriceArea; pages hold at most min(limit, maxPage) records. The first `failures` requests return 503. """
+	def __init__(self, maxPage = 10**6, failures = 0):
+		super().__init__(('127.0.0.1', 0), StubHandler)
+		self.maxPage, self.failures, self.requests, self.lock = maxPage, failures, [], threading.Lock()
+
+	@property
+	def url(self):
+		return f'http://127.0.0.1:{self.server_address[1]}/dataset/Elspotprices'
+
+	@staticmethod
+	@functools.cache
+	def records(start, end, area):
+		hours = pd.date_range(start, end, freq = 'h', inclusive = 'left', tz = 'UTC')
+		return [{'HourUTC': h.strftime('%Y-%m-%dT%H:%M:%S'), 'HourDK': h.tz_convert('Europe/Copenhagen').strftime('%Y-%m-%dT%H:%M:%S'),
+				 'PriceArea': area, 'SpotPriceEUR': float(i % 24)+(area == 'DK2')} for i,h in enumerate(hours)]
+
+class StubHandler(BaseHTTPRequestHandler):
+	def log_message(self, *args):
+		pass
+
+	def do_GET(self):
+		srv, q = self.server, {k: v[0] for k,v in parse_qs(urlparse(self.path).query).items()}
+		with srv.lock:
+			srv.requests.append(q)
+			fail = len(srv.requests) <= srv.failures
+		if fail:
+			self.send_response(503)
+			self.end_headers()
+			return
+		records = srv.records(q['start'], q['end'], json.loads(q['filter'])['PriceArea'][0])
+		offset, limit = int(q['offset']), min(int(q['limit']), srv.maxPage)
+		body = json.dumps({'total': len(records), 'records': records[offset:offset+limit]}).encode()
+		self.send_response(200)
+		self.send_header('Content-Type', 'application/json')
+		self.end_headers()
+		self.wfile.write(body)
+
+@pytest.fixture
+def stub(request):
+	srv = Stub(**getattr(request, 'param', {}))
+	threading.Thread(target = srv.serve_forever, daemon = True).start()
+	yield srv
+	srv.shutdown()
+	srv.server_close()
+
+def fetch(stub, start = '2024-01-01', end = '2024-03-01', **kwargs):
+	return fetch_elspot_prices(start, end, **({'api_base': stub.url, 'verbose': False, 'backoff': 0, 'max_workers': 4} | kwargs))
+
+fetch_elspot_prices = fetch_prices.fetch_elspot_prices
+nHours = 60*24 # 2024-01-01 to 2024-03-01
+
+def test_fetch(stub):
+	df = fetch(stub)
+	assert len(df) == 2*nHours and set(df['PriceArea']) == {'DK1','DK2'}
+	assert df.groupby('PriceArea')['HourUTC'].is_monotonic_increasing.all()
+	np.testing.assert_allclose(df['SpotPriceGJ'], df['SpotPriceEUR']/3.6)
+
+@pytest.mark.parametrize('stub', [{'failures': 3}], indirect = True)
+def test_retries(stub):
+	assert len(fetch(stub, max_workers = 1)) == 2*nHours
+	assert len(stub.requests) == 3+4 # two areas, two monthly chunks
+
+@pytest.mark.parametrize('stub', [{'failures': 100}], indirect = True)
+def test_retries_exhausted(stub):
+	with pytest.raises(RuntimeError, match = 'chunks failed'):
+		fetch(stub, retries = 1)
+
+def test_paging(stub):
+	df = fetch(stub, limit = 100, chunk = None)
+	assert len(df) == 2*nHours and not df.duplicated(['PriceArea','HourUTC']).any()
+	assert sorted({int(q['offset']) for q in stub.requests}) == list(range(0, nHours, 100))
+
+@pytest.mark.parametrize('stub', [{'maxPage': 70}], indirect = True)
+def test_paging_server_cap(stub):
+	""" The server returns fewer records than limit per page; the missing records are requested from where pages end. """
+	df = fetch(stub, limit = 100, chunk = None)
+	assert len(df) == 2*nHours and not df.duplicated(['PriceArea','HourUTC']).any()
+	pd.testing.assert_frame_equal(df, fetch(stub, chunk = None))
+
+def test_cache(stub, tmp_path):
+	df = fetch(stub, cache_dir = str(tmp_path))
+	n = len(stub.requests)
+	pd.testing.assert_frame_equal(df, fetch(stub, cache_dir = str(tmp_path)))
+	assert len(stub.requests) == n # served from the cache
+	fetch(stub, cache_dir = str(tmp_path), end = '2024-04-01')
+	assert len(stub.requests) == n+2 # only the new month is fetched for both areas
+
+def test_cache_keyed_on_api_base(stub, tmp_path):
+	fetch(stub, cache_dir = str(tmp_path))
+	other = Stub()
+	threading.Thread(target = other.serve_forever, daemon = True).start()
+	try:
+		fetch(other, cache_dir = str(tmp_path))
+		assert len(other.requests) == 4
+	finally:
+		other.shutdown()
+		other.server_close()
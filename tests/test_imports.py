@@ -0,0 +1,42 @@
+""" Lazy loading of lpEnergyModels attributes and symMaps; checks of the import state run in fresh interpreters. """
+from conftest import *
+import subprocess
+import lpEnergyModels
+
+def run(code):
+	out = subprocess.run([sys.executable, '-c', code], cwd = ROOT, capture_output = True, text = True)
+	assert out.returncode == 0, out.stderr
+	return out.stdout.split()
+
+def test_import_does_not_load_symMaps():
+	assert run("import sys, lpEnergyModels; print('symMaps' in sys.modules, 'scipy.optimize' in sys.modules, 'lpEnergyModels.mBasicInt' in sys.modules)") == ['False']*3
+
+def test_kernels_do_not_load_symMaps():
+	assert run("import sys, lpEnergyModels; lpEnergyModels.kernels; lpEnergyModels.pdSum; print('symMaps' in sys.modules)") == ['False']
+
+def test_model_attribute_loads_its_module():
+	assert run("import sys, lpEnergyModels; lpEnergyModels.MBasicInt; print('lpEnergyModels.mBasicInt' in sys.modules, 'lpEnergyModels.mBasic' in sys.modules)") == ['True', 'False']
+
+@pytest.mark.parametrize('code', ['lpEnergyModels.MBasicInt', 'import lpEnergyModels.mBasicIntShell', 'import lpEnergyModels.mBasicShell'])
+def test_models_do_not_load_feature_modules(code):
+	features = ['lpEnergyModels.solvers', 'lpEnergyModels.sensitivity', 'lpEnergyModels.decompose', 'lpEnergyModels.timeAgg', 'lpEnergyModels.loops', 'lpEnergyModels.batch']
+	assert run(f"import sys, lpEnergyModels; {code}; print(*[k in sys.modules for k in {features}])") == ['False']*len(features)
+
+def test_star_import():
+	assert run("from lpEnergyModels import *; print(MBasicInt.__name__, parallelLoop.__name__, LPSys.__name__, pdSum.__name__)") == ['MBasicInt', 'parallelLoop', 'LPSys', 'pdSum']
+
+def test_attributes_resolve():
+	import lpEnergyModels.lazyBase as lazyBase, lpEnergyModels.mBasicInt as mBasicIntModule, lpEnergyModels.mBasic as mBasicModule, symMaps
+	assert lpEnergyModels.MBasicInt is mBasicIntModule.MBasicInt and lpEnergyModels.MBasicRES is mBasicModule.MBasicRES
+	assert lazyBase.LPSys is symMaps.LPSys and lazyBase.symMaps is symMaps
+	with pytest.raises(AttributeError):
+		lpEnergyModels.notAName
+	with pytest.raises(AttributeError):
+		lazyBase.notAName
+
+def test_shell_models_extend_model_classes():
+	assert issubclass(MBasicIntRES, lpEnergyModels.MBasicIntRES) and issubclass(MBasicEmCap, lpEnergyModels.MBasicEmCap)
+
+def test_lazily_loaded_model_solves_as_shell_model():
+	assertSolEqual(baseSolve(baseModel(MBasicInt)), baseSolve(loadModel(lpEnergyModels.MBasicInt)), keys = ['surplus','generation','pHr','emissions','mEV'])
+	assertSolEqual(baseSolve(baseModel(MBasicRES)), baseSolve(loadModel(lpEnergyModels.MBasicRES)), keys = ['surplus','generation','emissions'])
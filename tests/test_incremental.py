@@ -0,0 +1,87 @@
+from conftest import *
+
+def compiled(m, **kwargs):
+	m.compile(**kwargs)
+	return {k: (v.toarray() if hasattr(v, 'toarray') else v) for k,v in m.sys.out.items()}
+
+def assertOutEqual(a, b):
+	for k in a:
+		if a[k] is None:
+			assert b[k] is None, k
+		else:
+			np.testing.assert_allclose(a[k], b[k], err_msg = k)
+
+@pytest.mark.parametrize('cls', [MBasicEmCap, MBasicRES, MBasicIntEmCap, MBasicIntRES])
+@pytest.mark.parametrize('symbol, f', [('taxEm', lambda x: x*2), ('genCap', lambda x: x*0.9), ('load', lambda x: x*1.1), ('RESCap', lambda x: 0.8)])
+def test_recompile_matches_full_compile(cls, symbol, f):
+	m = loadModel(cls, incremental = True)
+	m.compile()
+	m.db[symbol] = f(m.db(symbol))
+	out = compiled(m)
+	ref = baseModel(cls)
+	ref.db[symbol] = f(ref.db(symbol))
+	assertOutEqual(compiled(ref), out)
+
+def test_only_affected_stages_rerun():
+	m = loadModel(MBasicInt, incremental = True)
+	m.compile()
+	m.enableProfiling()
+	m.db['taxEm'] = m.db('taxEm')*2
+	m.compile()
+	stages = {e['name'] for e in m.profiler.records}
+	assert stages == {'mcHr', 'initArgsV_generation'}
+
+def test_domain_change_triggers_full_compile():
+	m = loadModel(MBasicInt, incremental = True)
+	m.compile()
+	m.db['idxHr'] = m.db('idxHr')[:12]
+	for k in ('uHrCap', 'uHrLoad'):
+		m.db[k] = m.db(k)[m.db(k).index.get_level_values('idxHr').isin(m.db('idxHr'))]
+	ref = baseModel(MBasicInt)
+	[ref.db.__setitem__(k, m.db(k)) for k in ('idxHr','uHrCap','uHrLoad')];
+	assertOutEqual(compiled(ref), compiled(m))
+
+@pytest.mark.parametrize('memo', [False, True])
+@pytest.mark.parametrize('cls, aux', [(MBasic, 'mc'), (MBasicIntEmCap, 'mcHr'), (MBasicInt, 'genCapHr')])
+def test_overwritten_aux_is_recomputed(cls, aux, memo):
+	""" compile(updateAux = True) recomputes auxiliary symbols that were overwritten or changed in place, as a full compile does. """
+	m, ref = loadModel(cls, incremental = True, memo = memo), baseModel(cls)
+	m.compile()
+	m.db[aux] = m.db(aux)*2
+	assertOutEqual(compiled(ref), compiled(m))
+	m.db(aux).iloc[0] = 1e3
+	assertOutEqual(compiled(ref), compiled(m))
+	m.db(aux).iloc[0] = 1e3 # kept without updateAux
+	ref.db[aux] = m.db(aux).copy()
+	assertOutEqual(compiled(ref, updateAux = False), compiled(m, updateAux = False))
+
+@pytest.mark.parametrize('cls', [MBasicEmCap, MBasicIntRES])
+def test_in_place_changes_are_detected(cls):
+	m, ref = loadModel(cls, incremental = True), baseModel(cls)
+	m.compile()
+	for x in (m, ref):
+		x.db('genCap').iloc[0] = 0
+		x.db('taxEm').iloc[0] = 100
+	assertOutEqual(compiled(ref), compiled(m))
+
+def test_incremental_is_opt_in(mBasicInt):
+	mBasicInt.compile()
+	mBasicInt.db['taxEm'] = mBasicInt.db('taxEm')*2
+	mBasicInt.enableProfiling()
+	mBasicInt.compile()
+	assert {'initArgs_v', 'genCapHr'} <= {e['name'] for e in mBasicInt.profiler.records}
+
+def test_trackedDB_versions():
+	m = loadModel(MBasicInt)
+	counter = m.db.counter
+	with m.db.trace() as reads:
+		m.db('taxEm')
+	assert reads == {'taxEm'}
+	m.db['taxEm'] = m.db('taxEm')
+	assert m.db.changedSince(counter) == {'taxEm'}
+
+def test_trackedDB_sync():
+	m = loadModel(MBasicInt)
+	fingerprints, counter = m.db.fingerprints(), m.db.counter
+	m.db('load').iloc[0] += 1
+	assert m.db.sync(fingerprints) == ['load'] and m.db.changedSince(counter) == {'load'}
@@ -0,0 +1,56 @@
+from conftest import *
+from lpEnergyModels import kernels
+
+def assertSeries(ref, x):
+	pd.testing.assert_series_equal(ref.sort_index(), x.reindex(ref.index).sort_index(), check_names = False, check_index_type = False, rtol = 1e-9, atol = 1e-9)
+
+@pytest.fixture(scope = 'module')
+def solved():
+	m = loadModel(MBasicInt)
+	sol = baseSolve(m)
+	return m, sol
+
+def test_kernels_match_pandas(solved):
+	m, sol = solved
+	db, gen = m.db, sol['generation']
+	fuelCons = kernels.pdFuelConsumption(gen, db('uFuel'), m.scale, sumOver = ['idxHr','idxGen'])
+	cases = [(kernels.fuelCost, kernels.pdFuelCost, (db('pFuel'), db('uEm'), db('taxEm'))),
+			 (kernels.mc, kernels.pdMc, (db('uFuel'), db('VOM'), db('pFuel'), db('uEm'), db('taxEm'))),
+			 (kernels.emissionsFuel, kernels.pdEmissionsFuel, (fuelCons, db('uEm'))),
+			 (kernels.plantEmissionIntensity, kernels.pdPlantEmissionIntensity, (db('uFuel'), db('uEm'))),
+			 (kernels.unitGenC, kernels.pdUnitGenC, (db('mcHr'), db('FOM'), db('INVC'), gen, db('genCap'), m.scale)),
+			 (kernels.mEV, kernels.pdMEV, (sol['λu_generation'], db('uHrCap'), db('FOM'), db('INVC'), db('genCap'), m.scale))]
+	for f, pdf, args in cases:
+		assertSeries(pdf(*args), f(*args))
+	assertSeries(fuelCons, kernels.fuelConsumption(gen, db('uFuel'), m.scale, sumOver = ['idxHr','idxGen']))
+	for sumOver in ('idxHr', ['idxHr','idxGen']):
+		ref, x = kernels.pdAvgGenPrice(gen, sol['pHr'], sumOver = sumOver), kernels.avgGenPrice(gen, sol['pHr'], sumOver = sumOver)
+		assertSeries(ref, x) if isinstance(ref, pd.Series) else np.testing.assert_allclose(ref, x)
+
+def test_hour_weights(solved):
+	m, sol = solved
+	ω = pd.Series(np.linspace(0.5, 1.5, 24)*m.scale, index = m.db('idxHr'))
+	gen = sol['generation']
+	assertSeries(kernels.pdAvgGenPrice(gen, sol['pHr'], hrWeight = ω), kernels.avgGenPrice(gen, sol['pHr'], hrWeight = ω))
+	args = (gen, m.db('uFuel'), ω, ['idxHr','idxGen'])
+	assertSeries(kernels.pdFuelConsumption(*args), kernels.fuelConsumption(*args))
+
+def test_gridded_taxEm_matches_loop(solved):
+	m, _ = solved
+	db, grid = m.db, taxGrid(n = 4)
+	x = kernels.mc(db('uFuel'), db('VOM'), db('pFuel'), db('uEm'), grid)
+	for l in grid.index.levels[0]:
+		assertSeries(kernels.pdMc(db('uFuel'), db('VOM'), db('pFuel'), db('uEm'), grid.xs(l)), x.xs(l, level = 'l'))
+
+def test_dataframe_columns_match_per_column():
+	m = loadModel(MBasicInt)
+	grid = taxGrid(n = 3)
+	dfs = m.lazyLoopAsDFs(grid, grid.index.levels[0], outputs = ['generation'])
+	x = kernels.fuelConsumption(dfs['generation'], m.db('uFuel'), m.scale, sumOver = ['idxHr','idxGen'])
+	for l in dfs['generation'].columns:
+		assertSeries(kernels.pdFuelConsumption(dfs['generation'][l].dropna(), m.db('uFuel'), m.scale, sumOver = ['idxHr','idxGen']), x[l])
+
+def test_fallback_for_other_sumOver(solved):
+	m, sol = solved
+	ref = kernels.pdFuelConsumption(sol['generation'], m.db('uFuel'), m.scale, sumOver = 'idxHr')
+	assertSeries(ref, kernels.fuelConsumption(sol['generation'], m.db('uFuel'), m.scale, sumOver = 'idxHr'))
@@ -0,0 +1,23 @@
+from conftest import *
+
+@pytest.mark.parametrize('cls', [MBasic, MBasicInt, MBasicIntEmCap])
+def test_parallelLoopAsDFs_matches_lazyLoopAsDFs(cls):
+	grid = taxGrid()
+	ref = baseModel(cls).lazyLoopAsDFs(grid, grid.index.levels[0])
+	dfs = loadModel(cls).parallelLoopAsDFs(grid, grid.index.levels[0], nWorkers = 2)
+	assertDFsEqual(ref, dfs, keys = ['surplus', 'λeq_equilibrium', 'emissions'])
+
+def test_serial_fallback_and_order():
+	grid = taxGrid(5)
+	idxLoop = grid.index.levels[0][::-1]
+	sols = loadModel(MBasicInt).parallelLoop(grid, idxLoop, nWorkers = 2, nChunks = 3, parallel = False, outputs = ['surplus'])
+	assert list(sols) == list(idxLoop)
+	ref = baseModel(MBasicInt).lazyLoop(grid, idxLoop)
+	[assertSolEqual(sols[l], ref[l]) for l in idxLoop];
+
+def test_chunkIdx():
+	from lpEnergyModels.loops import chunkIdx
+	idx = pd.Index(range(7))
+	chunks = chunkIdx(idx, 3)
+	assert len(chunks) == 3 and np.concatenate(chunks).tolist() == list(range(7))
+	assert chunkIdx(idx[:0], 3) == []
@@ -0,0 +1,49 @@
+from conftest import *
+from lpEnergyModels.memo import Memo
+
+def test_memoized_kwargs_share_entry():
+	m = loadModel(MBasicIntRES, memo = True)
+	a = m.RESGenIdx()
+	assert m.RESGenIdx('CO2') is a and m.RESGenIdx(CO2Idx = 'CO2') is a
+	assert len(m.memo) == 1 and m.memo.hits == 2
+
+def test_memo_is_opt_in(mBasicInt):
+	assert mBasicInt.memo is None and isinstance(loadModel(MBasicInt, memo = True).memo, Memo)
+
+def test_memoized_without_memo():
+	m = loadModel(MBasicRES)
+	assert m.RESGenIdx(CO2Idx = 'CO2').equals(m.RESGenIdx())
+
+def test_memo_invalidated_by_writes():
+	m = loadModel(MBasicInt, memo = True)
+	sol0 = baseSolve(m)
+	m.db['taxEm'] = m.db('taxEm')*2
+	sol1 = baseSolve(m)
+	ref = loadModel(MBasicInt, memo = None)
+	ref.db['taxEm'] = ref.db('taxEm')*2
+	assertSolEqual(baseSolve(ref), sol1, keys = ['surplus','generation','pAvg'])
+	assert not np.isclose(sol0['surplus'], sol1['surplus'])
+
+@pytest.mark.parametrize('cls', [MBasicRES, MBasicIntRES])
+def test_memo_detects_in_place_changes(cls):
+	m, ref = loadModel(cls, memo = True), baseModel(cls)
+	baseSolve(m)
+	for x in (m, ref):
+		x.db('uEm').iloc[:] = 0
+	assert m.RESGenIdx().equals(ref.RESGenIdx()) and len(m.RESGenIdx()) == len(m.db('idxGen'))
+	assertSolEqual(baseSolve(ref), baseSolve(m), keys = ['surplus','generation','RESShare'])
+
+def test_memo_recomputes_values_changed_in_place():
+	""" Aux symbols in the db are the cached values; changing them in place does not corrupt the cache. """
+	m = loadModel(MBasicInt, memo = True)
+	baseSolve(m)
+	m.db('mcHr').iloc[:] = 0
+	ref = baseModel(MBasicInt)
+	ref.compile()
+	pd.testing.assert_series_equal(ref.aux_mcHr, m.aux_mcHr)
+	assertSolEqual(baseSolve(ref), baseSolve(m), keys = ['surplus','generation'])
+
+def test_memo_bounded():
+	m = loadModel(MBasicInt, memo = Memo(maxsize = 2))
+	baseSolve(m)
+	assert len(m.memo) <= 2
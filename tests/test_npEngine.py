@@ -0,0 +1,33 @@
+from conftest import *
+
+def dense(out):
+	return {k: (v.toarray() if hasattr(v, 'toarray') else v) for k,v in out.items()}
+
+@pytest.mark.parametrize('cls', [MBasicInt, MBasicIntEmCap, MBasicIntRES])
+@pytest.mark.parametrize('weights', [False, True])
+def test_numpy_engine_matches_pandas(cls, weights):
+	outs = {}
+	for engine in ('pandas', 'numpy'):
+		m = loadModel(cls, engine = engine)
+		if weights:
+			m.db['hrWeight'] = pd.Series(np.linspace(0.5, 1.5, 24)*m.scale, index = m.db('idxHr'), name = 'hrWeight')
+		outs[engine] = dense(m.compile())
+	for k,v in outs['pandas'].items():
+		np.testing.assert_allclose(v, outs['numpy'][k], err_msg = k) if v is not None else None
+
+@pytest.mark.parametrize('cls', [MBasicInt, MBasicIntRES])
+def test_numpy_engine_solution(cls):
+	ref = baseSolve(baseModel(cls))
+	m = loadModel(cls, engine = 'numpy')
+	assertSolEqual(ref, baseSolve(m), keys = ['surplus','generation','pHr','pAvg'])
+	m.db['taxEm'] = m.db('taxEm')*3 # incremental recompile with the numpy engine
+	ref = baseModel(cls)
+	ref.db['taxEm'] = ref.db('taxEm')*3
+	assertSolEqual(baseSolve(ref), baseSolve(m), keys = ['surplus','pHr'])
+
+def test_engine_switch_recompiles():
+	m = loadModel(MBasicInt)
+	pandasOut = dense(m.compile())
+	m.engine = 'numpy'
+	np.testing.assert_allclose(dense(m.compile())['A_eq'], pandasOut['A_eq'])
+	assert m.compiledEngine == 'numpy'
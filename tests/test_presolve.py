@@ -0,0 +1,33 @@
+from conftest import *
+from lpEnergyModels.presolve import Presolve
+from scipy import optimize
+
+@pytest.mark.parametrize('cls', [MBasicInt, MBasicIntEmCap, MBasicIntRES])
+def test_presolve_matches_full_LP(cls):
+	m = loadModel(cls, solver = 'scipy', presolve = True)
+	sol = baseSolve(m)
+	assert m.presolve.stats['cols'][0] < m.presolve.stats['cols'][1] # solar at night is removed
+	ref = baseSolve(baseModel(cls))
+	assertSolEqual(ref, sol, keys = ['surplus','generation','demand','pHr','λu_generation','λu_demand'])
+
+def test_zero_load_consumer_and_empty_rows():
+	m, ref = loadModel(MBasicIntRES, solver = 'scipy', presolve = True), baseModel(MBasicIntRES)
+	for x in (m, ref):
+		x.db['load'] = x.db('load').where(x.db('load').index != 'agricultural', 0)
+	sol = baseSolve(m)
+	assert (sol['demand'].xs('agricultural', level = 'idxCons') == 0).all()
+	assertSolEqual(baseSolve(ref), sol, keys = ['surplus','generation','demand','pHr','RESShare'])
+
+def test_reduce_expand_roundtrip():
+	m = loadModel(MBasicInt)
+	out = m.compile()
+	p = Presolve()
+	reduced = p.reduce(out)
+	assert reduced['A_eq'].shape == (len(p.rows['eq']), len(p.cols))
+	sol = optimize.linprog(**reduced, method = 'highs')
+	full = p.expand(sol, out)
+	assert full['x'].shape == out['c'].shape and (full['x'][p.removed] == 0).all()
+	np.testing.assert_allclose(full['fun'], optimize.linprog(**out, method = 'highs')['fun'], rtol = 1e-9)
+
+def test_presolve_is_opt_in(mBasicInt):
+	assert mBasicInt.presolve is None and isinstance(loadModel(MBasicInt, presolve = True).presolve, Presolve)
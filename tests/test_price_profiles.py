@@ -0,0 +1,51 @@
+""" Pipeline from long-format prices to model symbols in scripts/fetch_prices.py, compared with the per-area/year functions. """
+from conftest import *
+from lpEnergyModels.dataStore import readSource, DataStore
+from scripts import fetch_prices
+
+@pytest.fixture(scope = 'module')
+def prices():
+	hours = pd.date_range('2019-01-01', '2022-02-01', freq = 'h', inclusive = 'left', tz = 'UTC')
+	rng = np.random.default_rng(0)
+	df = pd.concat([pd.DataFrame({'HourUTC': hours, 'HourDK': hours.tz_convert('Europe/Copenhagen').tz_localize(None), 'PriceArea': area,
+								  'SpotPriceEUR': rng.gamma(4, 10+i, len(hours))}) for i,area in enumerate(('DK1','DK2'))], ignore_index = True)
+	return df.assign(SpotPriceGJ = df['SpotPriceEUR']/3.6)
+
+def perAreaYear(df, area, year):
+	sub = df[(df['PriceArea'] == area) & (df['HourUTC'].dt.year == year)]
+	sub = sub[~((sub['HourUTC'].dt.month == 2) & (sub['HourUTC'].dt.day == 29))]
+	return fetch_prices.prepare_model_hours(sub, area = area)
+
+def test_hourly_matrix_matches_per_area_year(prices):
+	wide = fetch_prices.hourly_matrix(prices)
+	assert list(wide.columns) == [(a, y) for a in ('DK1','DK2') for y in (2019, 2020, 2021)] # partial 2022 is dropped
+	assert len(wide) == 8760
+	for area, year in wide.columns:
+		np.testing.assert_array_equal(wide[(area, year)].to_numpy(), perAreaYear(prices, area, year).to_numpy())
+	assert fetch_prices.hourly_matrix(prices, complete = False)[('DK1', 2022)].notna().sum() == 31*24
+
+def test_profile_symbols_match_shape_and_quantiles(prices):
+	wide = fetch_prices.hourly_matrix(prices)
+	symbols = fetch_prices.profile_symbols(wide, shape = 'uHrLoad', type_name = 'idxHVTCons')
+	assert list(symbols['idxHVTCons']) == ['DK1_2019','DK1_2020','DK1_2021','DK2_2019','DK2_2020','DK2_2021']
+	for (area, year), t in zip(wide.columns, symbols['idxHVTCons']):
+		np.testing.assert_allclose(symbols['uHrLoad'].xs(t, level = 'idxHVTCons').to_numpy(), fetch_prices.shape_factor(wide[(area, year)]).to_numpy())
+		np.testing.assert_allclose(symbols['pQuantObs'].xs(t).to_numpy(), fetch_prices.price_quantiles(wide[(area, year)]).to_numpy())
+
+def test_model_hour_labels():
+	m = loadModel(MBasicInt)
+	pd.testing.assert_index_equal(fetch_prices.model_hour_labels(24, width = 2), m.db('idxHr'), exact = False)
+
+def test_collapse_dst_matches_groupby(prices):
+	df = prices[prices['HourUTC'] < '2019-11-01'].drop(columns = 'HourUTC')
+	ref = df.groupby(['PriceArea','HourDK'], as_index = False).agg({'SpotPriceEUR': 'mean', 'SpotPriceGJ': 'mean'})
+	out = fetch_prices.collapse_dst(df)
+	pd.testing.assert_frame_equal(ref, out[ref.columns], check_dtype = False)
+
+@pytest.mark.parametrize('out', ['profiles.pkl', 'profiles'])
+def test_write_symbols_roundtrip(prices, tmp_path, out):
+	symbols = fetch_prices.price_profiles(prices, out = str(tmp_path/out))
+	loaded = readSource(str(tmp_path/out)) if out.endswith('.pkl') else DataStore(str(tmp_path/out))()
+	for k,v in symbols.items():
+		(pd.testing.assert_index_equal(v, loaded[k], exact = False) if isinstance(v, pd.Index) else
+		 np.testing.assert_allclose(v.to_numpy(), np.asarray(loaded[k])))
@@ -0,0 +1,27 @@
+from conftest import *
+from lpEnergyModels.profiling import Profiler
+
+def test_profiler_records_compile_solve_postSolve(mBasicInt):
+	events = []
+	profiler = mBasicInt.enableProfiling(hooks = [events.append])
+	sol = baseSolve(mBasicInt)
+	sol['pAvg']
+	kinds = {e['kind'] for e in profiler.records}
+	assert {'params', 'sys', 'solve', 'postSolve'} <= kinds
+	assert events == profiler.records
+	assert ('postSolve', 'pAvg') in set(profiler.summary().index)
+	assert (profiler.report()['wall'] >= 0).all()
+
+def test_profiling_does_not_change_solution(mBasicInt):
+	mBasicInt.enableProfiling(memory = True)
+	sol = baseSolve(mBasicInt)
+	assert {'peakBytes','netBytes'} <= set(mBasicInt.profiler.report().columns)
+	assertSolEqual(baseSolve(baseModel(MBasicInt)), sol, keys = ['surplus','generation','pHr','pAvg'])
+
+def test_profiler_pickles_without_records():
+	import pickle
+	p = Profiler(hooks = [print])
+	with p('solve', 'x'):
+		pass
+	copy = pickle.loads(pickle.dumps(p))
+	assert copy.records == [] and copy.hooks == []
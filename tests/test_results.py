@@ -0,0 +1,40 @@
+from conftest import *
+from lpEnergyModels.results import ResultsStore
+
+outputs = ['surplus','generation','pHr','emissions']
+
+@pytest.fixture(scope = 'module')
+def ref():
+	grid = taxGrid(n = 7)
+	return grid, loadModel(MBasicInt).lazyLoopAsDFs(grid, grid.index.levels[0], outputs = outputs)
+
+@pytest.mark.parametrize('dtype', ['float32', 'float64'])
+def test_streamLoop_matches_lazyLoop(ref, tmp_path, dtype):
+	grid, dfs = ref
+	store = loadModel(MBasicInt).streamLoop(grid, grid.index.levels[0], tmp_path, chunkSize = 3, dtype = dtype, outputs = outputs)
+	assert set(store) == set(outputs) and list(store.scenarios) == list(grid.index.levels[0])
+	tol = 1e-5 if dtype == 'float32' else 1e-9
+	assertDFsEqual(dfs, {k: v.astype(float) for k,v in store().items()}, rtol = tol, atol = tol)
+
+def test_streamLoop_keeps_precision_by_default(ref, tmp_path):
+	grid, dfs = ref
+	store = loadModel(MBasicInt).streamLoop(grid, grid.index.levels[0], tmp_path, chunkSize = 3, outputs = outputs)
+	assert store.meta['dtype'] == np.dtype('float64').str
+	np.testing.assert_allclose(store.load('surplus'), dfs['surplus'], rtol = 1e-12, atol = 0)
+
+def test_streamLoop_resumes(ref, tmp_path):
+	grid, dfs = ref
+	idxLoop = grid.index.levels[0]
+	m = loadModel(MBasicInt)
+	m.streamLoop(grid, idxLoop[:4], tmp_path, chunkSize = 3, dtype = 'float64', outputs = outputs)
+	m.enableProfiling()
+	store = m.streamLoop(grid, idxLoop, tmp_path, chunkSize = 3, dtype = 'float64', outputs = outputs)
+	assert sum(e['kind'] == 'solve' and e['name'] == 'highs' for e in m.profiler.records) == len(idxLoop)-4
+	assertDFsEqual(dfs, store(), rtol = 1e-9, atol = 1e-9)
+
+def test_store_selects_scenarios(ref, tmp_path):
+	grid, dfs = ref
+	loadModel(MBasicInt).streamLoop(grid, grid.index.levels[0], tmp_path, chunkSize = 2, dtype = 'float64', outputs = outputs)
+	store = ResultsStore(tmp_path)
+	sub = store.load('generation', scenarios = [1, 4, 5])
+	pd.testing.assert_frame_equal(dfs['generation'][[1,4,5]], sub.reindex(dfs['generation'].index), check_names = False, check_column_type = False)
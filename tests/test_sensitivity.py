@@ -0,0 +1,77 @@
+from conftest import *
+from lpEnergyModels.sensitivity import RangingSolver
+
+def solved(cls = MBasicInt, **kwargs):
+	m = loadModel(cls, **kwargs)
+	m.compile()
+	m.solve()
+	return m
+
+def resolveSurplus(cls, name, value):
+	""" Surplus with symbol 'name' (auxiliary symbols included) set to value. """
+	m = baseModel(cls)
+	m.compile()
+	m.db[name] = value
+	m.compile(updateAux = False)
+	return m.postSolve(m.solve())['surplus']
+
+@pytest.mark.parametrize('name', ['mcHr', 'genCapHr', 'loadHr'])
+def test_ranging_marginal_matches_resolve(name):
+	m = solved()
+	r = m.sensitivity().ranging(name)
+	r = r[np.isfinite(r['upper']) & (r['upper'] > r['value']+1e-3) & (r['marginal'] != 0)].iloc[:3]
+	assert len(r)
+	ref = baseSolve(baseModel(MBasicInt))['surplus']
+	for key, row in r.iterrows():
+		value = m.db(name).copy()
+		δ = (row['upper']-row['value'])/2
+		value.loc[key] += δ
+		np.testing.assert_allclose(resolveSurplus(MBasicInt, name, value)-ref, -row['marginal']*δ, rtol = 1e-6, atol = 1e-6)
+
+@pytest.mark.parametrize('cls, name', [(MBasicInt, 'genCap'), (MBasicInt, 'taxEm'), (MBasicIntEmCap, 'taxEm')])
+def test_ranging_shifts_elements_jointly(cls, name):
+	""" Elements that enter several LP elements (genCap: all hours, taxEm: all generators) are ranged as a joint shift. """
+	m = solved(cls)
+	r = m.sensitivity().ranging(name)
+	assert r.index.equals(m.db(name).index)
+	np.testing.assert_allclose(r['value'], m.db(name))
+	r = r[np.isfinite(r['upper']) & (r['upper'] > r['value']+1e-3)].iloc[:3]
+	assert len(r)
+	ref = baseSolve(baseModel(cls))['surplus']
+	for key, row in r.iterrows():
+		value = m.db(name).astype(float)
+		δ = (row['upper']-row['value'])/2
+		value.loc[key] += δ
+		mδ = baseModel(cls)
+		mδ.db[name] = value
+		mδ.compile()
+		np.testing.assert_allclose(mδ.postSolve(mδ.solve())['surplus']-ref, -row['marginal']*δ, rtol = 1e-6, atol = 1e-6)
+
+@pytest.mark.parametrize('scale', [1.01, 3])
+def test_solveAt_matches_resolve(scale):
+	m = solved(MBasicIntEmCap)
+	taxEm0 = m.db('taxEm')
+	taxEm = taxEm0*scale
+	ref = baseModel(MBasicIntEmCap)
+	ref.db['taxEm'] = taxEm
+	assertSolEqual(baseSolve(ref), m.sensitivity().solveAt({'taxEm': taxEm}), keys = ['surplus','generation','pHr'])
+	pd.testing.assert_series_equal(m.db('taxEm'), taxEm0) # database is restored
+
+def test_rangeOf_bounds_solveAt():
+	m = solved()
+	s = m.sensitivity()
+	target = {'taxEm': m.db('taxEm')+100}
+	tMin, tMax = s.rangeOf(target)
+	assert tMin <= 0 <= tMax
+	inside = min(tMax, 1)/2
+	with s.shocked({'taxEm': m.db('taxEm')+100*inside}) as out:
+		assert s.basis.solveAt(out) is not None
+
+def test_ranging_solver_loop_matches_base():
+	grid = taxGrid(n = 8)
+	ref = baseModel(MBasicInt).lazyLoopAsDFs(grid, grid.index.levels[0])
+	m = loadModel(MBasicInt, solver = RangingSolver())
+	m.compile()
+	dfs = m.lazyLoopAsDFs(grid, grid.index.levels[0])
+	assertDFsEqual(ref, dfs, keys = ['surplus','demand','pHr']) # generation is not unique at some grid points (ties in marginal costs)
+	assert m.solver.stats['solves'] < m.solver.stats['calls']
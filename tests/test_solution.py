@@ -0,0 +1,37 @@
+from conftest import *
+from lpEnergyModels.solution import LazySolution
+from lpEnergyModels.mBasicIntShell import fuelConsumption, emissionsFuel
+
+def test_outputs_pending_until_accessed(mBasicInt):
+	sol = baseSolve(mBasicInt)
+	assert isinstance(sol, LazySolution)
+	assert {'fuelCons','emissions','pHr','pAvg'} <= set(sol.pending)
+	sol['pAvg']
+	assert {'pAvg','pHr'} <= set(sol.computed) and 'emissions' in sol.pending
+
+def test_lazy_outputs_match_direct(mBasicInt):
+	sol = baseSolve(mBasicInt)
+	fuelCons = fuelConsumption(sol['generation'], mBasicInt.db('uFuel'), mBasicInt.scale)
+	pd.testing.assert_series_equal(sol['fuelCons'], fuelCons)
+	pd.testing.assert_series_equal(sol['emissions'], emissionsFuel(fuelCons, mBasicInt.db('uEm')))
+	pd.testing.assert_series_equal(sol['pHr'], sol['λeq_equilibrium'])
+
+def test_lazy_outputs_ignore_later_db_changes(mBasicInt):
+	sol = baseSolve(mBasicInt)
+	ref = dict(baseSolve(loadModel(MBasicInt)))
+	mBasicInt.db['uEm'] = mBasicInt.db('uEm')*2
+	assertSolEqual(ref, sol, keys = ['fuelCons','emissions','pAvg','mEV'])
+
+def test_pickle_computes_outputs(mBasicInt):
+	import pickle
+	sol = baseSolve(mBasicInt)
+	copy = pickle.loads(pickle.dumps(sol))
+	assert not copy.pending
+	assertSolEqual(dict(sol), copy)
+
+def test_loop_outputs_subset(mBasicInt):
+	grid = taxGrid(n = 3)
+	full = mBasicInt.lazyLoopAsDFs(grid, grid.index.levels[0])
+	sub = mBasicInt.lazyLoopAsDFs(grid, grid.index.levels[0], outputs = ['surplus','emissions'])
+	assert set(sub) == {'surplus','emissions'}
+	assertDFsEqual(sub, full)
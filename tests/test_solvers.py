@@ -0,0 +1,33 @@
+from conftest import *
+from lpEnergyModels import solvers
+from lpEnergyModels.solvers import getSolver, HighsSolver, ScipySolver
+
+def test_auto_requires_highspy(monkeypatch):
+	assert isinstance(getSolver('auto'), ScipySolver)
+	assert isinstance(getSolver('auto', loop = True), HighsSolver if solvers._Highs is not None else ScipySolver)
+	monkeypatch.setattr(solvers, '_Highs', None)
+	assert isinstance(getSolver('auto', loop = True), ScipySolver)
+	with pytest.raises(ImportError):
+		HighsSolver()
+
+@pytest.mark.skipif(solvers._Highs is None, reason = 'requires highspy')
+def test_auto_uses_highs_in_loops_only(mBasicInt):
+	""" With solver = 'auto', single solves use scipy.optimize.linprog and loops the persistent HiGHS LP; 'highs' is used everywhere. """
+	events = []
+	mBasicInt.enableProfiling(hooks = [events.append])
+	baseSolve(mBasicInt)
+	grid = taxGrid(3)
+	mBasicInt.lazyLoop(grid, grid.index.levels[0], outputs = ['surplus'])
+	assert [e['name'] for e in events if e['kind'] == 'solve' and e['name'] in ('scipy','highs')] == ['scipy'] + ['highs']*3
+	assert isinstance(mBasicInt.solver, ScipySolver)
+	m = loadModel(MBasicInt, solver = 'highs')
+	assert isinstance(m.solver, HighsSolver) and m.loopSolver is None
+
+@pytest.mark.skipif(solvers._Highs is None, reason = 'requires highspy')
+@pytest.mark.parametrize('cls', [MBasicEmCap, MBasicIntEmCap, MBasicIntRES])
+def test_highs_matches_linprog_in_loops(cls):
+	""" The warm-started HiGHS LP gives the objective and prices of scipy.optimize.linprog along a loop over taxEm. """
+	grid = taxGrid(5, 200)
+	keys = ['surplus'] + (['pHr'] if issubclass(cls, MBasicInt) else ['λeq_equilibrium'])
+	highs, scipy = (loadModel(cls, solver = s).lazyLoop(grid, grid.index.levels[0], outputs = keys) for s in ('highs','scipy'))
+	[assertSolEqual(highs[l], scipy[l], keys = keys) for l in highs];
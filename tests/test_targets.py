@@ -0,0 +1,53 @@
+from conftest import *
+
+def resolve(m):
+	""" Solution at the current db with a fresh solve. """
+	m.solver.reset()
+	return baseSolve(m)
+
+def test_RESCap_target():
+	m = loadModel(MBasicIntRES)
+	for bounds in [(0, 1), (0, 0.95)]:
+		m.db['RESCap'] = 0.5
+		res = m.seekTarget('RESCap', 'RESShare', 0.8, bounds = bounds)
+		assert res.attained and m.db('RESCap') == res.x
+		np.testing.assert_allclose(resolve(m)['RESShare'], 0.8, rtol = 1e-6)
+
+def test_RESCap_pAvg_target_singular_basis():
+	""" RESCap = 0 removes demand from the RES row, so the basis found at RESCap = 0.5 is singular there. """
+	m = loadModel(MBasicIntRES)
+	res = m.seekTarget('RESCap', 'pAvg', 12.0, bounds = (0, 0.95))
+	assert res.residual <= 0 and m.db('RESCap') == res.x
+	np.testing.assert_allclose(resolve(m)['pAvg'], res.value)
+
+def test_taxEm_jump_feasible_side():
+	""" Emissions are piecewise constant in taxEm: The result is the endpoint of the bracket below the target, and the control is left there. """
+	m = loadModel(MBasicIntEmCap)
+	target = 0.7*baseSolve(m)['emissions'].sum()
+	res = m.seekTarget('taxEm', 'emissions', target, dual = False)
+	assert not res.attained and res.residual < 0
+	assert res.bracket[0] <= res.x and res.x-res.bracket[1] < 1e-3
+	assert m.db('taxEm').iloc[0] == res.x
+	assert resolve(m)['emissions'].sum() <= target
+
+def test_taxEm_RESShare_feasible_side():
+	m = loadModel(MBasicIntRES)
+	m.db['RESCap'] = 0.
+	res = m.seekTarget('taxEm', 'RESShare', 0.75)
+	assert res.residual > 0 and m.db('taxEm').iloc[0] == res.x
+	assert resolve(m)['RESShare'] >= 0.75
+
+def test_side_below():
+	m = loadModel(MBasicIntRES)
+	m.db['RESCap'] = 0.
+	res = m.seekTarget('taxEm', 'RESShare', 0.75, side = 'below')
+	assert res.residual < 0 and resolve(m)['RESShare'] < 0.75
+
+def test_dual_tax_matches_search():
+	m = loadModel(MBasicIntEmCap)
+	target = 0.7*baseSolve(m)['emissions'].sum()
+	dual = m.seekTarget('taxEm', 'emissions', target)
+	assert dual.method == 'dual' and dual.attained
+	m.db['taxEm'] = loadModel(MBasicIntEmCap).db('taxEm')
+	search = m.seekTarget('taxEm', 'emissions', target, dual = False)
+	np.testing.assert_allclose(dual.x, search.bracket, rtol = 1e-6)
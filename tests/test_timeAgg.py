@@ -0,0 +1,38 @@
+from conftest import *
+
+def binding(cls):
+	""" Model with emCap/RESCap set such that the constraint binds. """
+	m = loadModel(cls)
+	if cls is MBasicIntEmCap:
+		m.db['emCap'] = 0.7*baseSolve(m)['emissions']/m.scale
+	else:
+		m.db['RESCap'] = 0.8
+	return m
+
+@pytest.mark.parametrize('cls', [MBasicIntEmCap, MBasicIntRES])
+@pytest.mark.parametrize('engine', ['pandas', 'numpy'])
+def test_unit_weights_match_full_model(cls, engine):
+	""" Every hour is its own representative: Hour weights equal to scale (relative weights 1) give the solution of the full model. """
+	ref = baseSolve(binding(cls))
+	m = binding(cls)
+	m.engine = engine
+	m.db['hrWeight'] = pd.Series(m.scale, index = m.db('idxHr'), name = 'hrWeight')
+	assertSolEqual(ref, baseSolve(m), keys = ['surplus','generation','demand','pHr','pAvg','emissions','RESShare' if cls is MBasicIntRES else 'λub_emCap'])
+
+@pytest.mark.parametrize('engine', ['pandas', 'numpy'])
+def test_weighted_constraints_bind_on_yearly_outputs(engine):
+	""" With unequal hour weights, the emission cap and the RES share apply to weighted yearly levels. """
+	w = pd.Series(np.linspace(0.5, 1.5, 24)*365, index = loadModel(MBasicInt).db('idxHr'), name = 'hrWeight')
+	m = binding(MBasicIntEmCap)
+	m.engine, m.db['hrWeight'] = engine, w
+	np.testing.assert_allclose(baseSolve(m)['emissions'], m.db('emCap')*m.emCapScale, rtol = 1e-6)
+	m = binding(MBasicIntRES)
+	m.engine, m.db['hrWeight'] = engine, w
+	np.testing.assert_allclose(baseSolve(m)['RESShare'], 0.8, rtol = 1e-6)
+
+def test_aggregateHours():
+	m = loadModel(MBasicInt)
+	agg = m.aggregateHours(6)
+	assert len(m.db('idxHr')) == 6 and np.isclose(agg['hrWeight'].sum(), 8760)
+	sol = baseSolve(m)
+	assert np.isfinite(sol['surplus']) and sol['pHr'].index.equals(m.db('idxHr'))